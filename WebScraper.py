@@ -5,136 +5,245 @@ Ejecutar: python amazon_interactivo.py
 
 import asyncio
 import json
+import math
+import time
 from datetime import datetime
 from playwright.async_api import async_playwright
-import asyncio
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/120.0.0.0 Safari/537.36")
+
+# Paginas de resultados descargadas a la vez (un contexto de navegador por pagina en curso)
+MAX_CONTEXTOS = 8
+MAX_PAGINAS = 30
+
+# Estimacion inicial de productos por pagina para decidir cuantas paginas pedir de golpe
+PRODUCTOS_POR_PAGINA = 20
 
 
 class web_scraper:
     def __init__(self):
         self.productos = []
         self.seleccionados = []
+        self._contextos_con_cookies = set()
 
-    async def scrape_productos(self,tienda, busqueda, cantidad=20):
-        """Scrapea productos de una web de ventas"""
+    async def scrape_productos(self, tienda, busqueda, cantidad=20, max_contextos=MAX_CONTEXTOS,
+                               max_paginas=MAX_PAGINAS, headless=False):
+        """Scrapea productos de una web de ventas.
+
+        Las paginas de resultados 1..N se descargan a la vez con un pool acotado de
+        contextos de navegador; los productos se fusionan en orden de pagina y posicion
+        (ids estables aunque las paginas terminen en otro orden) y se deja de pedir
+        paginas en cuanto se alcanza `cantidad`.
+        """
         print(f"\n[BUSQUEDA] Buscando: {busqueda} en {tienda}")
         print(f"[INFO] Cantidad: {cantidad} productos\n")
 
-        async with async_playwright() as p:
-            # Abrir navegador
-            browser = await p.chromium.launch(headless=False)
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-            page = await context.new_page()
+        self._contextos_con_cookies = set()
+        paginas_estimadas = min(max_paginas, max(1, math.ceil(cantidad / PRODUCTOS_POR_PAGINA)))
+        por_pagina = {}
+        sin_resultados = set()
+        productos = []
+        inicio = time.perf_counter()
 
-            url = f"https://www.{tienda}/s?k={busqueda.replace(' ', '+')}"
+        async with async_playwright() as p:
+            # Abrir navegador; los contextos del pool se crean segun hacen falta
+            browser = await p.chromium.launch(headless=headless)
+            contextos = asyncio.Queue()
+            creados = 0
+            tareas = {}
+            siguiente = 1
+
+            async def programar(hasta):
+                nonlocal siguiente, creados
+                while siguiente <= min(hasta, max_paginas):
+                    tarea = asyncio.create_task(self._scrape_pagina(contextos, tienda, busqueda, siguiente))
+                    tareas[tarea] = siguiente
+                    siguiente += 1
+                while creados < min(max_contextos, len(tareas)):
+                    contextos.put_nowait(await browser.new_context(user_agent=USER_AGENT))
+                    creados += 1
+
+            await programar(paginas_estimadas)
+            try:
+                while tareas:
+                    hechas, _ = await asyncio.wait(tareas, return_when=asyncio.FIRST_COMPLETED)
+                    for tarea in hechas:
+                        pagina = tareas.pop(tarea)
+                        try:
+                            resultado = tarea.result()
+                        except Exception as e:
+                            print(f"[ERROR] Pagina {pagina}: {e}")
+                            resultado = []
+                        if resultado is None:
+                            sin_resultados.add(pagina)
+                            resultado = []
+                        por_pagina[pagina] = resultado
+                        print(f"[OK] Pagina {pagina}: {len(resultado)} elementos")
+
+                    productos, completo = self._fusionar(por_pagina, sin_resultados, cantidad)
+                    if completo:
+                        break
+                    if not tareas and siguiente - 1 not in sin_resultados:
+                        # La estimacion se quedo corta: pedir las paginas que faltan segun la media real
+                        media = max(1, len(productos) // max(1, len(por_pagina)))
+                        await programar(siguiente - 1 + math.ceil((cantidad - len(productos)) / media))
+            finally:
+                # Parada temprana: cancelar las paginas que ya no hacen falta
+                for tarea in tareas:
+                    tarea.cancel()
+                await asyncio.gather(*tareas, return_exceptions=True)
+                await browser.close()
+
+        if not productos and 1 in sin_resultados:
+            print("[ERROR] No se encontraron productos. Verifica el término de búsqueda.")
+            return []
+
+        for producto in productos:
+            print(f"{producto['id']}. {producto['titulo'][:60]}...")
+            print(f"   Precio: {producto['precio']} EUR | Rating: {producto['rating']}")
+        self.productos.extend(productos)
+
+        print(f"\n[OK] Scraping completado: {len(productos)} productos de {len(por_pagina)} paginas "
+              f"en {time.perf_counter() - inicio:.1f}s")
+        return self.productos
 
+    @staticmethod
+    def _fusionar(por_pagina, sin_resultados, cantidad):
+        """Productos de las paginas 1, 2, ... consecutivas ya descargadas, sin duplicados y con id estable.
+
+        Devuelve (productos, completo); completo si se llego a `cantidad` o a una pagina sin resultados.
+        """
+        productos = []
+        vistos = set()
+        pagina = 1
+        while pagina in por_pagina:
+            if pagina in sin_resultados:
+                return productos, True
+            for producto in por_pagina[pagina]:
+                clave = producto['asin'] or producto['url'] or (pagina, producto['posicion'])
+                if clave in vistos:
+                    continue  # los anuncios patrocinados se repiten entre paginas
+                vistos.add(clave)
+                productos.append({'id': len(productos) + 1, **producto})
+                if len(productos) == cantidad:
+                    return productos, True
+            pagina += 1
+        return productos, False
+
+    async def _scrape_pagina(self, contextos, tienda, busqueda, pagina):
+        """Productos de una pagina de resultados, o None si la pagina no tiene resultados."""
+        context = await contextos.get()
+        page = None
+        try:
+            page = await context.new_page()
+            url = f"https://www.{tienda}/s?k={busqueda.replace(' ', '+')}&page={pagina}"
             print("URL generada:", url)
             await page.goto(url, timeout=90000)  # 90 segundos
-            print("[OK] Pagina cargada")
 
-            # Aceptar cookies
-            try:
-                await page.click('#sp-cc-accept', timeout=3000)
-                print("[OK] Cookies aceptadas")
-            except:
-                pass
+            # Aceptar cookies (una vez por contexto)
+            if id(context) not in self._contextos_con_cookies:
+                try:
+                    await page.click('#sp-cc-accept', timeout=3000)
+                    print("[OK] Cookies aceptadas")
+                except Exception:
+                    pass
+                self._contextos_con_cookies.add(id(context))
 
             # Esperar productos
             try:
                 await page.wait_for_selector('div.s-result-item', timeout=60000)
-            except:
-                print("[ERROR] No se encontraron productos. Verifica el término de búsqueda.")
-                return []
+            except Exception:
+                return None
 
-            # Extraer productos
+            # Extraer productos: las consultas de todos los elementos se solapan
             elements = await page.query_selector_all('div.s-result-item')
-            print(f"[INFO] Encontrados {len(elements)} elementos\n")
-
-            for i, elem in enumerate(elements[:cantidad]):
-                try:
-                    # Título
-                    if tienda == "temu.com":
-                        # Título
-                        titulo_elem = await elem.query_selector('h2.title')
-                        # Precio
-                        precio_elem = await elem.query_selector('.price')
-                        # Rating
-                        rating_elem = await elem.query_selector('.rating')
-                    else:
-                        match tienda:
-                            case "amazon.es":
-                                titulo_elem = await elem.query_selector('h2.a-text-normal span')
-
-                    titulo = await titulo_elem.inner_text() if titulo_elem else "Sin titulo"
-
-                    # Precio
-                    precio_elem = await elem.query_selector('.a-price-whole')
-                    precio_frac = await elem.query_selector('.a-price-fraction')
-                    if precio_elem and precio_frac:
-                        whole = await precio_elem.inner_text()
-                        frac = await precio_frac.inner_text()
-                        whole_cleaned = ''.join(c for c in whole if c.isdigit())
-                        precio = f"{whole_cleaned},{frac}"
-                        try:
-                            precio_num = float(precio.replace(',', '.'))
-                        except:
-                            precio_num = 0
-                    else:
-                        precio = "N/A"
-                        precio_num = 0
-
-                    # Rating
-                    rating_elem = await elem.query_selector('.a-icon-alt')
-                    rating_text = await rating_elem.inner_text() if rating_elem else "Sin valoracion"
-
-                    # Extraer número de rating
-                    try:
-                        rating_num = float(rating_text.split()[0].replace(',', '.'))
-                    except:
-                        rating_num = 0
-
-                    # Número de reseñas
-                    reviews_elem = await elem.query_selector('span[aria-label*="estrellas"]')
-                    if reviews_elem:
-                        reviews_text = await reviews_elem.get_attribute('aria-label')
-                        try:
-                            # Extraer número de reseñas del texto como "4.5 de 5 estrellas 1.234"
-                            parts = reviews_text.split()
-                            num_reviews = int(''.join(c for c in parts[-1] if c.isdigit()))
-                        except:
-                            num_reviews = 0
-                    else:
-                        num_reviews = 0
-
-                    # URL
-                    link_elem = await elem.query_selector('h2 a')
-                    link = await link_elem.get_attribute('href') if link_elem else ""
-                    url_completa = f"https://www.amazon.es{link}" if link else ""
-
-                    producto = {
-                        'id': i + 1,
-                        'titulo': titulo.strip(),
-                        'precio': precio,
-                        'precio_num': precio_num,
-                        'rating': rating_text,
-                        'rating_num': rating_num,
-                        'num_reviews': num_reviews,
-                        'url': url_completa
-                    }
-
-                    self.productos.append(producto)
-                    print(f"{i + 1}. {titulo[:60]}...")
-                    print(f"   Precio: {precio} EUR | Rating: {rating_text}")
-
-                except Exception as e:
-                    print(f"[ERROR] Error en producto {i + 1}: {e}")
-
-            # Cerrar
-            await browser.close()
-
-        print(f"\n[OK] Scraping completado: {len(self.productos)} productos")
-        return self.productos
+            extraidos = await asyncio.gather(*(self._extraer_producto(elem, tienda) for elem in elements),
+                                             return_exceptions=True)
+            productos = []
+            for posicion, producto in enumerate(extraidos, 1):
+                if isinstance(producto, Exception):
+                    print(f"[ERROR] Error en producto {posicion} de la pagina {pagina}: {producto}")
+                    continue
+                producto.update(pagina=pagina, posicion=posicion)
+                productos.append(producto)
+            return productos
+        finally:
+            if page is not None:
+                await page.close()
+            contextos.put_nowait(context)
+
+    async def _extraer_producto(self, elem, tienda):
+        """Campos de un producto a partir de su elemento en la pagina de resultados."""
+        # Título
+        titulo_elem = None
+        if tienda == "temu.com":
+            # Título
+            titulo_elem = await elem.query_selector('h2.title')
+        else:
+            match tienda:
+                case "amazon.es":
+                    titulo_elem = await elem.query_selector('h2.a-text-normal span')
+
+        titulo = await titulo_elem.inner_text() if titulo_elem else "Sin titulo"
+
+        # Precio
+        precio_elem = await elem.query_selector('.a-price-whole')
+        precio_frac = await elem.query_selector('.a-price-fraction')
+        if precio_elem and precio_frac:
+            whole = await precio_elem.inner_text()
+            frac = await precio_frac.inner_text()
+            whole_cleaned = ''.join(c for c in whole if c.isdigit())
+            precio = f"{whole_cleaned},{frac}"
+            try:
+                precio_num = float(precio.replace(',', '.'))
+            except:
+                precio_num = 0
+        else:
+            precio = "N/A"
+            precio_num = 0
+
+        # Rating
+        rating_elem = await elem.query_selector('.a-icon-alt')
+        rating_text = await rating_elem.inner_text() if rating_elem else "Sin valoracion"
+
+        # Extraer número de rating
+        try:
+            rating_num = float(rating_text.split()[0].replace(',', '.'))
+        except:
+            rating_num = 0
+
+        # Número de reseñas
+        reviews_elem = await elem.query_selector('span[aria-label*="estrellas"]')
+        if reviews_elem:
+            reviews_text = await reviews_elem.get_attribute('aria-label')
+            try:
+                # Extraer número de reseñas del texto como "4.5 de 5 estrellas 1.234"
+                parts = reviews_text.split()
+                num_reviews = int(''.join(c for c in parts[-1] if c.isdigit()))
+            except:
+                num_reviews = 0
+        else:
+            num_reviews = 0
+
+        # URL
+        link_elem = await elem.query_selector('h2 a')
+        link = await link_elem.get_attribute('href') if link_elem else ""
+        url_completa = f"https://www.amazon.es{link}" if link else ""
+
+        # Identificador del producto en la tienda (para no repetirlo entre paginas)
+        asin = await elem.get_attribute('data-asin') or ""
+
+        return {
+            'titulo': titulo.strip(),
+            'precio': precio,
+            'precio_num': precio_num,
+            'rating': rating_text,
+            'rating_num': rating_num,
+            'num_reviews': num_reviews,
+            'url': url_completa,
+            'asin': asin
+        }
 
     def mostrar_productos(self):
         """Muestra lista de productos"""
@@ -0,0 +1,137 @@
+"""
+BACKEND CUANTIZADO (INT8) PARA LOS MODELOS DE PYSENTIMIENTO
+Inferencia en CPU más rápida con modelos cuantizados dinámicamente a int8.
+
+BACKENDS:
+- 'pytorch': modelo original en fp32 (por defecto)
+- 'int8':    torch.quantization.quantize_dynamic sobre las capas Linear
+- 'onnx':    exportación a ONNX + onnxruntime.quantization.quantize_dynamic
+
+Los artefactos exportados se guardan en DIRECTORIO_MODELOS para no repetir
+la cuantización en cada ejecución.
+
+REQUISITOS (solo backend 'onnx'):
+pip install onnx onnxruntime
+"""
+
+import copy
+import os
+import re
+from types import SimpleNamespace
+
+BACKENDS_DISPONIBLES = ('pytorch', 'int8', 'onnx')
+
+DIRECTORIO_MODELOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "modelos_cuantizados")
+
+
+def _ruta_artefacto(analizador, tarea, lang, extension):
+    """Ruta del artefacto cuantizado, ligada al modelo y a su versión."""
+    config = analizador.model.config
+    nombre = getattr(config, '_name_or_path', '') or tarea
+    version = getattr(config, '_commit_hash', None) or getattr(config, 'transformers_version', '')
+    base = re.sub(r'[^\w.-]+', '_', f"{lang}_{tarea}_{nombre}_{version}")
+    os.makedirs(DIRECTORIO_MODELOS, exist_ok=True)
+    return os.path.join(DIRECTORIO_MODELOS, f"{base}.{extension}")
+
+
+# ============================================
+# TORCH DYNAMIC QUANTIZATION
+# ============================================
+
+def _cuantizar_torch(analizador, tarea, lang):
+    """Cuantiza las capas Linear a int8 (o carga el artefacto ya guardado)."""
+    import torch
+
+    ruta = _ruta_artefacto(analizador, tarea, lang, "int8.pt")
+    if os.path.exists(ruta):
+        print(f"✓ Usando modelo int8 guardado: {os.path.basename(ruta)}")
+        return torch.load(ruta, weights_only=False)
+
+    print(f"Cuantizando modelo '{tarea}' a int8...")
+    modelo = torch.quantization.quantize_dynamic(
+        analizador.model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    modelo.eval()
+    torch.save(modelo, ruta)
+    print(f"✓ Modelo int8 guardado en {ruta}")
+    return modelo
+
+
+# ============================================
+# ONNX RUNTIME
+# ============================================
+
+class ModeloONNX:
+    """Envoltorio mínimo de una sesión de onnxruntime con la interfaz que usa el motor."""
+
+    def __init__(self, ruta, config):
+        import onnxruntime as ort
+        import torch
+
+        opciones = ort.SessionOptions()
+        opciones.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.sesion = ort.InferenceSession(ruta, opciones, providers=['CPUExecutionProvider'])
+        self.entradas = [e.name for e in self.sesion.get_inputs()]
+        self.config = config
+        self.device = torch.device('cpu')
+
+    def __call__(self, **kwargs):
+        import torch
+
+        alimentacion = {k: v.cpu().numpy() for k, v in kwargs.items() if k in self.entradas}
+        logits = self.sesion.run(['logits'], alimentacion)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def _exportar_onnx(analizador, tarea, lang):
+    """Exporta el modelo a ONNX y lo cuantiza a int8 (o reutiliza el artefacto)."""
+    import torch
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    ruta_int8 = _ruta_artefacto(analizador, tarea, lang, "int8.onnx")
+    if os.path.exists(ruta_int8):
+        print(f"✓ Usando modelo ONNX int8 guardado: {os.path.basename(ruta_int8)}")
+        return ModeloONNX(ruta_int8, analizador.model.config)
+
+    print(f"Exportando modelo '{tarea}' a ONNX...")
+    ruta_fp32 = _ruta_artefacto(analizador, tarea, lang, "fp32.onnx")
+    ejemplo = analizador.tokenizer(["texto de ejemplo"], return_tensors='pt')
+    nombres = [n for n in ('input_ids', 'attention_mask') if n in ejemplo]
+    ejes = {n: {0: 'lote', 1: 'secuencia'} for n in nombres}
+    ejes['logits'] = {0: 'lote'}
+
+    modelo = analizador.model.eval()
+    torch.onnx.export(
+        modelo,
+        tuple(ejemplo[n] for n in nombres),
+        ruta_fp32,
+        input_names=nombres,
+        output_names=['logits'],
+        dynamic_axes=ejes,
+        opset_version=14
+    )
+
+    print(f"Cuantizando modelo ONNX '{tarea}' a int8...")
+    quantize_dynamic(ruta_fp32, ruta_int8, weight_type=QuantType.QInt8)
+    os.remove(ruta_fp32)
+    print(f"✓ Modelo ONNX int8 guardado en {ruta_int8}")
+    return ModeloONNX(ruta_int8, analizador.model.config)
+
+
+# ============================================
+# PUNTO DE ENTRADA
+# ============================================
+
+def cuantizar_analizador(analizador, tarea, lang="es", backend="int8"):
+    """Devuelve una copia del analizador con el modelo del backend indicado."""
+    if backend not in BACKENDS_DISPONIBLES:
+        raise ValueError(f"Backend no soportado: {backend} (opciones: {', '.join(BACKENDS_DISPONIBLES)})")
+    if backend == 'pytorch':
+        return analizador
+
+    cuantizado = copy.copy(analizador)
+    if backend == 'int8':
+        cuantizado.model = _cuantizar_torch(analizador, tarea, lang)
+    else:
+        cuantizado.model = _exportar_onnx(analizador, tarea, lang)
+    return cuantizado
@@ -0,0 +1,77 @@
+"""
+BENCHMARK: BACKEND CUANTIZADO vs FP32
+Compara velocidad y concordancia de etiquetas entre el modelo fp32 y los
+backends cuantizados sobre los textos de tweets_analizados.json.
+
+Ejecutar:
+python benchmark_cuantizacion.py --backend int8
+python benchmark_cuantizacion.py --backend onnx --tareas sentiment emotion --repeticiones 5
+"""
+
+import argparse
+import time
+
+from motor_analisis import MotorAnalisis
+from lector_resultados import leer_tweets
+
+
+def cargar_textos(ruta):
+    """Lee los textos de un archivo de resultados (.json o .jsonl) de tweets_analisis_sentimientos.py."""
+    return [t['texto'] for t in leer_tweets(ruta)]
+
+
+def medir(motor, textos, repeticiones):
+    """Devuelve (mejor tiempo en segundos, resultados) tras calentar el motor."""
+    motor.analizar(textos[:motor.batch_size])  # carga y calentamiento
+
+    mejor = float('inf')
+    resultados = None
+    for _ in range(repeticiones):
+        motor.vaciar_cache()
+        inicio = time.perf_counter()
+        resultados = motor.analizar(textos)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inferencia cuantizada frente a fp32")
+    parser.add_argument('--archivo', default='tweets_analizados.json')
+    parser.add_argument('--backend', default='int8', choices=['int8', 'onnx'])
+    parser.add_argument('--tareas', nargs='+', default=['sentiment', 'emotion'])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+
+    textos = cargar_textos(args.archivo)
+    print(f"\n{'='*70}")
+    print(f"BENCHMARK fp32 vs {args.backend} - {len(textos)} textos")
+    print(f"{'='*70}\n")
+
+    motor_fp32 = MotorAnalisis(args.tareas, batch_size=args.batch_size, backend='pytorch')
+    motor_q = MotorAnalisis(args.tareas, batch_size=args.batch_size, backend=args.backend)
+
+    t_fp32, res_fp32 = medir(motor_fp32, textos, args.repeticiones)
+    t_q, res_q = medir(motor_q, textos, args.repeticiones)
+
+    print(f"\n{'Backend':<10} {'Tiempo (s)':>12} {'Tweets/s':>12}")
+    print("-" * 36)
+    print(f"{'fp32':<10} {t_fp32:>12.3f} {len(textos) / t_fp32:>12.1f}")
+    print(f"{args.backend:<10} {t_q:>12.3f} {len(textos) / t_q:>12.1f}")
+    print(f"\nAceleración: {t_fp32 / t_q:.2f}x")
+
+    print("\n--- CONCORDANCIA DE ETIQUETAS ---")
+    for tarea in args.tareas:
+        iguales = sum(1 for a, b in zip(res_fp32, res_q) if a[tarea]['output'] == b[tarea]['output'])
+        diferencia = max(
+            abs(a[tarea]['probas'][k] - b[tarea]['probas'][k])
+            for a, b in zip(res_fp32, res_q) for k in a[tarea]['probas']
+        )
+        print(f"  {tarea:<12}: {iguales}/{len(textos)} ({iguales / len(textos):.1%}) "
+              f"| máx. diferencia de probabilidad {diferencia:.4f}")
+
+    print(f"\n{'='*70}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+BENCHMARK: PREPROCESADO QUE AHORRA TOKENS
+Mide cuántos tokens ahorra preprocesado_tokens.py sobre los textos de
+tweets_analizados.json y cuánto cambia las etiquetas del modelo:
+
+- Tokens por tweet antes y después (con el tokenizador del modelo, o una
+  estimación si pysentimiento no está instalado)
+- Tiempo de inferencia con textos originales y preprocesados
+- Concordancia de etiquetas con los textos originales y con las guardadas en
+  el archivo
+
+Ejecutar:
+python benchmark_preprocesado.py
+python benchmark_preprocesado.py --presupuesto 48 --tareas sentiment
+python benchmark_preprocesado.py --solo-tokens
+"""
+
+import argparse
+import importlib.util
+import time
+
+from lector_resultados import leer_tweets
+from preprocesado_tokens import PreprocesadorTokens, contar_tokens_estimados, contador_tokenizador, PRESUPUESTO_TOKENS
+
+# Campo guardado en el archivo con la etiqueta de cada tarea
+CAMPOS_ETIQUETA = {'sentiment': 'sentimiento', 'emotion': 'emocion'}
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))] if ordenados else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ahorro de tokens y concordancia del preprocesado")
+    parser.add_argument('--archivo', default='tweets_analizados.json')
+    parser.add_argument('--presupuesto', type=int, default=PRESUPUESTO_TOKENS)
+    parser.add_argument('--tareas', nargs='+', default=['sentiment', 'emotion'], choices=list(CAMPOS_ETIQUETA))
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--solo-tokens', action='store_true', help="No ejecutar el modelo (solo el ahorro estimado)")
+    args = parser.parse_args()
+
+    tweets = list(leer_tweets(args.archivo))
+    textos = [t['texto'] for t in tweets]
+    con_modelo = not args.solo_tokens and importlib.util.find_spec('pysentimiento') is not None
+
+    motor = None
+    contador = contar_tokens_estimados
+    if con_modelo:
+        from motor_analisis import MotorAnalisis
+        motor = MotorAnalisis(args.tareas)
+        contador = contador_tokenizador(motor.analizador(motor.tareas[0]).tokenizer)
+
+    preprocesador = PreprocesadorTokens(args.presupuesto, contador=contador)
+    inicio = time.perf_counter()
+    normalizados, ahorrados = preprocesador.procesar(textos)
+    t_prep = time.perf_counter() - inicio
+
+    print(f"\n{'='*70}")
+    print(f"BENCHMARK PREPROCESADO - {len(textos)} textos, presupuesto {args.presupuesto} tokens")
+    print(f"{'='*70}\n")
+    tipo = "tokenizador del modelo" if con_modelo else "estimación (sin pysentimiento)"
+    print(f"Tokens contados con: {tipo}")
+    print(f"✓ {preprocesador.resumen()}")
+    print(f"  Ahorro por tweet: mediana {percentil(ahorrados, 0.5)}, p90 {percentil(ahorrados, 0.9)}, "
+          f"máx. {max(ahorrados, default=0)}")
+    print(f"  Tiempo de preprocesado: {t_prep * 1000:.1f} ms ({t_prep / max(1, len(textos)) * 1e6:.1f} µs/tweet)")
+
+    if not con_modelo:
+        print(f"\n{'='*70}\n")
+        return
+
+    # Inferencia: mejor de N repeticiones, sin caché de codificaciones
+    tiempos = {}
+    resultados = {}
+    for nombre, entrada in (('original', textos), ('preprocesado', normalizados)):
+        motor.analizar(entrada[:motor.batch_size])  # calentamiento
+        mejor = float('inf')
+        for _ in range(args.repeticiones):
+            motor.vaciar_cache()
+            inicio = time.perf_counter()
+            resultados[nombre] = motor.analizar(entrada)
+            mejor = min(mejor, time.perf_counter() - inicio)
+        tiempos[nombre] = mejor
+
+    print(f"\n{'Textos':<14} {'Tiempo (s)':>12} {'Tweets/s':>12}")
+    print("-" * 40)
+    for nombre, segundos in tiempos.items():
+        print(f"{nombre:<14} {segundos:>12.3f} {len(textos) / segundos:>12.1f}")
+    print(f"\nAceleración: {tiempos['original'] / tiempos['preprocesado']:.2f}x")
+
+    print("\n--- CONCORDANCIA DE ETIQUETAS ---")
+    for tarea in args.tareas:
+        iguales = sum(1 for a, b in zip(resultados['original'], resultados['preprocesado'])
+                      if a[tarea]['output'] == b[tarea]['output'])
+        campo = CAMPOS_ETIQUETA[tarea]
+        guardadas = [(t.get(campo), r[tarea]['output']) for t, r in zip(tweets, resultados['preprocesado'])
+                     if t.get(campo) is not None]
+        iguales_archivo = sum(1 for a, b in guardadas if a == b)
+        print(f"  {tarea:<12}: {iguales}/{len(textos)} ({iguales / len(textos):.1%}) con los textos originales"
+              f" | {iguales_archivo}/{len(guardadas)} con las etiquetas del archivo")
+
+    print(f"\n{'='*70}\n")
+
+
+if __name__ == "__main__":
+    main()
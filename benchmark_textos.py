@@ -0,0 +1,307 @@
+"""
+BENCHMARK DE LOS PROCESOS DE TEXTO SOBRE UN CORPUS SINTÉTICO
+Mide las rutas calientes de los ejercicios con corpus reproducibles
+(corpus_sintetico.py) de 1k a 10M documentos y guarda cada ejecución en un
+historial JSON para detectar regresiones entre versiones.
+
+- tokenizacion: procesar_y_contar (02_limpieza_texto.py) con stopwords
+- lexico: analizar_sentimiento (03_sentimiento_por_lexicon.py) con AFINN
+- jaccard: preprocess_to_set + jaccard_similarity (04_similitud_jaccard.py),
+  matriz completa; es cuadrático, así que usa como mucho --max-docs-cuadratico
+- tfidf_kmeans: limpiar_frase + TF-IDF + KMeans (05_vectorizacion_y_clustering.py),
+  solo si scikit-learn está instalado
+
+Los ejercicios ejecutan todo al importarse (y abren gráficos), así que sus
+funciones se extraen con ast sin ejecutar el resto del archivo.
+
+Ejecutar:
+python benchmark_textos.py
+python benchmark_textos.py --tamanos 1k 100k 1M --benchmarks tokenizacion lexico
+python benchmark_textos.py --tamanos 10M --tipo resena --repeticiones 1
+"""
+
+import argparse
+import ast
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from corpus_sintetico import GeneradorCorpus, STOPWORDS_ES, TIPOS
+from puntuador_lexico import cargar_lexico_afinn
+
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.cluster import KMeans
+    SKLEARN_DISPONIBLE = True
+except ImportError:
+    SKLEARN_DISPONIBLE = False
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+RUTA_HISTORIAL = os.path.join(DIRECTORIO, 'benchmarks_historial.json')
+
+TAMANOS_POR_DEFECTO = (1_000, 10_000, 100_000)
+MAX_DOCS_CUADRATICO = 2_000
+MAX_DOCS_TFIDF = 200_000
+
+# Documentos unidos por llamada a procesar_y_contar (recibe un bloque de texto)
+DOCS_POR_BLOQUE = 1000
+
+# Una ejecución más lenta que la anterior en este porcentaje se marca como regresión
+UMBRAL_REGRESION = 0.10
+
+
+# ============================================
+# CARGA DE FUNCIONES DE LOS EJERCICIOS
+# ============================================
+
+def cargar_funciones(archivo, nombres):
+    """Extrae las funciones `nombres` de un script sin ejecutar su código de nivel superior.
+
+    Se ejecutan solo los imports del script (los que no estén instalados se omiten)
+    y las definiciones pedidas; devuelve {nombre: función}.
+    """
+    ruta = os.path.join(DIRECTORIO, archivo)
+    with open(ruta, 'r', encoding='utf-8') as f:
+        arbol = ast.parse(f.read(), filename=ruta)
+
+    espacio = {'__name__': f"ejercicio_{os.path.splitext(archivo)[0]}"}
+    for nodo in arbol.body:
+        if isinstance(nodo, (ast.Import, ast.ImportFrom)):
+            try:
+                exec(compile(ast.Module([nodo], []), ruta, 'exec'), espacio)
+            except ImportError:
+                pass
+
+    definiciones = {n.name: n for n in arbol.body if isinstance(n, ast.FunctionDef)}
+    faltan = [n for n in nombres if n not in definiciones]
+    if faltan:
+        raise LookupError(f"{archivo} no define {', '.join(faltan)}")
+    modulo = ast.Module([definiciones[n] for n in nombres], [])
+    exec(compile(modulo, ruta, 'exec'), espacio)
+    return {n: espacio[n] for n in nombres}
+
+
+# ============================================
+# BENCHMARKS
+# ============================================
+# Cada benchmark recibe (generador, n) y devuelve (segundos, documentos procesados).
+# Solo se cronometra la función del ejercicio, no la generación del corpus.
+
+def bench_tokenizacion(generador, n):
+    procesar_y_contar = cargar_funciones('02_limpieza_texto.py', ['procesar_y_contar'])['procesar_y_contar']
+    stopwords = set(STOPWORDS_ES)
+    segundos = 0.0
+    for lote in generador.lotes(n):
+        bloques = [' '.join(lote[i:i + DOCS_POR_BLOQUE]) for i in range(0, len(lote), DOCS_POR_BLOQUE)]
+        inicio = time.perf_counter()
+        for bloque in bloques:
+            procesar_y_contar(bloque, stopwords=stopwords)
+        segundos += time.perf_counter() - inicio
+    return segundos, n
+
+
+def bench_lexico(generador, n):
+    analizar_sentimiento = cargar_funciones('03_sentimiento_por_lexicon.py',
+                                            ['analizar_sentimiento'])['analizar_sentimiento']
+    lexico = cargar_lexico_afinn()
+    positivas = {p for p, v in lexico.items() if v > 0}
+    negativas = {p for p, v in lexico.items() if v < 0}
+    stopwords = set(STOPWORDS_ES)
+    segundos = 0.0
+    for lote in generador.lotes(n):
+        inicio = time.perf_counter()
+        for texto in lote:
+            analizar_sentimiento(texto, stopwords, positivas, negativas)
+        segundos += time.perf_counter() - inicio
+    return segundos, n
+
+
+def bench_jaccard(generador, n, max_docs=MAX_DOCS_CUADRATICO):
+    funciones = cargar_funciones('04_similitud_jaccard.py', ['preprocess_to_set', 'jaccard_similarity'])
+    preprocess_to_set, jaccard_similarity = funciones['preprocess_to_set'], funciones['jaccard_similarity']
+    textos = list(generador.textos(min(n, max_docs)))
+    stopwords = set(STOPWORDS_ES)
+
+    # Igual que el ejercicio: conjuntos por frase y matriz completa n x n
+    inicio = time.perf_counter()
+    conjuntos = [preprocess_to_set(t, stopwords) for t in textos]
+    matriz = np.zeros((len(textos), len(textos)))
+    for i in range(len(textos)):
+        for j in range(len(textos)):
+            matriz[i, j] = jaccard_similarity(conjuntos[i], conjuntos[j])
+    return time.perf_counter() - inicio, len(textos)
+
+
+def bench_tfidf_kmeans(generador, n, max_docs=MAX_DOCS_TFIDF):
+    limpiar_frase = cargar_funciones('05_vectorizacion_y_clustering.py', ['limpiar_frase'])['limpiar_frase']
+    textos = list(generador.textos(min(n, max_docs)))
+    stopwords = set(STOPWORDS_ES)
+
+    inicio = time.perf_counter()
+    corpus_limpio = [limpiar_frase(t, stopwords) for t in textos]
+    matriz = TfidfVectorizer().fit_transform(corpus_limpio)
+    KMeans(n_clusters=3, random_state=42, n_init=10).fit(matriz)
+    return time.perf_counter() - inicio, len(textos)
+
+
+BENCHMARKS = {
+    'tokenizacion': bench_tokenizacion,
+    'lexico': bench_lexico,
+    'jaccard': bench_jaccard,
+    'tfidf_kmeans': bench_tfidf_kmeans
+}
+
+
+# ============================================
+# HISTORIAL
+# ============================================
+
+def parsear_tamano(texto):
+    """'10k' -> 10000, '1M' -> 1000000, '2500' -> 2500."""
+    multiplicadores = {'k': 1_000, 'm': 1_000_000}
+    texto = texto.strip().lower().replace('_', '')
+    if texto and texto[-1] in multiplicadores:
+        return int(float(texto[:-1]) * multiplicadores[texto[-1]])
+    return int(texto)
+
+
+def version_git():
+    """Commit actual (abreviado) o None si no es un repositorio git."""
+    try:
+        salida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=DIRECTORIO,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return salida.stdout.strip() or None
+
+
+def cargar_historial(ruta=RUTA_HISTORIAL):
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def comparar_con_anterior(resultados, historial, huella, umbral=UMBRAL_REGRESION):
+    """Compara cada resultado con la última ejecución del mismo corpus; devuelve las regresiones."""
+    anteriores = {}
+    for ejecucion in historial:
+        if ejecucion.get('huella_corpus') != huella:
+            continue
+        for r in ejecucion['resultados']:
+            anteriores[(r['benchmark'], r['documentos'])] = (r, ejecucion.get('version'))
+
+    regresiones = []
+    for r in resultados:
+        anterior = anteriores.get((r['benchmark'], r['documentos']))
+        if anterior is None:
+            r['cambio'] = None
+            continue
+        previo, version = anterior
+        r['cambio'] = round(r['segundos'] / previo['segundos'] - 1, 4) if previo['segundos'] else None
+        if r['cambio'] is not None and r['cambio'] > umbral:
+            regresiones.append({**r, 'version_anterior': version, 'segundos_anteriores': previo['segundos']})
+    return regresiones
+
+
+# ============================================
+# PROGRAMA PRINCIPAL
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los procesos de texto con un corpus sintético")
+    parser.add_argument('--tamanos', nargs='+', default=[str(t) for t in TAMANOS_POR_DEFECTO],
+                        help="Número de documentos (admite sufijos k y M, p. ej. 1k 10M)")
+    parser.add_argument('--benchmarks', nargs='+', default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument('--tipo', default='tweet', choices=list(TIPOS))
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--repeticiones', type=int, default=3, help="Se guarda el mejor tiempo")
+    parser.add_argument('--max-docs-cuadratico', type=int, default=MAX_DOCS_CUADRATICO)
+    parser.add_argument('--max-docs-tfidf', type=int, default=MAX_DOCS_TFIDF)
+    parser.add_argument('--historial', default=RUTA_HISTORIAL)
+    parser.add_argument('--no-guardar', action='store_true', help="No añadir la ejecución al historial")
+    parser.add_argument('--umbral', type=float, default=UMBRAL_REGRESION,
+                        help="Fracción de empeoramiento que cuenta como regresión")
+    parser.add_argument('--fallar-si-regresion', action='store_true',
+                        help="Terminar con código 1 si hay regresiones")
+    args = parser.parse_args()
+
+    tamanos = [parsear_tamano(t) for t in args.tamanos]
+    benchmarks = list(args.benchmarks)
+    if 'tfidf_kmeans' in benchmarks and not SKLEARN_DISPONIBLE:
+        print("✗ scikit-learn no está instalado: se omite tfidf_kmeans (pip install scikit-learn)")
+        benchmarks.remove('tfidf_kmeans')
+    limites = {'jaccard': args.max_docs_cuadratico, 'tfidf_kmeans': args.max_docs_tfidf}
+
+    generador = GeneradorCorpus(args.semilla, args.tipo)
+    huella = generador.huella()
+
+    print(f"\n{'='*70}")
+    print(f"BENCHMARK DE TEXTO - corpus '{args.tipo}' (semilla {args.semilla}, huella {huella})")
+    print(f"{'='*70}\n")
+    print(f"{'Benchmark':<14} {'Docs':>10} {'Tiempo (s)':>12} {'Docs/s':>12}")
+    print("-" * 51)
+
+    resultados = []
+    for nombre in benchmarks:
+        ya_medidos = set()
+        for n in tamanos:
+            # Los cuadráticos se recortan: no repetir el mismo tamaño efectivo
+            efectivo = min(n, limites[nombre]) if nombre in limites else n
+            if efectivo in ya_medidos:
+                continue
+            ya_medidos.add(efectivo)
+
+            mejor = float('inf')
+            for _ in range(max(1, args.repeticiones)):
+                segundos, documentos = BENCHMARKS[nombre](generador, efectivo)
+                mejor = min(mejor, segundos)
+            resultados.append({
+                'benchmark': nombre,
+                'documentos': documentos,
+                'segundos': round(mejor, 6),
+                'docs_por_segundo': round(documentos / mejor, 1) if mejor else None
+            })
+            print(f"{nombre:<14} {documentos:>10} {mejor:>12.3f} {documentos / mejor:>12.0f}")
+
+    historial = cargar_historial(args.historial)
+    regresiones = comparar_con_anterior(resultados, historial, huella, args.umbral)
+
+    if any(r['cambio'] is not None for r in resultados):
+        print("\n--- CAMBIO RESPECTO A LA EJECUCIÓN ANTERIOR ---")
+        for r in resultados:
+            if r['cambio'] is not None:
+                marca = "✗" if r['cambio'] > args.umbral else "✓"
+                print(f"  {marca} {r['benchmark']:<14} {r['documentos']:>10}: {r['cambio']:+.1%}")
+
+    if not args.no_guardar:
+        historial.append({
+            'fecha': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'version': version_git(),
+            'python': sys.version.split()[0],
+            'plataforma': platform.platform(),
+            'procesador': platform.processor() or platform.machine(),
+            'tipo': args.tipo,
+            'semilla': args.semilla,
+            'huella_corpus': huella,
+            'repeticiones': args.repeticiones,
+            'resultados': resultados
+        })
+        with open(args.historial, 'w', encoding='utf-8') as f:
+            json.dump(historial, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ Ejecución añadida a {args.historial} ({len(historial)} en total)")
+
+    if regresiones:
+        print(f"\n✗ {len(regresiones)} regresiones de más del {args.umbral:.0%}")
+    print(f"\n{'='*70}\n")
+    return 1 if regresiones and args.fallar_si_regresion else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+CACHÉ PERSISTENTE DE INFERENCIA
+Guarda en SQLite los resultados del motor de análisis para no volver a
+puntuar tweets ya vistos (consultas repetidas, búsquedas solapadas, retweets).
+
+CLAVE: hash SHA-256 del texto normalizado + nombre y versión de los modelos
+VALOR: dict completo {tarea: {'output': ..., 'probas': {...}}}
+EVICCIÓN: TTL por antigüedad y LRU por número máximo de entradas
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+
+def normalizar_texto(texto):
+    """Normaliza un texto para usarlo como clave de caché."""
+    texto = unicodedata.normalize('NFC', texto)
+    return re.sub(r'\s+', ' ', texto).strip()
+
+
+class CacheInferencia:
+    """Caché en disco (SQLite) con evicción LRU/TTL para resultados de inferencia."""
+
+    def __init__(self, ruta="cache_inferencia.sqlite", max_entradas=200000, ttl_segundos=30 * 24 * 3600):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self.aciertos = 0
+        self.fallos = 0
+
+        # La caché puede usarse desde hilos del pipeline asíncrono: conexión compartida con candado
+        self._candado = threading.RLock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.execute("""
+            CREATE TABLE IF NOT EXISTS resultados (
+                clave TEXT PRIMARY KEY,
+                resultado TEXT NOT NULL,
+                creado REAL NOT NULL,
+                ultimo_acceso REAL NOT NULL
+            )
+        """)
+        self._conexion.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ultimo_acceso ON resultados (ultimo_acceso)")
+        self._conexion.commit()
+        self.purgar_caducados()
+
+    # ---------- Claves ----------
+
+    @staticmethod
+    def clave(texto, modelo):
+        """Clave = hash del texto normalizado + identificador de modelo y versión."""
+        h = hashlib.sha256()
+        h.update(modelo.encode('utf-8'))
+        h.update(b'\x00')
+        h.update(normalizar_texto(texto).encode('utf-8'))
+        return h.hexdigest()
+
+    # ---------- Lectura / escritura ----------
+
+    def obtener_varios(self, claves):
+        """Devuelve {clave: resultado} para las claves presentes y no caducadas."""
+        with self._candado:
+            return self._obtener_varios(claves)
+
+    def _obtener_varios(self, claves):
+        ahora = time.time()
+        limite = ahora - self.ttl_segundos if self.ttl_segundos else None
+        encontrados = {}
+
+        claves = list(dict.fromkeys(claves))
+        for inicio in range(0, len(claves), 500):
+            trozo = claves[inicio:inicio + 500]
+            marcas = ','.join('?' * len(trozo))
+            filas = self._conexion.execute(
+                f"SELECT clave, resultado, creado FROM resultados WHERE clave IN ({marcas})", trozo
+            ).fetchall()
+            for clave, resultado, creado in filas:
+                if limite is None or creado >= limite:
+                    encontrados[clave] = json.loads(resultado)
+
+        if encontrados:
+            self._conexion.executemany(
+                "UPDATE resultados SET ultimo_acceso = ? WHERE clave = ?",
+                [(ahora, c) for c in encontrados]
+            )
+            self._conexion.commit()
+
+        self.aciertos += len(encontrados)
+        self.fallos += len(claves) - len(encontrados)
+        return encontrados
+
+    def guardar_varios(self, resultados):
+        """Guarda {clave: resultado} y aplica la evicción LRU si hace falta."""
+        if not resultados:
+            return
+        with self._candado:
+            self._guardar_varios(resultados)
+
+    def _guardar_varios(self, resultados):
+        ahora = time.time()
+        self._conexion.executemany(
+            "INSERT OR REPLACE INTO resultados (clave, resultado, creado, ultimo_acceso) VALUES (?, ?, ?, ?)",
+            [(c, json.dumps(r, ensure_ascii=False), ahora, ahora) for c, r in resultados.items()]
+        )
+        self._conexion.commit()
+        self._evictar_lru()
+
+    # ---------- Evicción ----------
+
+    def purgar_caducados(self):
+        """Elimina las entradas más antiguas que el TTL."""
+        if not self.ttl_segundos:
+            return
+        self._conexion.execute(
+            "DELETE FROM resultados WHERE creado < ?", (time.time() - self.ttl_segundos,))
+        self._conexion.commit()
+
+    def _evictar_lru(self):
+        total = self._conexion.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+        exceso = total - self.max_entradas
+        if exceso > 0:
+            self._conexion.execute("""
+                DELETE FROM resultados WHERE clave IN (
+                    SELECT clave FROM resultados ORDER BY ultimo_acceso ASC LIMIT ?
+                )
+            """, (exceso,))
+            self._conexion.commit()
+
+    # ---------- Estadísticas ----------
+
+    @property
+    def tasa_aciertos(self):
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
+
+    def resumen(self):
+        """Texto con aciertos, fallos y tasa de acierto de la caché."""
+        return (f"Caché de inferencia: {self.aciertos} aciertos, {self.fallos} fallos "
+                f"({self.tasa_aciertos:.1%} de acierto)")
+
+    def cerrar(self):
+        self._conexion.close()
@@ -0,0 +1,195 @@
+"""
+GENERADOR DE CARGA PARA EL SERVICIO DE SENTIMIENTO
+Lanza peticiones POST /analizar concurrentes (una por texto, como haría un
+cliente real) contra servicio_sentimiento.py en localhost y mide:
+
+- Rendimiento (textos/s) y latencia por petición (p50, p90, p99, máx.);
+  los textos que el servicio omitió por idioma no cuentan como analizados
+- Tamaño medio de los microlotes que formó el servicio (GET /estado)
+
+Los textos salen del corpus sintético (corpus_sintetico.py) o de un archivo
+de resultados guardado. Con --lanzar arranca el servicio en un subproceso
+con las opciones indicadas y lo detiene al terminar.
+
+Ejecutar:
+python carga_servicio.py --lanzar --modo lexico --peticiones 5000 --concurrencia 64
+python carga_servicio.py --puerto 8080 --archivo tweets_analizados.json --concurrencia 16
+python carga_servicio.py --lanzar --modo modelo --ventana-ms 5 10 20 --max-lote 32
+python carga_servicio.py --lanzar --modo modelo --idiomas omitir
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from enrutador_idioma import MODOS_ENRUTADO, RUTA_OMITIDO
+from servicio_sentimiento import leer_mensaje_http, MODOS_SERVICIO, VENTANA_MS, MAX_LOTE
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))] if ordenados else 0
+
+
+def cargar_textos(n, archivo=None, semilla=42):
+    """`n` textos: del archivo de resultados (repetidos si hacen falta) o del corpus sintético."""
+    if archivo:
+        from lector_resultados import leer_tweets
+        textos = [t['texto'] for t in leer_tweets(archivo)]
+        return [textos[i % len(textos)] for i in range(n)]
+    from corpus_sintetico import generar_corpus
+    return generar_corpus(n, semilla)
+
+
+async def peticion(lector, escritor, metodo, ruta, cuerpo=None):
+    """Envía una petición por una conexión keep-alive; devuelve (código, JSON de la respuesta)."""
+    datos = json.dumps(cuerpo, ensure_ascii=False).encode('utf-8') if cuerpo is not None else b''
+    escritor.write((f"{metodo} {ruta} HTTP/1.1\r\nHost: localhost\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(datos)}\r\n\r\n").encode('latin-1') + datos)
+    await escritor.drain()
+    primera, _, respuesta = await leer_mensaje_http(lector)
+    return int(primera.split(' ', 2)[1]), json.loads(respuesta or b'null')
+
+
+async def _cliente(host, puerto, cola, latencias, errores, omitidos):
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        while True:
+            try:
+                texto = cola.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            inicio = time.perf_counter()
+            codigo, respuesta = await peticion(lector, escritor, 'POST', '/analizar', {'texto': texto})
+            if codigo == 200 and respuesta.get('ruta_idioma') == RUTA_OMITIDO:
+                # Respondido sin pasar por el modelo: contarlo inflaría el rendimiento
+                omitidos.append(time.perf_counter() - inicio)
+            elif codigo == 200:
+                latencias.append(time.perf_counter() - inicio)
+            else:
+                errores.append(codigo)
+    finally:
+        escritor.close()
+
+
+async def estado_servicio(host, puerto):
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        return (await peticion(lector, escritor, 'GET', '/estado'))[1]
+    finally:
+        escritor.close()
+
+
+async def ejecutar_carga(host, puerto, textos, concurrencia):
+    """Reparte `textos` entre `concurrencia` clientes; devuelve las métricas de la ronda."""
+    previo = await estado_servicio(host, puerto)
+    cola = asyncio.Queue()
+    for texto in textos:
+        cola.put_nowait(texto)
+    latencias, errores, omitidos = [], [], []
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(host, puerto, cola, latencias, errores, omitidos)
+                           for _ in range(concurrencia)))
+    total = time.perf_counter() - inicio
+
+    final = await estado_servicio(host, puerto)
+    lotes = final['lotes'] - previo['lotes']
+    return {
+        'peticiones': len(textos),
+        'errores': len(errores),
+        'omitidos': len(omitidos),
+        'segundos': total,
+        'textos_s': len(latencias) / total if total else 0.0,
+        'p50_ms': percentil(latencias, 0.5) * 1000,
+        'p90_ms': percentil(latencias, 0.9) * 1000,
+        'p99_ms': percentil(latencias, 0.99) * 1000,
+        'max_ms': max(latencias, default=0) * 1000,
+        'lote_medio': (final['textos_en_lotes'] - previo['textos_en_lotes']) / lotes if lotes else 0.0
+    }
+
+
+async def esperar_servicio(host, puerto, proceso, limite=300):
+    """Espera a que el servicio acepte conexiones (la carga de modelos puede tardar)."""
+    fin = time.time() + limite
+    while time.time() < fin:
+        if proceso is not None and proceso.poll() is not None:
+            raise RuntimeError(f"el servicio terminó con código {proceso.returncode}")
+        try:
+            return await estado_servicio(host, puerto)
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"el servicio no respondió en {limite}s")
+
+
+def lanzar_servicio(args, ventana_ms):
+    comando = [sys.executable, 'servicio_sentimiento.py', '--host', args.host, '--puerto', str(args.puerto),
+               '--modo', args.modo, '--max-lote', str(args.max_lote), '--ventana-ms', str(ventana_ms),
+               '--idiomas', args.idiomas, '--cache', '']
+    return subprocess.Popen(comando, cwd=DIRECTORIO, stdout=subprocess.DEVNULL)
+
+
+def detener_servicio(proceso):
+    proceso.terminate()
+    try:
+        proceso.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga concurrente contra el servicio de sentimiento local")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8080)
+    parser.add_argument('--peticiones', type=int, default=2000)
+    parser.add_argument('--concurrencia', type=int, nargs='+', default=[1, 8, 32, 64],
+                        help="Clientes simultáneos (una ronda por valor)")
+    parser.add_argument('--archivo', default=None, help="Textos de un archivo de resultados en lugar del corpus sintético")
+    parser.add_argument('--calentamiento', type=int, default=50, help="Peticiones previas que no se miden")
+    parser.add_argument('--lanzar', action='store_true', help="Arrancar el servicio en un subproceso")
+    parser.add_argument('--modo', default='modelo', choices=MODOS_SERVICIO, help="Con --lanzar")
+    parser.add_argument('--idiomas', default='ninguno', choices=list(MODOS_ENRUTADO) + ['ninguno'],
+                        help="Con --lanzar")
+    parser.add_argument('--max-lote', type=int, default=MAX_LOTE, help="Con --lanzar")
+    parser.add_argument('--ventana-ms', type=float, nargs='+', default=[VENTANA_MS],
+                        help="Con --lanzar: una ejecución del servicio por ventana")
+    args = parser.parse_args()
+
+    textos = cargar_textos(args.peticiones + args.calentamiento, args.archivo)
+    ventanas = args.ventana_ms if args.lanzar else [None]
+
+    print(f"\n{'='*70}")
+    print(f"CARGA SOBRE EL SERVICIO DE SENTIMIENTO - {args.peticiones} peticiones por ronda")
+    print(f"{'='*70}\n")
+    print(f"{'Ventana':>8} {'Clientes':>9} {'Textos/s':>10} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p99 ms':>8} {'máx ms':>8} {'Lote':>6} {'Errores':>8} {'Omitidos':>9}")
+    print("-" * 93)
+
+    for ventana in ventanas:
+        proceso = lanzar_servicio(args, ventana) if args.lanzar else None
+        try:
+            estado = asyncio.run(esperar_servicio(args.host, args.puerto, proceso))
+            etiqueta = f"{estado['ventana_ms']:g}"
+            if args.calentamiento:
+                asyncio.run(ejecutar_carga(args.host, args.puerto, textos[:args.calentamiento], 4))
+            for concurrencia in args.concurrencia:
+                r = asyncio.run(ejecutar_carga(args.host, args.puerto, textos[args.calentamiento:], concurrencia))
+                print(f"{etiqueta:>8} {concurrencia:>9} {r['textos_s']:>10.1f} {r['p50_ms']:>8.1f} "
+                      f"{r['p90_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['max_ms']:>8.1f} {r['lote_medio']:>6.1f} "
+                      f"{r['errores']:>8} {r['omitidos']:>9}")
+        finally:
+            if proceso is not None:
+                detener_servicio(proceso)
+
+    print(f"\n{'='*70}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+GENERADOR DE CORPUS SINTÉTICO EN ESPAÑOL
+Produce tweets o reseñas sintéticas reproducibles (misma semilla -> mismos
+textos) para medir rendimiento sin depender de la API ni de datos reales.
+
+El vocabulario sale de los recursos del repositorio:
+- Palabras con carga positiva/negativa de lexico_afinn.csv
+- Palabras "neutras" de corpus_gernika.txt
+- Stopwords frecuentes del español (las de los ejercicios 02-05)
+
+Los documentos se generan de forma perezosa, así que sirven para corpus de
+millones de textos sin tenerlos todos en memoria.
+"""
+
+import hashlib
+import os
+import random
+import re
+from itertools import accumulate, islice
+
+from puntuador_lexico import cargar_lexico_afinn, RUTA_LEXICO_AFINN
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+RUTA_CORPUS_NEUTRO = os.path.join(DIRECTORIO, 'corpus_gernika.txt')
+
+STOPWORDS_ES = (
+    'de', 'la', 'que', 'el', 'en', 'y', 'a', 'los', 'del', 'las', 'un', 'por', 'con', 'no', 'una', 'su',
+    'para', 'es', 'al', 'lo', 'como', 'más', 'pero', 'sus', 'le', 'ha', 'me', 'sin', 'sobre', 'este', 'ya',
+    'entre', 'cuando', 'todo', 'esta', 'ser', 'son', 'dos', 'también', 'fue', 'había', 'era', 'muy', 'hasta',
+    'desde', 'mucho', 'hacia', 'mi', 'se', 'ni', 'ese', 'yo', 'qué', 'e', 'o', 'u'
+)
+
+TIPOS = {
+    # tipo: (mín. palabras, máx. palabras, proporción de stopwords, proporción de palabras con carga)
+    'tweet': (6, 30, 0.35, 0.15),
+    'resena': (20, 90, 0.40, 0.10)
+}
+
+# Sesgo de polaridad de cada documento: (peso positivas, peso negativas)
+SESGOS = ((0.75, 0.25), (0.25, 0.75), (0.5, 0.5))
+
+# Tamaño de los lotes con los que se generan y consumen los documentos
+TAM_LOTE = 10000
+
+
+def _vocabulario(ruta_lexico=RUTA_LEXICO_AFINN, ruta_neutro=RUTA_CORPUS_NEUTRO):
+    """(positivas, negativas, neutras) ordenadas para que el corpus no dependa del orden de los archivos."""
+    lexico = cargar_lexico_afinn(ruta_lexico)
+    # Solo palabras sueltas: las expresiones de varias palabras se dividirían al tokenizar
+    positivas = sorted(p for p, v in lexico.items() if v > 0 and ' ' not in p)
+    negativas = sorted(p for p, v in lexico.items() if v < 0 and ' ' not in p)
+    with open(ruta_neutro, 'r', encoding='utf-8') as f:
+        palabras = re.findall(r'\b\w+\b', f.read().lower())
+    excluidas = set(STOPWORDS_ES) | set(lexico)
+    neutras = sorted({p for p in palabras if p not in excluidas and not p.isdigit()})
+    return positivas, negativas, neutras
+
+
+class GeneradorCorpus:
+    """Generador reproducible de textos sintéticos ('tweet' o 'resena')."""
+
+    def __init__(self, semilla=42, tipo='tweet', ruta_lexico=RUTA_LEXICO_AFINN, ruta_neutro=RUTA_CORPUS_NEUTRO):
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo '{tipo}' no válido. Opciones: {', '.join(TIPOS)}")
+        self.semilla = semilla
+        self.tipo = tipo
+        self.positivas, self.negativas, self.neutras = _vocabulario(ruta_lexico, ruta_neutro)
+
+        # Una población única y unos pesos acumulados por sesgo: cada palabra se elige con
+        # una sola llamada a random.choices por documento
+        self._poblacion = list(STOPWORDS_ES) + self.positivas + self.negativas + self.neutras
+        _, _, p_stop, p_carga = TIPOS[tipo]
+        p_neutra = 1.0 - p_stop - p_carga
+        self._pesos_acumulados = []
+        for peso_pos, peso_neg in SESGOS:
+            pesos = ([p_stop / len(STOPWORDS_ES)] * len(STOPWORDS_ES)
+                     + [p_carga * peso_pos / len(self.positivas)] * len(self.positivas)
+                     + [p_carga * peso_neg / len(self.negativas)] * len(self.negativas)
+                     + [p_neutra / len(self.neutras)] * len(self.neutras))
+            self._pesos_acumulados.append(list(accumulate(pesos)))
+
+    def _documento(self, rng):
+        minimo, maximo, _, _ = TIPOS[self.tipo]
+        palabras = rng.choices(self._poblacion, cum_weights=rng.choice(self._pesos_acumulados),
+                               k=rng.randint(minimo, maximo))
+        palabras[0] = palabras[0].capitalize()
+
+        if self.tipo == 'tweet':
+            if rng.random() < 0.3:
+                palabras.insert(0, f"@usuario{rng.randrange(5000)}")
+            if rng.random() < 0.3:
+                palabras.append(f"#{rng.choice(self.neutras)}")
+            if rng.random() < 0.1:
+                palabras.append(f"https://t.co/{rng.randrange(16 ** 8):08x}")
+            return ' '.join(palabras) + rng.choice(('', '.', '!', '!!', '?'))
+
+        # Reseñas: varias frases separadas por punto
+        cortes = sorted(rng.sample(range(1, len(palabras)), k=min(3, len(palabras) - 1)))
+        frases = [' '.join(palabras[a:b]) for a, b in zip([0] + cortes, cortes + [len(palabras)])]
+        return '. '.join(frases) + '.'
+
+    def textos(self, n):
+        """Itera `n` textos (siempre los mismos para la misma semilla y tipo)."""
+        rng = random.Random(f"{self.semilla}:{self.tipo}")
+        for _ in range(n):
+            yield self._documento(rng)
+
+    def lotes(self, n, tam_lote=TAM_LOTE):
+        """Los mismos `n` textos agrupados en listas de `tam_lote`."""
+        iterador = self.textos(n)
+        while True:
+            lote = list(islice(iterador, tam_lote))
+            if not lote:
+                return
+            yield lote
+
+    def huella(self, n=1000):
+        """SHA-1 de los primeros `n` textos: identifica el corpus en el historial de benchmarks."""
+        h = hashlib.sha1()
+        for texto in self.textos(n):
+            h.update(texto.encode('utf-8'))
+            h.update(b'\n')
+        return h.hexdigest()[:12]
+
+
+def generar_corpus(n, semilla=42, tipo='tweet'):
+    """Atajo: lista con `n` textos sintéticos."""
+    return list(GeneradorCorpus(semilla, tipo).textos(n))
@@ -0,0 +1,119 @@
+"""
+DIRECTORIO PERSISTENTE DE USUARIOS DE TWITTER
+Caché username -> {id, username, name, verified} guardada en JSON.
+
+Los ids de usuario no cambian, así que una lista de cuentas vigiladas se
+resuelve con una sola petición por cada 100 usernames nuevos (límite de
+/2/users/by) y con ninguna en las ejecuciones siguientes. Los metadatos
+(nombre, verificado) se refrescan pasado un tiempo, y los usernames que
+no existen también se recuerdan durante un día para no repetir la consulta.
+"""
+
+import json
+import os
+import threading
+import time
+
+# Máximo de usernames por petición de búsqueda en lote de la API v2
+MAX_USUARIOS_POR_LOTE = 100
+
+CAMPOS_USUARIO = ['username', 'name', 'verified']
+
+
+class DirectorioUsuarios:
+    """Resuelve usernames en lote apoyándose en una caché persistente.
+
+    ttl_segundos: antigüedad máxima de los metadatos guardados
+    ttl_no_encontrados: cuánto se recuerda que un username no existe
+    """
+
+    def __init__(self, ruta="usuarios_cache.json", ttl_segundos=7 * 24 * 3600, ttl_no_encontrados=24 * 3600):
+        self.ruta = ruta
+        self.ttl_segundos = ttl_segundos
+        self.ttl_no_encontrados = ttl_no_encontrados
+        self._candado = threading.Lock()
+        self._usuarios = self._cargar()
+        self.aciertos = 0
+        self.peticiones = 0
+
+    def _cargar(self):
+        if self.ruta and os.path.exists(self.ruta):
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _guardar(self):
+        if not self.ruta:
+            return
+        temporal = self.ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(self._usuarios, f, ensure_ascii=False, indent=2)
+        os.replace(temporal, self.ruta)
+
+    def _vigente(self, entrada, ahora):
+        ttl = self.ttl_no_encontrados if entrada.get('no_encontrado') else self.ttl_segundos
+        return ahora - entrada.get('_guardado', 0) < ttl
+
+    def resolver(self, usernames, consultar_lote):
+        """Devuelve {username_en_minúsculas: dict de usuario o None}.
+
+        consultar_lote(lista_usernames) -> lista de dicts de usuario; se llama
+        solo para los usernames que no están en caché, de 100 en 100.
+        """
+        ahora = time.time()
+        resultado = {}
+        pendientes = []
+        with self._candado:
+            for username in dict.fromkeys(u.lstrip('@').lower() for u in usernames if u):
+                entrada = self._usuarios.get(username)
+                if entrada and self._vigente(entrada, ahora):
+                    self.aciertos += 1
+                    resultado[username] = None if entrada.get('no_encontrado') else self._limpiar(entrada)
+                else:
+                    pendientes.append(username)
+
+        if not pendientes:
+            return resultado
+
+        encontrados = {}
+        for i in range(0, len(pendientes), MAX_USUARIOS_POR_LOTE):
+            self.peticiones += 1
+            for usuario in consultar_lote(pendientes[i:i + MAX_USUARIOS_POR_LOTE]):
+                encontrados[usuario['username'].lower()] = usuario
+
+        with self._candado:
+            for username in pendientes:
+                usuario = encontrados.get(username)
+                if usuario:
+                    self._usuarios[username] = dict(self._limpiar(usuario), _guardado=ahora)
+                else:
+                    self._usuarios[username] = {'no_encontrado': True, '_guardado': ahora}
+                resultado[username] = usuario and self._limpiar(usuario)
+            self._guardar()
+        return resultado
+
+    def resolver_uno(self, username, consultar_lote):
+        return self.resolver([username], consultar_lote).get(username.lstrip('@').lower())
+
+    @staticmethod
+    def _limpiar(usuario):
+        return {
+            'id': str(usuario['id']),
+            'username': usuario['username'],
+            'name': usuario.get('name', usuario['username']),
+            'verified': usuario.get('verified', False)
+        }
+
+    def resumen(self):
+        return f"Directorio de usuarios: {len(self._usuarios)} en caché, {self.aciertos} aciertos, {self.peticiones} peticiones"
+
+
+def consulta_tweepy(twitter_client):
+    """Función de consulta en lote para DirectorioUsuarios usando tweepy.Client.get_users."""
+    def consultar(lote):
+        respuesta = twitter_client.get_users(usernames=lote, user_fields=CAMPOS_USUARIO)
+        return [
+            {'id': u.id, 'username': u.username, 'name': u.name, 'verified': getattr(u, 'verified', False)}
+            for u in respuesta.data or []
+        ]
+    return consultar
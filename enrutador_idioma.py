@@ -0,0 +1,297 @@
+"""
+ENRUTADO DE TWEETS POR IDIOMA ANTES DE LA INFERENCIA
+Evita pasar por los modelos en español tweets en inglés, catalán o de idioma
+indeterminado (etiquetas sin sentido e inferencia desperdiciada):
+
+- El idioma sale del campo 'idioma' de la API (tweet.lang) cuando es un
+  código real; con 'und', 'qme', 'zxx', 'N/A'... se usa un identificador
+  rápido por trigramas de caracteres con perfiles incluidos en el módulo
+- Los tweets en el idioma principal ('es') van al motor principal, y también
+  los que ni la API ni el identificador deciden (se suponen en 'es')
+- Los identificados en otro idioma se omiten (modo 'omitir') o, en modo 'enrutar', va a un motor del
+  mismo idioma si pysentimiento tiene modelos para él (en, it, pt)
+- Cada tweet guarda la decisión: 'idioma_detectado', 'idioma_fuente'
+  ('api', 'ngramas', 'defecto' o None) y 'ruta_idioma' (idioma del modelo u 'omitido')
+"""
+
+import math
+import re
+from collections import Counter
+
+from motor_analisis import inferir_textos, construir_tweet_analizado
+
+# Idiomas con modelos de sentimiento, emoción y odio en pysentimiento
+IDIOMAS_MODELO = ('es', 'en', 'it', 'pt')
+
+MODOS_ENRUTADO = ('omitir', 'enrutar')
+
+# Códigos de la API que no identifican un idioma (indeterminado, solo medios,
+# solo hashtags, solo menciones, sin texto...)
+CODIGOS_SIN_IDIOMA = {'und', 'qme', 'qht', 'qam', 'qct', 'qst', 'zxx', 'art', 'n/a', ''}
+
+RUTA_OMITIDO = 'omitido'
+
+# Textos de referencia para los perfiles de trigramas: palabras funcionales y
+# frases frecuentes en redes (lo que mejor separa idiomas en textos cortos)
+TEXTOS_REFERENCIA = {
+    'es': (
+        "el la los las de del que y en un una por con no para es al lo como pero sus le ya o este "
+        "porque esta entre cuando muy sin sobre también me hasta hay donde quien desde todo nos "
+        "durante todos uno les ni contra otros ese eso ante ellos esto antes algunos qué unos yo "
+        "otro otras otra él tanto esa estos mucho quienes nada muchos cual poco ella estar estas "
+        "algunas algo nosotros mi mis tú te ti tu tus vosotros hoy mañana ayer gobierno gente "
+        "no me gusta nada lo que está pasando en el país. qué buen día hace en madrid, vamos "
+        "a la playa con los amigos. el partido de anoche fue increíble, ganamos por fin. estoy "
+        "harto de las mentiras de los políticos. gracias a todos por vuestro apoyo, sois los "
+        "mejores. mañana hay huelga de transporte y no sé cómo voy a llegar al trabajo. "
+        "el presidente anunció ayer nuevas medidas económicas para las familias españolas. "
+        "la comunidad de madrid y la generalitat negocian la financiación de los hospitales. "
+        "según los datos publicados, el precio de la vivienda sube por octavo año consecutivo."
+    ),
+    'en': (
+        "the of and to in is you that it he was for on are as with his they at be this have from "
+        "or one had by word but not what all were we when your can said there use an each which "
+        "she do how their if will up other about out many then them these so some her would make "
+        "like him into time has look two more write go see number no way could people my than "
+        "i don't like what is happening in the country. what a great day, we are going to the "
+        "beach with friends. last night's game was amazing, we finally won. i'm tired of the "
+        "politicians lying to us. thanks everyone for your support, you are the best. tomorrow "
+        "there is a transport strike and i don't know how i'll get to work."
+    ),
+    'pt': (
+        "o a os as de do da dos das que e em um uma por com não para é ao como mas seus lhe já ou "
+        "este porque esta entre quando muito sem sobre também me até há onde quem desde tudo nós "
+        "durante todos eles isso isto você vocês ela ele nada muitos pouco estar estas algo meu "
+        "minha hoje amanhã ontem governo gente então obrigado obrigada está são foi ser tem "
+        "não gosto nada do que está acontecendo no país. que dia lindo, vamos à praia com os "
+        "amigos. o jogo de ontem à noite foi incrível, finalmente ganhamos. estou cansado das "
+        "mentiras dos políticos. obrigado a todos pelo apoio, vocês são os melhores. amanhã tem "
+        "greve dos transportes e não sei como vou chegar ao trabalho. "
+        "o presidente anunciou ontem novas medidas econômicas para as famílias brasileiras. "
+        "segundo os dados publicados, o preço da habitação sobe pelo oitavo ano consecutivo."
+    ),
+    'ca': (
+        "el la els les de del que i en un una per amb no és al com però seus li ja o aquest "
+        "perquè aquesta entre quan molt sense sobre també em fins hi ha on qui des de tot ens "
+        "durant tots ells això aquí vosaltres ella ell res molts poc estar aquestes alguna cosa "
+        "meu meva avui demà ahir govern gent doncs gràcies està són va ser té nosaltres "
+        "no m'agrada gens el que està passant al país. quin dia més bonic, anem a la platja amb "
+        "els amics. el partit d'ahir a la nit va ser increïble, per fi vam guanyar. estic fart "
+        "de les mentides dels polítics. gràcies a tothom pel suport, sou els millors. demà hi ha "
+        "vaga de transport i no sé com arribaré a la feina. "
+        "el president va anunciar ahir noves mesures econòmiques per a les famílies catalanes. "
+        "segons les dades publicades, el preu de l'habitatge puja per vuitè any consecutiu."
+    ),
+    'it': (
+        "il lo la i gli le di del della che e in un una per con non è al come ma suoi gli già o "
+        "questo perché questa tra quando molto senza sopra anche mi fino ci dove chi da tutto "
+        "noi durante tutti loro questo qui voi lei lui niente molti poco essere queste qualcosa "
+        "mio mia oggi domani ieri governo gente allora grazie sono stato ha abbiamo "
+        "non mi piace niente di quello che sta succedendo nel paese. che bella giornata, andiamo "
+        "al mare con gli amici. la partita di ieri sera è stata incredibile, finalmente abbiamo "
+        "vinto. sono stanco delle bugie dei politici. grazie a tutti per il sostegno, siete i "
+        "migliori. domani c'è sciopero dei trasporti e non so come arriverò al lavoro."
+    ),
+    'fr': (
+        "le la les de du des que et en un une pour avec ne pas est au comme mais ses lui déjà ou "
+        "ce cette parce que entre quand très sans sur aussi me jusqu il y a où qui depuis tout "
+        "nous pendant tous eux ceci ici vous elle il rien beaucoup peu être ces quelque chose "
+        "mon ma aujourd'hui demain hier gouvernement gens alors merci sont été avons c'est "
+        "je n'aime pas du tout ce qui se passe dans le pays. quelle belle journée, on va à la "
+        "plage avec les amis. le match d'hier soir était incroyable, on a enfin gagné. j'en ai "
+        "marre des mensonges des politiciens. merci à tous pour votre soutien, vous êtes les "
+        "meilleurs. demain il y a une grève des transports et je ne sais pas comment aller au travail."
+    ),
+    'de': (
+        "der die das und in den von zu mit sich des auf für ist im dem nicht ein eine als auch "
+        "es an werden aus er hat dass sie nach wird bei einer um am sind noch wie einem über "
+        "einen so zum war haben nur oder aber vor zur bis mehr durch man sein wurde sei heute "
+        "morgen gestern regierung leute danke ich wir ihr mein meine "
+        "mir gefällt überhaupt nicht, was im land passiert. was für ein schöner tag, wir gehen "
+        "mit freunden an den strand. das spiel gestern abend war unglaublich, endlich haben wir "
+        "gewonnen. ich habe die lügen der politiker satt. danke an alle für die unterstützung, "
+        "ihr seid die besten. morgen ist verkehrsstreik und ich weiß nicht, wie ich zur arbeit komme."
+    ),
+    'eu': (
+        "eta da ez du bat ere baina edo hau hori hura ni zu gu zuek haiek nire zure gure bere "
+        "oso gabe gainean baita hemen han non nor zer nola noiz zergatik gaur bihar atzo "
+        "gobernua jendea eskerrik asko dago daude izan dugu dute naiz zara gara "
+        "ez zait batere gustatzen herrian gertatzen ari dena. zer egun polita, lagunekin "
+        "hondartzara goaz. bart gaueko partida izugarria izan zen, azkenean irabazi dugu. "
+        "politikarien gezurrez nazkatuta nago. eskerrik asko guztioi zuen laguntzagatik, "
+        "onenak zarete. bihar garraio greba dago eta ez dakit nola iritsiko naizen lanera."
+    ),
+}
+
+# Palabras (letras solamente) sin URLs, menciones ni números
+RE_RUIDO = re.compile(r"https?://\S*|www\.\S+|[@#]\w+|^RT\b")
+RE_PALABRA = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+
+def _trigramas(texto):
+    """Trigramas de caracteres de cada palabra con espacios de relleno (' de' 'de ')."""
+    trigramas = []
+    for palabra in RE_PALABRA.findall(RE_RUIDO.sub(' ', texto).lower()):
+        relleno = f" {palabra} "
+        trigramas.extend(relleno[i:i + 3] for i in range(len(relleno) - 2))
+    return trigramas
+
+
+class IdentificadorIdioma:
+    """Identificador de idioma bayesiano ingenuo sobre trigramas de caracteres.
+
+    min_trigramas: por debajo, el texto es demasiado corto y se devuelve None.
+    margen_minimo: diferencia mínima de log-verosimilitud total (nats) entre el
+    mejor idioma y el segundo para aceptar la decisión; los textos largos
+    acumulan evidencia aunque cada trigrama aporte poco.
+    """
+
+    def __init__(self, textos=None, min_trigramas=8, margen_minimo=3.0):
+        self.min_trigramas = min_trigramas
+        self.margen_minimo = margen_minimo
+        conteos = {idioma: Counter(_trigramas(texto)) for idioma, texto in (textos or TEXTOS_REFERENCIA).items()}
+        vocabulario = len(set().union(*conteos.values())) + 1
+
+        # Log-probabilidades con suavizado de Laplace, precalculadas una vez
+        self.idiomas = list(conteos)
+        self._log_prob = {}
+        self._log_desconocido = {}
+        for idioma, conteo in conteos.items():
+            total = sum(conteo.values()) + vocabulario
+            self._log_prob[idioma] = {g: math.log((c + 1) / total) for g, c in conteo.items()}
+            self._log_desconocido[idioma] = math.log(1 / total)
+
+    def puntuar(self, trigramas):
+        """Log-verosimilitud de los trigramas (Counter) en cada idioma."""
+        puntuaciones = {}
+        for idioma in self.idiomas:
+            log_prob = self._log_prob[idioma]
+            desconocido = self._log_desconocido[idioma]
+            puntuaciones[idioma] = sum(c * log_prob.get(g, desconocido) for g, c in trigramas.items())
+        return puntuaciones
+
+    def detectar(self, texto):
+        """(idioma, margen) del texto, o (None, margen) si es corto o ambiguo."""
+        trigramas = _trigramas(texto)
+        if len(trigramas) < self.min_trigramas:
+            return None, 0.0
+        ordenadas = sorted(self.puntuar(Counter(trigramas)).items(), key=lambda p: p[1], reverse=True)
+        margen = ordenadas[0][1] - ordenadas[1][1]
+        return (ordenadas[0][0] if margen >= self.margen_minimo else None), margen
+
+
+def idioma_api(tweet):
+    """Código de idioma de la API si identifica un idioma real, o None."""
+    codigo = (tweet.get('idioma') or '').strip().lower()
+    if codigo in CODIGOS_SIN_IDIOMA:
+        return None
+    return codigo.split('-')[0]  # 'en-gb' -> 'en'
+
+
+class EnrutadorIdioma:
+    """Reparte los tweets entre motores por idioma y registra la decisión en cada resultado.
+
+    modo: 'omitir' (solo el idioma principal llega a un modelo) o 'enrutar'
+    (los idiomas de IDIOMAS_MODELO van a un motor propio creado con `fabrica_motor(lang)`
+    la primera vez que aparecen).
+    por_defecto: idioma supuesto cuando ni la API ni el identificador deciden;
+    por defecto el principal, de modo que solo se omiten los tweets identificados
+    en otro idioma (None = también se omiten los indeterminados).
+    """
+
+    def __init__(self, motor, modo='omitir', fabrica_motor=None, identificador=None,
+                 idioma_principal='es', por_defecto='es'):
+        if modo not in MODOS_ENRUTADO:
+            raise ValueError(f"Modo '{modo}' no válido. Opciones: {', '.join(MODOS_ENRUTADO)}")
+        if modo == 'enrutar' and fabrica_motor is None:
+            raise ValueError("El modo 'enrutar' necesita fabrica_motor")
+        self.modo = modo
+        self.fabrica_motor = fabrica_motor
+        self.idioma_principal = idioma_principal
+        self.por_defecto = por_defecto
+        self._identificador = identificador
+        self.motores = {idioma_principal: motor}
+        self.rutas = Counter()
+        self.fuentes = Counter()
+
+    @property
+    def identificador(self):
+        # Los perfiles se construyen solo si algún tweet llega sin idioma de la API
+        if self._identificador is None:
+            self._identificador = IdentificadorIdioma()
+        return self._identificador
+
+    def decidir(self, tweet, texto=None):
+        """{'idioma_detectado', 'idioma_fuente', 'ruta_idioma'} para un tweet."""
+        idioma, fuente = idioma_api(tweet), 'api'
+        if idioma is None:
+            idioma, _ = self.identificador.detectar(texto if texto is not None else tweet['texto'])
+            fuente = 'ngramas' if idioma else None
+        if idioma is None and self.por_defecto:
+            idioma, fuente = self.por_defecto, 'defecto'
+
+        if idioma == self.idioma_principal:
+            ruta = idioma
+        elif self.modo == 'enrutar' and idioma in IDIOMAS_MODELO:
+            ruta = idioma
+        else:
+            ruta = RUTA_OMITIDO
+        return {'idioma_detectado': idioma, 'idioma_fuente': fuente, 'ruta_idioma': ruta}
+
+    def decidir_varios(self, tweets, textos=None):
+        """Decisiones de `decidir` para varios tweets, contadas en el resumen del enrutador."""
+        textos = textos if textos is not None else [None] * len(tweets)
+        decisiones = [self.decidir(t, texto) for t, texto in zip(tweets, textos)]
+        for decision in decisiones:
+            self.rutas[decision['ruta_idioma']] += 1
+            self.fuentes[decision['idioma_fuente']] += 1
+        return decisiones
+
+    def motor_para(self, idioma):
+        if idioma not in self.motores:
+            print(f"  Preparando motor de análisis para '{idioma}'...")
+            principal = self.motores[self.idioma_principal]
+            self.motores[idioma] = self.fabrica_motor(idioma, principal.tareas)
+        return self.motores[idioma]
+
+    def analizar(self, tweets, textos=None, cache=None, tareas=None, progreso=True, decisiones=None):
+        """Tweets analizados (en el orden de entrada) con la decisión de enrutado en cada uno.
+
+        textos: lo que recibe el modelo (p. ej. ya preprocesado); por defecto tweet['texto'].
+        decisiones: las de `decidir_varios` si ya se tomaron (no se vuelven a contar).
+        Los tweets omitidos se devuelven sin campos de análisis.
+        """
+        textos = textos if textos is not None else [t['texto'] for t in tweets]
+        if decisiones is None:
+            decisiones = self.decidir_varios(tweets)
+
+        grupos = {}
+        for i, decision in enumerate(decisiones):
+            grupos.setdefault(decision['ruta_idioma'], []).append(i)
+
+        resultados = [{} for _ in tweets]
+        for ruta, indices in grupos.items():
+            if ruta == RUTA_OMITIDO:
+                continue
+            salidas = inferir_textos([textos[i] for i in indices], self.motor_para(ruta), cache, tareas, progreso)
+            for i, salida in zip(indices, salidas):
+                resultados[i] = salida
+
+        tweets_analizados = []
+        for tweet, resultado, decision in zip(tweets, resultados, decisiones):
+            tweet_analizado = construir_tweet_analizado(tweet, resultado)
+            tweet_analizado.update(decision)
+            tweets_analizados.append(tweet_analizado)
+        return tweets_analizados
+
+    def resumen(self):
+        total = sum(self.rutas.values())
+        rutas = ', '.join(f"{ruta} {n}" for ruta, n in self.rutas.most_common())
+        fuentes = ', '.join(f"{fuente or 'sin decidir'} {n}" for fuente, n in self.fuentes.most_common())
+        return f"Enrutado por idioma ({self.modo}): {total} tweets -> {rutas or 'ninguno'} | fuente: {fuentes or '-'}"
+
+    def cerrar(self):
+        """Cierra los motores creados por el enrutador (el principal lo cierra quien lo creó)."""
+        for idioma, motor in self.motores.items():
+            if idioma != self.idioma_principal:
+                motor.cerrar()
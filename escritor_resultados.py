@@ -0,0 +1,152 @@
+"""
+ESCRITOR INCREMENTAL DE RESULTADOS
+Guarda los tweets analizados a medida que se producen, en lugar de volcar
+un único JSON indentado al final:
+
+- NDJSON (.jsonl): una línea JSON compacta por tweet; cada lote se vuelca
+  a disco, así que un corte solo pierde el lote en curso
+- Parquet (.parquet, requiere pyarrow): esquema explícito para los campos
+  conocidos de tweet_analizado (scores como map<string, float64>, 'odio' como
+  list<string>, campos de análisis nulables) y un grupo de filas por lote.
+  Los campos desconocidos se añaden con el tipo inferido del primer lote; si
+  aparecen después, se lanza un error en lugar de descartarlos
+
+Los metadatos del resumen (total, fecha, estadísticas) van en un archivo
+aparte pequeño: <salida>.meta.json.
+"""
+
+import importlib.util
+import json
+import os
+from datetime import datetime
+
+# pyarrow se importa al abrir el primer escritor Parquet, no al importar el módulo
+PYARROW_DISPONIBLE = importlib.util.find_spec('pyarrow') is not None
+
+FORMATOS = ('ndjson', 'parquet')
+
+
+def formato_por_extension(ruta):
+    return 'parquet' if ruta.endswith('.parquet') else 'ndjson'
+
+
+def ruta_metadatos(ruta):
+    return ruta + '.meta.json'
+
+
+def _campos_conocidos():
+    """(nombre, tipo) de los campos de tweet_analizado, en el orden de las columnas."""
+    import pyarrow as pa
+
+    scores = pa.map_(pa.string(), pa.float64())
+    return [
+        # Tweet descargado
+        ('id', pa.string()), ('texto', pa.string()), ('fecha', pa.string()),
+        ('autor_username', pa.string()), ('autor_nombre', pa.string()), ('verificado', pa.bool_()),
+        ('idioma', pa.string()), ('likes', pa.int64()), ('retweets', pa.int64()), ('respuestas', pa.int64()),
+        # Análisis (nulos en los tweets omitidos o sin esa tarea)
+        ('sentimiento', pa.string()), ('sentimiento_confianza', pa.float64()),
+        ('sentimiento_scores', scores), ('sentimiento_etapa', pa.string()),
+        ('emocion', pa.string()), ('emocion_confianza', pa.float64()), ('emocion_scores', scores),
+        ('odio', pa.list_(pa.string())), ('odio_scores', scores),
+        ('lexico_puntaje', pa.float64()), ('lexico_normalizado', pa.float64()),
+        ('tokens_ahorrados', pa.int64()),
+        ('idioma_detectado', pa.string()), ('idioma_fuente', pa.string()), ('ruta_idioma', pa.string()),
+    ]
+
+
+def esquema_arrow(tweets):
+    """Esquema explícito de los campos conocidos más los desconocidos del primer lote (tipo inferido)."""
+    import pyarrow as pa
+
+    campos = _campos_conocidos()
+    conocidos = {nombre for nombre, _ in campos}
+    extra = list(dict.fromkeys(c for t in tweets for c in t if c not in conocidos))
+    if extra:
+        inferido = pa.Table.from_pylist([{c: t.get(c) for c in extra} for t in tweets]).schema
+        for campo in inferido:
+            # Columna sin ningún valor en el primer lote: texto, para que admita valores después
+            campos.append((campo.name, pa.string() if pa.types.is_null(campo.type) else campo.type))
+    return pa.schema(campos)
+
+
+class EscritorResultados:
+    """Escribe tweets analizados por lotes en NDJSON o Parquet; usar como context manager."""
+
+    def __init__(self, ruta, formato=None):
+        self.ruta = ruta
+        self.formato = formato or formato_por_extension(ruta)
+        if self.formato not in FORMATOS:
+            raise ValueError(f"Formato '{self.formato}' no válido. Opciones: {', '.join(FORMATOS)}")
+        if self.formato == 'parquet' and not PYARROW_DISPONIBLE:
+            raise ImportError("Parquet requiere pyarrow (pip install pyarrow)")
+
+        self.total = 0
+        self.ruta_meta = None
+        self._archivo = None
+        self._escritor_parquet = None
+        self._esquema = None
+        if self.formato == 'ndjson':
+            self._archivo = open(ruta, 'w', encoding='utf-8')
+
+    def escribir(self, tweets):
+        """Añade un lote de tweets analizados y lo vuelca a disco."""
+        if not tweets:
+            return
+        if self.formato == 'ndjson':
+            self._archivo.write(''.join(
+                json.dumps(t, ensure_ascii=False, separators=(',', ':')) + '\n' for t in tweets
+            ))
+            self._archivo.flush()
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._escritor_parquet is None:
+                self._esquema = esquema_arrow(tweets)
+                self._escritor_parquet = pq.ParquetWriter(self.ruta, self._esquema, compression='zstd')
+            # Columnas ausentes quedan a null; una columna nueva no cabe en el archivo ya abierto
+            nuevas = sorted({c for t in tweets for c in t} - set(self._esquema.names))
+            if nuevas:
+                raise ValueError(f"Campos no previstos en el esquema Parquet de {self.ruta}: {', '.join(nuevas)} "
+                                 f"(añadirlos a escritor_resultados._campos_conocidos)")
+            self._escritor_parquet.write_table(pa.Table.from_pylist(tweets, schema=self._esquema))
+        self.total += len(tweets)
+
+    def cerrar(self, estadisticas=None, extra=None):
+        """Cierra la salida y escribe el archivo de metadatos; devuelve su ruta."""
+        if self.ruta_meta is not None:
+            return self.ruta_meta  # ya cerrado
+        if self._archivo is not None:
+            os.fsync(self._archivo.fileno())
+            self._archivo.close()
+            self._archivo = None
+        if self._escritor_parquet is not None:
+            self._escritor_parquet.close()
+            self._escritor_parquet = None
+
+        metadatos = {
+            'archivo': os.path.basename(self.ruta),
+            'formato': self.formato,
+            'total_tweets': self.total,
+            'fecha_analisis': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'bytes': os.path.getsize(self.ruta) if os.path.exists(self.ruta) else 0
+        }
+        if estadisticas:
+            metadatos['estadisticas'] = {
+                'sentimientos': dict(estadisticas.get('sentimientos', {})),
+                'emociones': dict(estadisticas.get('emociones', {}))
+            }
+        if extra:
+            metadatos.update(extra)
+
+        self.ruta_meta = ruta_metadatos(self.ruta)
+        with open(self.ruta_meta, 'w', encoding='utf-8') as f:
+            json.dump(metadatos, f, ensure_ascii=False, indent=2)
+        return self.ruta_meta
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
@@ -0,0 +1,160 @@
+"""
+ESTADÍSTICAS COLUMNARES DE TWEETS ANALIZADOS
+Carga los resultados una sola vez en arrays de NumPy y calcula todas las
+agregaciones con operaciones vectorizadas:
+
+- Columnas categóricas (sentimiento, emoción, autor, idioma) codificadas
+  como enteros (-1 = sin dato), con las categorías en orden de aparición
+- Distribuciones con np.bincount
+- Top-k por engagement con np.partition
+- Primer ejemplo de cada categoría con np.unique(return_index=True)
+- Agrupaciones por autor, idioma u hora con bincount sobre índices combinados
+"""
+
+from collections import Counter
+
+import numpy as np
+
+COLUMNAS_CATEGORICAS = ('sentimiento', 'emocion', 'autor_username', 'idioma')
+AGRUPACIONES = {'autor': 'autor_username', 'idioma': 'idioma', 'hora': 'hora'}
+
+
+def _codificar(valores, indices):
+    """Códigos enteros de `valores` según `indices` (que se amplía con las categorías nuevas)."""
+    # dict.fromkeys deduplica en C conservando el orden; solo se recorre en Python lo nuevo
+    for valor in dict.fromkeys(valores):
+        if valor not in indices:
+            indices[valor] = len(indices)
+    return np.fromiter(map(indices.__getitem__, valores), dtype=np.int32, count=len(valores))
+
+
+def _categorias_sin_nulos(codigos, indices):
+    """Separa None de las categorías: sus filas pasan a -1 y el resto de códigos se compactan."""
+    categorias = list(indices)
+    if None not in indices:
+        return codigos, categorias
+    nulo = indices[None]
+    codigos = np.where(codigos == nulo, -1, codigos - (codigos > nulo)).astype(np.int32)
+    categorias.pop(nulo)
+    return codigos, categorias
+
+
+def _horas(fechas):
+    """'2025-11-05 17:51:29' -> 17; -1 si la fecha no tiene hora."""
+    # Hay a lo sumo unas pocas decenas de valores distintos: se convierten una vez cada uno
+    indices = {}
+    codigos = _codificar([f[11:13] if isinstance(f, str) else '' for f in fechas], indices)
+    tabla = np.array([int(h) if h.isdigit() else -1 for h in indices], dtype=np.int8)
+    return tabla[codigos]
+
+
+class TablaTweets:
+    """Vista columnar de una lista (o iterable de lotes) de tweets analizados."""
+
+    def __init__(self, tweets=(), lotes=None):
+        indices = {c: {} for c in COLUMNAS_CATEGORICAS}
+        partes = {c: [] for c in COLUMNAS_CATEGORICAS + ('hora', 'likes', 'retweets',
+                                                        'sentimiento_confianza', 'emocion_confianza')}
+        self.textos = []
+
+        # Cada columna se extrae de una vez por lote; el resto de operaciones son vectorizadas
+        for lote in (lotes if lotes is not None else [tweets]):
+            for columna in COLUMNAS_CATEGORICAS:
+                partes[columna].append(_codificar([t.get(columna) for t in lote], indices[columna]))
+            partes['hora'].append(_horas([t.get('fecha') for t in lote]))
+            for columna in ('likes', 'retweets'):
+                partes[columna].append(np.array([t.get(columna, 0) for t in lote], dtype=np.int64))
+            for columna in ('sentimiento_confianza', 'emocion_confianza'):
+                partes[columna].append(np.array([t.get(columna, np.nan) for t in lote], dtype=np.float32))
+            self.textos.extend(t.get('texto', '') for t in lote)
+
+        def unir(columna, dtype):
+            return np.concatenate(partes[columna]) if partes[columna] else np.array([], dtype=dtype)
+
+        self.codigos = {}
+        self.categorias = {}
+        for columna in COLUMNAS_CATEGORICAS:
+            self.codigos[columna], self.categorias[columna] = _categorias_sin_nulos(
+                unir(columna, np.int32), indices[columna])
+        self.codigos['hora'] = unir('hora', np.int8)
+        self.categorias['hora'] = list(range(24))
+        self.likes = unir('likes', np.int64)
+        self.retweets = unir('retweets', np.int64)
+        self.engagement = self.likes + self.retweets
+        self.confianza = {
+            'sentimiento': unir('sentimiento_confianza', np.float32),
+            'emocion': unir('emocion_confianza', np.float32)
+        }
+
+    def __len__(self):
+        return len(self.textos)
+
+    def valor(self, columna, indice):
+        """Categoría de la fila `indice` (None si no hay dato)."""
+        codigo = self.codigos[columna][indice]
+        return self.categorias[columna][codigo] if codigo >= 0 else None
+
+    def distribucion(self, columna):
+        """Counter de la columna, con las categorías en orden de aparición (como Counter(lista))."""
+        codigos = self.codigos[columna]
+        cuentas = np.bincount(codigos[codigos >= 0], minlength=len(self.categorias[columna]))
+        return Counter({cat: int(n) for cat, n in zip(self.categorias[columna], cuentas) if n})
+
+    def top_engagement(self, k=1):
+        """Índices de los k tweets con más likes + retweets (empates: el primero en aparecer)."""
+        n = len(self)
+        if n == 0 or k <= 0:
+            return np.array([], dtype=np.int64)
+        if k < n:
+            umbral = np.partition(self.engagement, n - k)[n - k]
+            candidatos = np.flatnonzero(self.engagement >= umbral)
+        else:
+            candidatos = np.arange(n)
+        orden = np.argsort(-self.engagement[candidatos], kind='stable')
+        return candidatos[orden[:k]]
+
+    def primeros_por_categoria(self, columna):
+        """{categoría: índice de su primer tweet}."""
+        codigos = self.codigos[columna]
+        validos = np.flatnonzero(codigos >= 0)
+        unicos, primeros = np.unique(codigos[validos], return_index=True)
+        return {self.categorias[columna][c]: int(validos[i]) for c, i in zip(unicos, primeros)}
+
+    def agrupar(self, por, limite=None):
+        """Agregados por 'autor', 'idioma' u 'hora', ordenados por número de tweets (los `limite` primeros).
+
+        Cada grupo: {'clave', 'tweets', 'engagement', 'sentimientos': {etiqueta: n}, 'polaridad'}
+        con polaridad = (POS - NEG) / tweets con sentimiento.
+        """
+        columna = AGRUPACIONES[por]
+        grupos = self.codigos[columna].astype(np.int64)
+        validos = grupos >= 0
+        n_grupos = len(self.categorias[columna])
+
+        tweets = np.bincount(grupos[validos], minlength=n_grupos)
+        engagement = np.bincount(grupos[validos], weights=self.engagement[validos], minlength=n_grupos)
+
+        # Tabla cruzada grupo x sentimiento con un solo bincount
+        sentimientos = self.codigos['sentimiento'].astype(np.int64)
+        etiquetas = self.categorias['sentimiento']
+        n_sent = len(etiquetas)
+        con_sent = validos & (sentimientos >= 0)
+        cruzada = np.bincount(grupos[con_sent] * n_sent + sentimientos[con_sent],
+                              minlength=n_grupos * n_sent).reshape(n_grupos, n_sent)
+
+        signo = np.array([1 if e == 'POS' else -1 if e == 'NEG' else 0 for e in etiquetas], dtype=np.int64)
+        total_sent = cruzada.sum(axis=1)
+        polaridad = np.divide(cruzada @ signo, total_sent, out=np.zeros(n_grupos), where=total_sent > 0)
+
+        resultado = []
+        for g in np.argsort(-tweets, kind='stable')[:limite]:
+            if tweets[g] == 0:
+                continue
+            resultado.append({
+                'clave': self.categorias[columna][g],
+                'tweets': int(tweets[g]),
+                'engagement': int(engagement[g]),
+                'sentimientos': {e: int(n) for e, n in zip(etiquetas, cruzada[g]) if n},
+                'polaridad': float(polaridad[g])
+            })
+        return resultado
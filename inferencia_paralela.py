@@ -0,0 +1,136 @@
+"""
+INFERENCIA PARALELA CON UN POOL DE PROCESOS
+Reparte lotes de tweets entre varios procesos, cada uno con su propio motor
+de análisis cargado una sola vez, en su primera tarea.
+
+- Cada proceso fija los hilos intra-op de torch (núcleos / procesos) para no
+  sobresuscribir la CPU.
+- La carga ocurre dentro de una tarea y no en el initializer del pool: un
+  error en el initializer hace que el pool relance procesos sin fin y el
+  padre se queda colgado; dentro de una tarea el error llega al padre.
+  Al crear el pool se carga un trabajador para fallar pronto.
+- Los textos se ordenan por longitud antes de repartirlos, así cada proceso
+  recibe textos de longitud parecida y su agrupación por presupuesto de
+  tokens apenas necesita padding. Los resultados se devuelven en el orden
+  de entrada.
+- Expone la misma interfaz que MotorAnalisis (tareas, batch_size, tamano_envio,
+  analizar, identificador_modelos), así que puede usarse directamente en analizar_tweets.
+"""
+
+import math
+import multiprocessing
+import os
+
+from motor_analisis import MotorAnalisis
+
+# Configuración y motor del proceso trabajador (uno por proceso)
+_CONFIG_TRABAJADOR = None
+_MOTOR_TRABAJADOR = None
+
+
+def _inicializar_trabajador(tareas, lang, backend, batch_size, hilos):
+    """Guarda la configuración y fija los hilos; no puede fallar (ver docstring del módulo)."""
+    global _CONFIG_TRABAJADOR
+    os.environ['OMP_NUM_THREADS'] = str(hilos)
+    os.environ['MKL_NUM_THREADS'] = str(hilos)
+    _CONFIG_TRABAJADOR = (tareas, lang, backend, batch_size, hilos)
+
+
+def _motor_trabajador():
+    """Motor del proceso, creado en la primera tarea; los errores de carga llegan al padre."""
+    global _MOTOR_TRABAJADOR
+    if _MOTOR_TRABAJADOR is None:
+        tareas, lang, backend, batch_size, hilos = _CONFIG_TRABAJADOR
+        import torch
+        torch.set_num_threads(hilos)
+        motor = MotorAnalisis(tareas, lang=lang, batch_size=batch_size, backend=backend)
+        motor.analizadores  # carga de los modelos
+        _MOTOR_TRABAJADOR = motor
+    return _MOTOR_TRABAJADOR
+
+
+def _precargar(_):
+    _motor_trabajador()
+    return os.getpid()
+
+
+def _analizar_lote(argumentos):
+    textos, tareas = argumentos
+    return _motor_trabajador().analizar(textos, tareas)
+
+
+def _identificador_modelos(tareas):
+    return _motor_trabajador().identificador_modelos(tareas)
+
+
+class PoolInferencia:
+    """Pool de procesos con un motor de análisis por proceso."""
+
+    def __init__(self, tareas=('sentiment', 'emotion'), lang="es", batch_size=32,
+                 backend="pytorch", procesos=None, hilos_por_proceso=None):
+        nucleos = os.cpu_count() or 1
+        self.procesos = procesos or nucleos
+        self.hilos_por_proceso = hilos_por_proceso or max(1, nucleos // self.procesos)
+        self._tareas = list(tareas)
+        self.batch_size = batch_size
+        self._identificadores = {}
+
+        print(f"Arrancando {self.procesos} procesos de inferencia "
+              f"({self.hilos_por_proceso} hilos de torch cada uno)...")
+        # 'spawn' evita heredar el estado de torch/OpenMP del proceso padre
+        contexto = multiprocessing.get_context('spawn')
+        self._pool = contexto.Pool(
+            processes=self.procesos,
+            initializer=_inicializar_trabajador,
+            initargs=(self._tareas, lang, backend, batch_size, self.hilos_por_proceso)
+        )
+        try:
+            # Un trabajador carga los modelos ya: si fallan, el error sale aquí
+            self._pool.apply(_precargar, (None,))
+        except Exception:
+            self._pool.terminate()
+            raise
+        print("✓ Pool de inferencia listo")
+
+    @property
+    def tareas(self):
+        return list(self._tareas)
+
+    @property
+    def tamano_envio(self):
+        """Textos por llamada a analizar: varios lotes por proceso para repartir bien la carga."""
+        return self.batch_size * self.procesos * 4
+
+    def identificador_modelos(self, tareas=None):
+        clave = tuple(sorted(tareas or self._tareas))
+        if clave not in self._identificadores:
+            self._identificadores[clave] = self._pool.apply(_identificador_modelos, (list(clave),))
+        return self._identificadores[clave]
+
+    def analizar(self, textos, tareas=None):
+        """Analiza los textos repartiendo lotes entre procesos; conserva el orden de entrada.
+
+        Los textos se ordenan por longitud (en caracteres, sin tokenizar) y se cortan
+        en tramos contiguos, varios por proceso para repartir bien la carga; cada
+        proceso agrupa su tramo por presupuesto de tokens.
+        """
+        orden = sorted(range(len(textos)), key=lambda i: len(textos[i]))
+        tamano = max(self.batch_size, math.ceil(len(textos) / (self.procesos * 4)))
+        tramos = [orden[i:i + tamano] for i in range(0, len(orden), tamano)]
+
+        resultados = [None] * len(textos)
+        lotes = [([textos[i] for i in tramo], tareas) for tramo in tramos]
+        for tramo, salida in zip(tramos, self._pool.imap(_analizar_lote, lotes)):
+            for i, resultado in zip(tramo, salida):
+                resultados[i] = resultado
+        return resultados
+
+    def cerrar(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
@@ -0,0 +1,231 @@
+"""
+INSTRUMENTACIÓN DE ETAPAS
+Mide tiempo de reloj, elementos procesados y throughput por etapa del
+análisis (descarga, preprocesado, cada modelo, estadísticas, gráficos,
+guardado) y escribe un informe JSON al final de la ejecución.
+
+Desactivada no cuesta más que una comprobación de un booleano por llamada.
+Se activa con activar() o con variables de entorno:
+
+    TWEETS_METRICAS=metricas.json            activa y fija la ruta del informe (1 = ruta por defecto)
+    TWEETS_PERFIL=cprofile,tracemalloc       perfiles opcionales que se añaden al informe
+
+Las etapas anidadas se nombran con puntos ('analisis', 'modelo.sentiment'):
+sus tiempos se solapan y no deben sumarse entre niveles. Con PoolInferencia
+la inferencia ocurre en otros procesos y solo se mide la etapa que la espera.
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+RUTA_INFORME_POR_DEFECTO = "metricas_ejecucion.json"
+PERFILES_DISPONIBLES = ('cprofile', 'tracemalloc')
+FUNCIONES_PERFIL = 30
+ASIGNACIONES_MEMORIA = 15
+
+
+class Metricas:
+    """Acumulador de tiempos por etapa (seguro entre hilos)."""
+
+    def __init__(self):
+        self.activo = False
+        self.perfiles = ()
+        self.ruta_informe = None
+        self._etapas = {}
+        self._candado = threading.Lock()
+        self._inicio = None
+        self._fecha_inicio = None
+        self._perfilador = None
+
+    # ---------- Activación ----------
+
+    def activar(self, ruta_informe=RUTA_INFORME_POR_DEFECTO, perfiles=()):
+        """Empieza a medir; `perfiles` puede incluir 'cprofile' y/o 'tracemalloc'."""
+        desconocidos = set(perfiles) - set(PERFILES_DISPONIBLES)
+        if desconocidos:
+            raise ValueError(f"Perfiles no soportados: {sorted(desconocidos)}")
+        if self._perfilador is not None:
+            self._perfilador.disable()
+            self._perfilador = None
+        self.activo = True
+        self.ruta_informe = ruta_informe
+        self.perfiles = tuple(perfiles)
+        self._etapas.clear()
+        self._inicio = time.perf_counter()
+        self._fecha_inicio = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        if 'tracemalloc' in self.perfiles:
+            import tracemalloc
+            tracemalloc.start()
+        if 'cprofile' in self.perfiles:
+            import cProfile
+            self._perfilador = cProfile.Profile()
+            self._perfilador.enable()
+
+    def activar_desde_entorno(self):
+        """Activa según TWEETS_METRICAS / TWEETS_PERFIL; devuelve si quedó activa."""
+        valor = os.environ.get('TWEETS_METRICAS', '').strip()
+        if not valor or valor.lower() in ('0', 'no', 'false'):
+            return self.activo
+        ruta = RUTA_INFORME_POR_DEFECTO if valor.lower() in ('1', 'si', 'sí', 'true') else valor
+        perfiles = [p.strip() for p in os.environ.get('TWEETS_PERFIL', '').split(',') if p.strip()]
+        self.activar(ruta, perfiles)
+        return True
+
+    # ---------- Registro ----------
+
+    def registrar(self, nombre, segundos, elementos=0):
+        """Suma una medición a la etapa `nombre`."""
+        if not self.activo:
+            return
+        with self._candado:
+            etapa = self._etapas.get(nombre)
+            if etapa is None:
+                etapa = self._etapas[nombre] = {'llamadas': 0, 'segundos': 0.0, 'elementos': 0,
+                                                'min': float('inf'), 'max': 0.0}
+            etapa['llamadas'] += 1
+            etapa['segundos'] += segundos
+            etapa['elementos'] += elementos or 0
+            etapa['min'] = min(etapa['min'], segundos)
+            etapa['max'] = max(etapa['max'], segundos)
+
+    @contextmanager
+    def etapa(self, nombre, elementos=0):
+        """Mide el bloque `with`; el dict que se entrega permite fijar 'elementos' al final."""
+        if not self.activo:
+            yield {}
+            return
+        medicion = {'elementos': elementos}
+        inicio = time.perf_counter()
+        try:
+            yield medicion
+        finally:
+            self.registrar(nombre, time.perf_counter() - inicio, medicion['elementos'])
+
+    def medir(self, nombre, elementos=None):
+        """Decorador que mide cada llamada a la función como la etapa `nombre`.
+
+        elementos: función (args, resultado) -> número de elementos; por defecto
+        la longitud del resultado si es una lista.
+        """
+        def decorador(funcion):
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                if not self.activo:
+                    return funcion(*args, **kwargs)
+                inicio = time.perf_counter()
+                resultado = funcion(*args, **kwargs)
+                if elementos is not None:
+                    n = elementos(args, resultado)
+                else:
+                    n = len(resultado) if isinstance(resultado, list) else 0
+                self.registrar(nombre, time.perf_counter() - inicio, n)
+                return resultado
+            return envoltura
+        return decorador
+
+    # ---------- Informe ----------
+
+    def informe(self):
+        """Dict con las etapas (y los perfiles, si están activos) listo para JSON."""
+        with self._candado:
+            etapas = {}
+            for nombre, e in self._etapas.items():
+                etapas[nombre] = {
+                    'llamadas': e['llamadas'],
+                    'segundos': round(e['segundos'], 6),
+                    'elementos': e['elementos'],
+                    'elementos_por_segundo': round(e['elementos'] / e['segundos'], 2) if e['segundos'] else None,
+                    'min_segundos': round(e['min'], 6),
+                    'max_segundos': round(e['max'], 6)
+                }
+        informe = {
+            'fecha': self._fecha_inicio,
+            'comando': ' '.join(sys.argv),
+            'python': sys.version.split()[0],
+            'duracion_total': round(time.perf_counter() - self._inicio, 3) if self._inicio else None,
+            'etapas': etapas
+        }
+        if self._perfilador is not None:
+            informe['cprofile'] = self._resumen_cprofile()
+        if 'tracemalloc' in self.perfiles:
+            informe['tracemalloc'] = self._resumen_tracemalloc()
+        return informe
+
+    def _resumen_cprofile(self):
+        import pstats
+
+        self._perfilador.disable()
+        estadisticas = pstats.Stats(self._perfilador)
+        self._perfilador.enable()
+        filas = []
+        for (archivo, linea, funcion), (_, llamadas, propio, acumulado, _) in estadisticas.stats.items():
+            filas.append({'funcion': f"{os.path.basename(archivo)}:{linea}({funcion})", 'llamadas': llamadas,
+                          'segundos_propios': round(propio, 6), 'segundos_acumulados': round(acumulado, 6)})
+        filas.sort(key=lambda f: f['segundos_acumulados'], reverse=True)
+        return filas[:FUNCIONES_PERFIL]
+
+    def _resumen_tracemalloc(self):
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            return None
+        actual, pico = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics('lineno')[:ASIGNACIONES_MEMORIA]
+        return {
+            'actual_mb': round(actual / 2**20, 2),
+            'pico_mb': round(pico / 2**20, 2),
+            'asignaciones': [{'lugar': str(s.traceback[0]), 'mb': round(s.size / 2**20, 3), 'bloques': s.count}
+                             for s in top]
+        }
+
+    def imprimir_resumen(self, etapas=None):
+        """Tabla corta de etapas en consola."""
+        etapas = etapas if etapas is not None else self.informe()['etapas']
+        if not etapas:
+            return
+        print(f"\n{'='*70}")
+        print("MÉTRICAS POR ETAPA")
+        print(f"{'='*70}")
+        for nombre, e in sorted(etapas.items(), key=lambda x: x[1]['segundos'], reverse=True):
+            ritmo = f"{e['elementos_por_segundo']:.1f}/s" if e['elementos_por_segundo'] else "-"
+            print(f"  {nombre:<28} {e['segundos']:>9.3f}s  {e['llamadas']:>5} llamadas  "
+                  f"{e['elementos']:>8} elem.  {ritmo}")
+        print(f"{'='*70}\n")
+
+    def finalizar(self, ruta=None):
+        """Escribe el informe JSON, detiene los perfiles y desactiva la medición; devuelve la ruta."""
+        if not self.activo:
+            return None
+        ruta = ruta or self.ruta_informe or RUTA_INFORME_POR_DEFECTO
+        informe = self.informe()
+        self.imprimir_resumen(informe['etapas'])
+
+        if self._perfilador is not None:
+            self._perfilador.disable()
+            self._perfilador = None
+        if 'tracemalloc' in self.perfiles:
+            import tracemalloc
+            tracemalloc.stop()
+        self.activo = False
+
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        print(f"✓ Informe de métricas guardado en: {ruta}")
+        return ruta
+
+
+# Instancia compartida por todo el proceso
+METRICAS = Metricas()
+etapa = METRICAS.etapa
+medir = METRICAS.medir
+registrar = METRICAS.registrar
@@ -0,0 +1,136 @@
+"""
+LECTOR INCREMENTAL DE RESULTADOS
+Recorre tweets de archivos de resultados sin cargarlos enteros en memoria:
+
+- NDJSON (.jsonl): línea a línea
+- JSON (.json): documento {'metadata': ..., 'tweets': [...]} de
+  guardar_resultados o una lista de tweets; se lee por bloques y cada tweet
+  se decodifica con json.JSONDecoder.raw_decode en cuanto está completo
+"""
+
+import json
+
+TAM_BLOQUE = 1 << 16
+
+_ESPACIOS = ' \t\n\r'
+
+
+class _LectorJSON:
+    """Analizador incremental mínimo: lee el archivo por bloques y decodifica valor a valor."""
+
+    def __init__(self, archivo, tam_bloque=TAM_BLOQUE):
+        self.archivo = archivo
+        self.tam_bloque = tam_bloque
+        self.decodificador = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.fin = False
+
+    def _rellenar(self):
+        bloque = self.archivo.read(self.tam_bloque)
+        if not bloque:
+            self.fin = True
+            return False
+        # Descartar lo ya consumido para que el buffer no crezca
+        self.buffer = self.buffer[self.pos:] + bloque
+        self.pos = 0
+        return True
+
+    def caracter(self):
+        """Siguiente carácter significativo (sin consumirlo) o '' al final del archivo."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _ESPACIOS:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._rellenar():
+                return ''
+
+    def consumir(self, esperado):
+        c = self.caracter()
+        if c != esperado:
+            raise ValueError(f"JSON inesperado: se esperaba '{esperado}' y se encontró '{c or 'EOF'}'")
+        self.pos += 1
+
+    def valor(self):
+        """Decodifica el siguiente valor completo, leyendo más bloques si hace falta."""
+        self.caracter()
+        while True:
+            try:
+                valor, fin = self.decodificador.raw_decode(self.buffer, self.pos)
+                # Un número al borde del buffer podría estar cortado: exigir un carácter detrás
+                if fin < len(self.buffer) or self.fin:
+                    self.pos = fin
+                    return valor
+            except json.JSONDecodeError:
+                if self.fin:
+                    raise
+            self._rellenar()
+
+    def elementos_lista(self):
+        """Genera los elementos de la lista que empieza en la posición actual."""
+        self.consumir('[')
+        if self.caracter() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.valor()
+            c = self.caracter()
+            self.pos += 1
+            if c == ']':
+                return
+            if c != ',':
+                raise ValueError(f"JSON inesperado en la lista: '{c or 'EOF'}'")
+
+
+def _tweets_json(archivo, tam_bloque=TAM_BLOQUE):
+    lector = _LectorJSON(archivo, tam_bloque)
+    c = lector.caracter()
+    if c == '[':
+        yield from lector.elementos_lista()
+        return
+
+    # Objeto: recorrer sus claves y transmitir solo la lista 'tweets'
+    lector.consumir('{')
+    if lector.caracter() == '}':
+        return
+    while True:
+        clave = lector.valor()
+        lector.consumir(':')
+        if clave == 'tweets':
+            yield from lector.elementos_lista()
+        else:
+            lector.valor()  # metadata u otros campos pequeños
+        c = lector.caracter()
+        lector.pos += 1
+        if c == '}':
+            return
+        if c != ',':
+            raise ValueError(f"JSON inesperado en el objeto: '{c or 'EOF'}'")
+
+
+def leer_tweets(ruta):
+    """Genera los tweets de un archivo .json o .jsonl uno a uno."""
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        if ruta.endswith('.jsonl') or ruta.endswith('.ndjson'):
+            for linea in archivo:
+                linea = linea.strip()
+                if linea:
+                    yield json.loads(linea)
+        else:
+            yield from _tweets_json(archivo)
+
+
+def leer_por_lotes(rutas, tam_lote=1000):
+    """Genera listas de hasta `tam_lote` tweets recorriendo uno o varios archivos."""
+    if isinstance(rutas, str):
+        rutas = [rutas]
+    lote = []
+    for ruta in rutas:
+        for tweet in leer_tweets(ruta):
+            lote.append(tweet)
+            if len(lote) >= tam_lote:
+                yield lote
+                lote = []
+    if lote:
+        yield lote
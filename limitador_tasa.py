@@ -0,0 +1,171 @@
+"""
+LIMITADOR DE TASA COMPARTIDO PARA LA API DE TWITTER
+Cubo de tokens por endpoint alimentado por las cabeceras x-rate-limit-*:
+
+- x-rate-limit-limit:     peticiones permitidas por ventana
+- x-rate-limit-remaining: peticiones que quedan en la ventana actual
+- x-rate-limit-reset:     instante (epoch) en que se reinicia la ventana
+
+Mientras no se conocen los límites de un endpoint (o al empezar una ventana
+nueva) se permiten en vuelo tantas peticiones como su cuota documentada
+(CUOTAS_INICIALES, o el límite de la ventana anterior; una sola de sondeo si
+el endpoint no tiene cuota conocida); con la primera respuesta manda lo que
+digan las cabeceras y, al agotarse, los hilos duermen exactamente hasta el
+reset. Ante un 429 se espera al reset (o se hace backoff exponencial con
+jitter si no llega la cabecera).
+"""
+
+import random
+import re
+import threading
+import time
+
+# Margen tras el reset para absorber desfases de reloj con el servidor
+MARGEN_RESET = 1.0
+
+# Peticiones por ventana de 15 minutos de la API v2 con token de aplicación,
+# usadas hasta recibir las primeras cabeceras x-rate-limit-* del endpoint
+CUOTAS_INICIALES = {
+    '/2/tweets/search/recent': 450,
+    '/2/users/:id/tweets': 1500,
+    '/2/users/by': 300,
+    '/2/users/by/username/:username': 300,
+    '/2/users/:id': 300,
+    '/2/tweets': 300,
+    '/2/tweets/:id': 300,
+}
+
+
+def clave_endpoint(ruta):
+    """Agrupa rutas con ids en su plantilla: /2/users/123/tweets -> /2/users/:id/tweets.
+
+    Solo se sustituyen los segmentos numéricos que siguen a un recurso, así que
+    el prefijo de versión (/2/) se conserva.
+    """
+    ruta = re.sub(r'/users/by/username/[^/]+', '/users/by/username/:username', ruta)
+    return re.sub(r'(/[A-Za-z_][\w-]*)/\d+(?=/|$)', r'\1/:id', ruta)
+
+
+class _Cubo:
+    def __init__(self):
+        self.limite = None
+        self.restantes = None
+        self.reset = 0.0
+        self.en_vuelo = 0
+
+
+class LimitadorTasa:
+    """Cubo de tokens por endpoint, seguro para varios hilos.
+
+    cuotas: {plantilla de endpoint: peticiones por ventana} a usar mientras no se
+    conocen sus cabeceras (por defecto CUOTAS_INICIALES; 1 para los demás endpoints).
+    """
+
+    def __init__(self, reloj=time.time, dormir=time.sleep, cuotas=None):
+        self._reloj = reloj
+        self._dormir = dormir
+        self.cuotas = dict(CUOTAS_INICIALES if cuotas is None else cuotas)
+        self._cubos = {}
+        self._condicion = threading.Condition()
+        self.esperas = 0
+        self.segundos_esperados = 0.0
+        self.respuestas_429 = 0
+
+    def _cubo(self, endpoint):
+        return self._cubos.setdefault(endpoint, _Cubo())
+
+    def adquirir(self, ruta):
+        """Bloquea hasta que se pueda hacer una petición a `ruta` sin superar el límite."""
+        endpoint = clave_endpoint(ruta)
+        with self._condicion:
+            while True:
+                cubo = self._cubo(endpoint)
+                ahora = self._reloj()
+
+                if cubo.restantes is not None and ahora >= cubo.reset:
+                    # Ventana vencida: volver a sondear para conocer la nueva
+                    cubo.restantes = None
+
+                if cubo.restantes is None:
+                    # Límite desconocido: hasta la cuota del endpoint en vuelo
+                    # (el límite de la ventana anterior si ya se conoce)
+                    cuota = cubo.limite or self.cuotas.get(endpoint, 1)
+                    if cubo.en_vuelo < max(1, cuota):
+                        cubo.en_vuelo += 1
+                        return
+                    self._condicion.wait(timeout=1.0)
+                    continue
+
+                if cubo.restantes > 0:
+                    cubo.restantes -= 1
+                    cubo.en_vuelo += 1
+                    return
+
+                # Cubo vacío: dormir exactamente hasta el reset (sin el candado)
+                espera = max(0.0, cubo.reset - ahora) + MARGEN_RESET
+                self.esperas += 1
+                self.segundos_esperados += espera
+                print(f"  ⏳ Límite de {endpoint} agotado; esperando {espera:.0f}s hasta el reset")
+                self._condicion.release()
+                try:
+                    self._dormir(espera)
+                finally:
+                    self._condicion.acquire()
+
+    def actualizar(self, ruta, cabeceras):
+        """Actualiza el cubo con las cabeceras de una respuesta y libera la plaza en vuelo."""
+        endpoint = clave_endpoint(ruta)
+        with self._condicion:
+            cubo = self._cubo(endpoint)
+            cubo.en_vuelo = max(0, cubo.en_vuelo - 1)
+            try:
+                limite = int(cabeceras['x-rate-limit-limit'])
+                restantes = int(cabeceras['x-rate-limit-remaining'])
+                reset = float(cabeceras['x-rate-limit-reset'])
+            except (KeyError, TypeError, ValueError):
+                self._condicion.notify_all()
+                return
+
+            if reset > cubo.reset or cubo.restantes is None:
+                # Respuesta de una ventana nueva: el servidor manda
+                cubo.restantes = restantes - cubo.en_vuelo
+            else:
+                # Misma ventana: quedarse con el valor más conservador
+                cubo.restantes = min(cubo.restantes, restantes - cubo.en_vuelo)
+            cubo.restantes = max(0, cubo.restantes)
+            cubo.limite = limite
+            cubo.reset = max(cubo.reset, reset)
+            self._condicion.notify_all()
+
+    def liberar(self, ruta):
+        """Libera la plaza en vuelo de una petición que falló sin respuesta (error de red)."""
+        with self._condicion:
+            cubo = self._cubo(clave_endpoint(ruta))
+            cubo.en_vuelo = max(0, cubo.en_vuelo - 1)
+            self._condicion.notify_all()
+
+    def penalizar(self, ruta, cabeceras, intento):
+        """Tras un 429: vacía el cubo y duerme hasta el reset o con backoff exponencial + jitter."""
+        endpoint = clave_endpoint(ruta)
+        with self._condicion:
+            self.respuestas_429 += 1
+            cubo = self._cubo(endpoint)
+            cubo.en_vuelo = max(0, cubo.en_vuelo - 1)
+            cubo.restantes = 0
+            try:
+                cubo.reset = max(cubo.reset, float(cabeceras['x-rate-limit-reset']))
+                espera = max(0.0, cubo.reset - self._reloj()) + MARGEN_RESET
+            except (KeyError, TypeError, ValueError):
+                espera = min(900.0, 2 ** intento)
+                cubo.reset = self._reloj() + espera
+            espera += random.uniform(0, min(5.0, 0.1 * espera + 0.5))
+            self._condicion.notify_all()
+
+        print(f"  ⚠ 429 en {endpoint}; reintento {intento + 1} en {espera:.1f}s")
+        self.esperas += 1
+        self.segundos_esperados += espera
+        self._dormir(espera)
+
+    def resumen(self):
+        return (f"Limitador: {self.esperas} esperas ({self.segundos_esperados:.0f}s), "
+                f"{self.respuestas_429} respuestas 429")
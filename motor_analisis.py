@@ -0,0 +1,445 @@
+"""
+MOTOR DE ANÁLISIS - PREPROCESADO Y TOKENIZACIÓN COMPARTIDOS
+Ejecuta varios analizadores de pysentimiento sobre los mismos textos
+preprocesando y tokenizando cada tweet una sola vez.
+
+FUNCIONAMIENTO:
+1. Agrupa los analizadores por argumentos de preprocesado y por tokenizador
+2. Preprocesa y tokeniza cada texto una vez por grupo (con caché de codificaciones)
+3. Si varios modelos comparten exactamente el mismo encoder, hace una sola
+   pasada del encoder y aplica cada cabeza de clasificación sobre su salida
+4. Ordena los textos por longitud tokenizada y arma lotes con un presupuesto
+   de tokens (longitud máxima x textos) para minimizar el padding; el orden
+   original se restaura al devolver los resultados
+5. Devuelve por texto un dict {tarea: {'output': ..., 'probas': {...}}}
+
+Los modelos se cargan de forma perezosa, tarea a tarea, la primera vez que se
+piden (en analizar o identificador_modelos) y se comparten entre motores
+mediante un registro global del proceso, de modo que una ejecución o un
+trabajo solo de sentimiento nunca carga los modelos de emoción u odio.
+"""
+
+import hashlib
+import threading
+
+from cache_inferencia import CacheInferencia
+from instrumentacion import etapa
+
+
+# ============================================
+# REGISTRO DE MODELOS
+# ============================================
+
+TAREAS_DISPONIBLES = {
+    'sentiment': 'Sentimiento',
+    'emotion': 'Emoción',
+    'hate_speech': 'Discurso de odio'
+}
+
+_REGISTRO_ANALIZADORES = {}
+_CANDADO_REGISTRO = threading.Lock()
+
+
+def obtener_analizador(tarea, lang="es", backend="pytorch"):
+    """Devuelve el analizador de pysentimiento de una tarea, cargándolo solo la primera vez.
+
+    Con backend 'int8' u 'onnx' se devuelve una copia con el modelo cuantizado
+    (ver backend_cuantizado.py); el modelo fp32 base también queda registrado.
+    """
+    with _CANDADO_REGISTRO:
+        return _obtener_sin_candado(tarea, lang, backend)
+
+
+def _obtener_sin_candado(tarea, lang, backend):
+    clave = (tarea, lang, backend)
+    if clave not in _REGISTRO_ANALIZADORES:
+        if backend == 'pytorch':
+            from pysentimiento import create_analyzer
+            print(f"Cargando modelo de {TAREAS_DISPONIBLES.get(tarea, tarea).lower()} ({lang})...")
+            _REGISTRO_ANALIZADORES[clave] = create_analyzer(task=tarea, lang=lang)
+            print(f"✓ Modelo '{tarea}' cargado")
+        else:
+            from backend_cuantizado import cuantizar_analizador
+            base = _obtener_sin_candado(tarea, lang, 'pytorch')
+            _REGISTRO_ANALIZADORES[clave] = cuantizar_analizador(base, tarea, lang, backend)
+    return _REGISTRO_ANALIZADORES[clave]
+
+
+def modelos_cargados():
+    """Lista de (tarea, idioma, backend) ya cargados en este proceso."""
+    with _CANDADO_REGISTRO:
+        return list(_REGISTRO_ANALIZADORES)
+
+
+# ============================================
+# UTILIDADES
+# ============================================
+
+# Familias de modelo cuya cabeza de clasificación recibe la salida completa
+# del encoder (last_hidden_state) en lugar del pooler
+MODELOS_CABEZA_SOBRE_SECUENCIA = {'roberta', 'xlm-roberta', 'camembert', 'deberta', 'deberta-v2'}
+
+
+def _huella_tokenizador(tokenizer):
+    """Huella del vocabulario y configuración de un tokenizador."""
+    vocab = sorted(tokenizer.get_vocab().items())
+    h = hashlib.sha1()
+    h.update(type(tokenizer).__name__.encode('utf-8'))
+    h.update(str(tokenizer.model_max_length).encode('utf-8'))
+    for token, idx in vocab:
+        h.update(f"{token}\x00{idx}\x01".encode('utf-8'))
+    return h.hexdigest()
+
+
+def _encoders_identicos(modelo_a, modelo_b):
+    """Comprueba si dos modelos comparten exactamente los mismos pesos de encoder."""
+    import torch
+
+    if not hasattr(modelo_a, 'base_model') or not hasattr(modelo_b, 'base_model'):
+        return False
+    if modelo_a.config.model_type != modelo_b.config.model_type:
+        return False
+    if modelo_a.config.model_type not in MODELOS_CABEZA_SOBRE_SECUENCIA:
+        return False
+
+    estado_a = modelo_a.base_model.state_dict()
+    estado_b = modelo_b.base_model.state_dict()
+    if estado_a.keys() != estado_b.keys():
+        return False
+
+    # Los modelos ajustados por separado difieren ya en los embeddings,
+    # así que la comparación suele cortarse en el primer tensor
+    for nombre, tensor in estado_a.items():
+        otro = estado_b[nombre]
+        if tensor.shape != otro.shape or not torch.equal(tensor, otro):
+            return False
+    return True
+
+
+# ============================================
+# MOTOR
+# ============================================
+
+class MotorAnalisis:
+    """Ejecuta varios analizadores de pysentimiento compartiendo preprocesado y tokenización."""
+
+    def __init__(self, tareas=('sentiment', 'emotion'), lang="es", batch_size=32,
+                 max_cache_codificaciones=50000, cargador=obtener_analizador, backend="pytorch",
+                 tokens_por_lote=4096, max_textos_lote=256):
+        desconocidas = [t for t in tareas if t not in TAREAS_DISPONIBLES]
+        if desconocidas:
+            raise ValueError(f"Tareas no soportadas: {desconocidas}")
+
+        from backend_cuantizado import BACKENDS_DISPONIBLES
+        if backend not in BACKENDS_DISPONIBLES:
+            raise ValueError(f"Backend no soportado: {backend}")
+
+        self._tareas = list(dict.fromkeys(tareas))
+        self.lang = lang
+        self.backend = backend
+        self.batch_size = batch_size
+        self.tokens_por_lote = tokens_por_lote
+        self.max_textos_lote = max_textos_lote
+        self.tokens_reales = 0
+        self.tokens_con_padding = 0
+        self.max_cache_codificaciones = max_cache_codificaciones
+        self._cargador = cargador
+        self._analizadores = {}
+        self._cache_codificaciones = {}
+        self._grupos = {}
+
+    @property
+    def tareas(self):
+        return list(self._tareas)
+
+    def analizador(self, tarea):
+        """Analizador de una tarea del motor; se carga (o se toma del registro) en su primer uso."""
+        if tarea not in self._tareas:
+            raise ValueError(f"La tarea '{tarea}' no está en el motor ({', '.join(self._tareas)})")
+        if tarea not in self._analizadores:
+            self._analizadores[tarea] = self._cargador(tarea, self.lang, self.backend)
+        return self._analizadores[tarea]
+
+    @property
+    def analizadores(self):
+        """Analizadores de todas las tareas del motor (fuerza su carga; útil para precargar)."""
+        return {t: self.analizador(t) for t in self._tareas}
+
+    @property
+    def tamano_envio(self):
+        """Textos por llamada a analizar: bastantes para que agrupar por longitud compense."""
+        return self.batch_size * 8
+
+    @property
+    def eficiencia_padding(self):
+        """Fracción de tokens procesados que son reales (no padding)."""
+        return self.tokens_reales / self.tokens_con_padding if self.tokens_con_padding else 1.0
+
+    def identificador_modelos(self, tareas=None):
+        """Cadena con tarea, modelo y versión de cada analizador (para claves de caché).
+
+        Solo se cargan los analizadores de `tareas` (por defecto, todas las del motor).
+        """
+        partes = []
+        for tarea in sorted(set(tareas or self._tareas)):
+            modelo = self.analizador(tarea).model
+            config = modelo.config
+            nombre = getattr(config, '_name_or_path', '') or type(modelo).__name__
+            version = getattr(config, '_commit_hash', None) or getattr(config, 'transformers_version', '')
+            partes.append(f"{tarea}={nombre}@{version}")
+        return ';'.join(partes) + f"|{self.backend}"
+
+    def vaciar_cache(self):
+        """Descarta las codificaciones guardadas (útil para medir tiempos en frío)."""
+        self._cache_codificaciones.clear()
+
+    def cerrar(self):
+        """No hay recursos que liberar; existe por simetría con PoolInferencia."""
+
+    # ---------- Agrupación ----------
+
+    def _construir_grupos(self, tareas):
+        """Agrupa `tareas` por preprocesado, tokenizador y encoder compartido."""
+        grupos = {}
+        for tarea in tareas:
+            analizador = self.analizador(tarea)
+            # create_analyzer guarda el idioma en preprocessing_args['lang'] (los
+            # analizadores no tienen atributo .lang); se completa si falta
+            args_prep = dict(getattr(analizador, 'preprocessing_args', None) or {})
+            args_prep.setdefault('lang', self.lang)
+            lang = args_prep['lang']
+            args_prep = tuple(sorted(args_prep.items()))
+            huella = _huella_tokenizador(analizador.tokenizer)
+            clave = (lang, args_prep, huella)
+            grupo = grupos.setdefault(clave, {
+                'lang': lang,
+                'preprocessing_args': dict(args_prep),
+                'clave_preprocesado': args_prep,
+                'tokenizer': analizador.tokenizer,
+                'huella': huella,
+                'encoders': []
+            })
+
+            # Reutilizar una pasada de encoder si los pesos son idénticos
+            for encoder in grupo['encoders']:
+                if _encoders_identicos(encoder['modelo'], analizador.model):
+                    encoder['tareas'].append(tarea)
+                    break
+            else:
+                grupo['encoders'].append({'modelo': analizador.model, 'tareas': [tarea]})
+
+        grupos = list(grupos.values())
+        n_pasadas = sum(len(g['encoders']) for g in grupos)
+        print(f"✓ Motor de análisis: {len(tareas)} tareas, "
+              f"{len(grupos)} tokenizaciones, {n_pasadas} pasadas de encoder por lote")
+        return grupos
+
+    # ---------- Preprocesado y tokenización ----------
+
+    def _codificar(self, grupo, textos):
+        """Preprocesa y tokeniza (sin padding) usando la caché de codificaciones."""
+        from pysentimiento.preprocessing import preprocess_tweet
+
+        codificados = [None] * len(textos)
+        pendientes = []
+        for i, texto in enumerate(textos):
+            clave = (grupo['huella'], grupo['clave_preprocesado'], texto)
+            cod = self._cache_codificaciones.get(clave)
+            if cod is None:
+                pendientes.append(i)
+            else:
+                codificados[i] = cod
+
+        if pendientes:
+            with etapa('preprocesado', len(pendientes)):
+                preprocesados = [
+                    preprocess_tweet(textos[i], **grupo['preprocessing_args'])
+                    for i in pendientes
+                ]
+            with etapa('tokenizacion', len(pendientes)):
+                tokens = grupo['tokenizer'](preprocesados, padding=False, truncation=True)
+
+            if len(self._cache_codificaciones) + len(pendientes) > self.max_cache_codificaciones:
+                self._cache_codificaciones.clear()
+
+            for j, i in enumerate(pendientes):
+                cod = {k: tokens[k][j] for k in tokens.keys()}
+                self._cache_codificaciones[(grupo['huella'], grupo['clave_preprocesado'], textos[i])] = cod
+                codificados[i] = cod
+
+        return codificados
+
+    # ---------- Inferencia ----------
+
+    @staticmethod
+    def _aplicar_cabeza(modelo, salida_encoder):
+        """Aplica la cabeza de clasificación de un modelo sobre la salida del encoder."""
+        return modelo.classifier(salida_encoder[0])
+
+    @staticmethod
+    def _logits_a_resultado(modelo, logits):
+        """Convierte logits en {'output', 'probas'} como hace pysentimiento."""
+        import torch
+
+        id2label = modelo.config.id2label
+        resultados = []
+        if modelo.config.problem_type == 'multi_label_classification':
+            probs = torch.sigmoid(logits)
+            for fila in probs.tolist():
+                probas = {id2label[i]: float(p) for i, p in enumerate(fila)}
+                salida = [id2label[i] for i, p in enumerate(fila) if p > 0.5]
+                resultados.append({'output': salida, 'probas': probas})
+        else:
+            probs = torch.softmax(logits, dim=-1)
+            for fila in probs.tolist():
+                probas = {id2label[i]: float(p) for i, p in enumerate(fila)}
+                salida = id2label[max(range(len(fila)), key=fila.__getitem__)]
+                resultados.append({'output': salida, 'probas': probas})
+        return resultados
+
+    def _inferir_lote(self, grupo, codificados, encoders):
+        """Ejecuta los encoders indicados del grupo sobre un lote ya tokenizado."""
+        import torch
+
+        entrada = grupo['tokenizer'].pad(codificados, padding=True, return_tensors='pt')
+        resultados = {}
+
+        with torch.no_grad():
+            for encoder, tareas in encoders:
+                modelo = encoder['modelo']
+                entrada_modelo = {k: v.to(modelo.device) for k, v in entrada.items()}
+
+                if len(encoder['tareas']) == 1:
+                    with etapa(f"modelo.{encoder['tareas'][0]}", len(codificados)):
+                        logits = modelo(**entrada_modelo).logits
+                        resultados[encoder['tareas'][0]] = self._logits_a_resultado(modelo, logits)
+                    continue
+
+                # Una pasada del encoder compartido y una cabeza por tarea
+                with etapa(f"modelo.encoder[{'+'.join(encoder['tareas'])}]", len(codificados)):
+                    salida = modelo.base_model(**entrada_modelo)
+                for tarea in tareas:
+                    with etapa(f"modelo.{tarea}", len(codificados)):
+                        modelo_tarea = self.analizador(tarea).model
+                        logits = self._aplicar_cabeza(modelo_tarea, salida)
+                        resultados[tarea] = self._logits_a_resultado(modelo_tarea, logits)
+
+        return resultados
+
+    def _planificar_lotes(self, codificados):
+        """Agrupa índices por longitud tokenizada respetando el presupuesto de tokens por lote."""
+        orden = sorted(range(len(codificados)), key=lambda i: len(codificados[i]['input_ids']))
+
+        lotes = []
+        actual = []
+        max_len = 0
+        for i in orden:
+            longitud = len(codificados[i]['input_ids'])
+            nuevo_max = max(max_len, longitud)
+            if actual and (nuevo_max * (len(actual) + 1) > self.tokens_por_lote
+                           or len(actual) >= self.max_textos_lote):
+                lotes.append(actual)
+                actual = []
+                nuevo_max = longitud
+            actual.append(i)
+            max_len = nuevo_max
+        if actual:
+            lotes.append(actual)
+        return lotes
+
+    def analizar(self, textos, tareas=None):
+        """Analiza una lista de textos con todas las tareas del motor (o solo con `tareas`).
+
+        Solo se cargan los modelos de las tareas pedidas; los grupos de tokenización y
+        encoder se construyen una vez por combinación de tareas.
+        """
+        solicitadas = set(tareas or self._tareas)
+        desconocidas = solicitadas - set(self._tareas)
+        if desconocidas:
+            raise ValueError(f"Tareas que no están en el motor: {sorted(desconocidas)}")
+        pedidas = tuple(t for t in self._tareas if t in solicitadas)
+
+        resultados = [dict() for _ in textos]
+        if not textos:
+            return resultados
+        if pedidas not in self._grupos:
+            self._grupos[pedidas] = self._construir_grupos(pedidas)
+        for grupo in self._grupos[pedidas]:
+            encoders = [(e, list(e['tareas'])) for e in grupo['encoders']]
+
+            codificados = self._codificar(grupo, textos)
+            for indices in self._planificar_lotes(codificados):
+                lote = [codificados[i] for i in indices]
+                longitudes = [len(c['input_ids']) for c in lote]
+                self.tokens_reales += sum(longitudes) * len(encoders)
+                self.tokens_con_padding += max(longitudes) * len(lote) * len(encoders)
+
+                por_tarea = self._inferir_lote(grupo, lote, encoders)
+                # Restaurar el orden original
+                for tarea, salidas in por_tarea.items():
+                    for i, salida in zip(indices, salidas):
+                        resultados[i][tarea] = salida
+        return resultados
+
+
+# ============================================
+# UTILIDADES DE ANÁLISIS
+# ============================================
+
+def inferir_textos(textos, motor, cache=None, tareas=None, progreso=True):
+    """Devuelve la salida del motor para cada texto, llamando al modelo solo para los fallos de caché.
+
+    Los textos repetidos (retweets, búsquedas solapadas) se puntúan una sola vez.
+    Con `tareas` solo se ejecuta ese subconjunto de tareas del motor.
+    progreso=False suprime la línea de progreso (servicios y llamadas sin pantalla).
+    """
+    modelo = motor.identificador_modelos(tareas)
+    claves = [CacheInferencia.clave(texto, modelo) for texto in textos]
+
+    conocidos = cache.obtener_varios(claves) if cache is not None else {}
+
+    # Fallos únicos, en orden de aparición
+    pendientes = {}
+    for clave, texto in zip(claves, textos):
+        if clave not in conocidos and clave not in pendientes:
+            pendientes[clave] = texto
+
+    # El motor preprocesa y tokeniza cada texto una sola vez para todas las tareas
+    claves_pendientes = list(pendientes)
+    nuevos = {}
+    for inicio in range(0, len(claves_pendientes), motor.tamano_envio):
+        lote = claves_pendientes[inicio:inicio + motor.tamano_envio]
+        if progreso:
+            print(f"  Procesando tweet {inicio + len(lote)}/{len(claves_pendientes)}...", end='\r')
+        for clave, resultado in zip(lote, motor.analizar([pendientes[c] for c in lote], tareas)):
+            nuevos[clave] = resultado
+
+    if cache is not None:
+        cache.guardar_varios(nuevos)
+
+    conocidos.update(nuevos)
+    return [conocidos[clave] for clave in claves]
+
+
+def construir_tweet_analizado(tweet, resultado):
+    """Añade al tweet los campos de análisis a partir de la salida del motor."""
+    tweet_analizado = tweet.copy()
+
+    if 'sentiment' in resultado:
+        sent = resultado['sentiment']
+        tweet_analizado['sentimiento'] = sent['output']
+        tweet_analizado['sentimiento_confianza'] = float(sent['probas'][sent['output']])
+        tweet_analizado['sentimiento_scores'] = {k: float(v) for k, v in sent['probas'].items()}
+
+    if 'emotion' in resultado:
+        emo = resultado['emotion']
+        tweet_analizado['emocion'] = emo['output']
+        tweet_analizado['emocion_confianza'] = float(emo['probas'][emo['output']])
+        tweet_analizado['emocion_scores'] = {k: float(v) for k, v in emo['probas'].items()}
+
+    if 'hate_speech' in resultado:
+        odio = resultado['hate_speech']
+        tweet_analizado['odio'] = list(odio['output'])
+        tweet_analizado['odio_scores'] = {k: float(v) for k, v in odio['probas'].items()}
+
+    return tweet_analizado
@@ -0,0 +1,147 @@
+"""
+PIPELINE ASÍNCRONO DESCARGA -> ANÁLISIS -> GUARDADO
+Conecta las tres etapas con colas asyncio acotadas para solaparlas:
+mientras se analiza una página de tweets se descarga la siguiente y se
+escriben los resultados de la anterior.
+
+- Las llamadas bloqueantes (API de Twitter, inferencia, disco) se ejecutan
+  en hilos con asyncio.to_thread para no bloquear el bucle de eventos
+- Las colas acotadas limitan la memoria: si una etapa se atasca, las
+  anteriores esperan en lugar de acumular páginas
+- La latencia total tiende a la de la etapa más lenta, no a la suma
+"""
+
+import asyncio
+import time
+
+from motor_analisis import inferir_textos, construir_tweet_analizado
+from escritor_resultados import EscritorResultados
+from instrumentacion import etapa, registrar
+
+# Marca de fin de flujo entre etapas
+_FIN = object()
+
+
+async def _etapa_descarga(paginas, cola_salida, tiempos):
+    """Lee páginas del generador (bloqueante) y las envía a la cola de análisis."""
+    iterador = iter(paginas)
+    while True:
+        inicio = time.perf_counter()
+        pagina = await asyncio.to_thread(next, iterador, None)
+        duracion = time.perf_counter() - inicio
+        tiempos['descarga'] += duracion
+        if pagina is None:
+            break
+        registrar('pipeline.descarga', duracion, len(pagina))
+        print(f"  [descarga] página con {len(pagina)} tweets")
+        await cola_salida.put(pagina)
+    await cola_salida.put(_FIN)
+
+
+def _analizar_pagina(pagina, motor, cache, enrutador=None, preprocesador=None):
+    textos = [t['texto'] for t in pagina]
+    ahorrados = None
+    if preprocesador is not None:
+        with etapa('preprocesado_tokens', len(textos)):
+            textos, ahorrados = preprocesador.procesar(textos)
+
+    if enrutador is not None:
+        analizados = enrutador.analizar(pagina, textos, cache)
+    else:
+        resultados = inferir_textos(textos, motor, cache)
+        analizados = [construir_tweet_analizado(t, r) for t, r in zip(pagina, resultados)]
+    if ahorrados is not None:
+        for tweet, n in zip(analizados, ahorrados):
+            tweet['tokens_ahorrados'] = n
+    return analizados
+
+
+async def _etapa_analisis(motor, cache, cola_entrada, cola_salida, tiempos, enrutador=None, preprocesador=None):
+    """Analiza cada página y pasa los tweets analizados a la cola de guardado."""
+    while True:
+        pagina = await cola_entrada.get()
+        if pagina is _FIN:
+            break
+        inicio = time.perf_counter()
+        analizados = await asyncio.to_thread(_analizar_pagina, pagina, motor, cache, enrutador, preprocesador)
+        duracion = time.perf_counter() - inicio
+        tiempos['analisis'] += duracion
+        registrar('pipeline.analisis', duracion, len(pagina))
+        await cola_salida.put(analizados)
+    await cola_salida.put(_FIN)
+
+
+async def _etapa_guardado(ruta_salida, cola_entrada, acumulados, tiempos, serie=None):
+    """Añade cada lote analizado al archivo de salida (NDJSON o Parquet) en cuanto está listo."""
+    with EscritorResultados(ruta_salida) as escritor:
+        while True:
+            lote = await cola_entrada.get()
+            if lote is _FIN:
+                break
+            inicio = time.perf_counter()
+            await asyncio.to_thread(escritor.escribir, lote)
+            duracion = time.perf_counter() - inicio
+            tiempos['guardado'] += duracion
+            registrar('pipeline.guardado', duracion, len(lote))
+            if acumulados is not None:
+                acumulados.extend(lote)
+            if serie is not None:
+                serie.agregar_varios(lote)
+            print(f"  [guardado] {escritor.total} tweets escritos")
+        tiempos['escritos'] = escritor.total
+
+
+async def ejecutar_pipeline(paginas, motor, ruta_salida, cache=None, tam_cola=4, acumular=True, serie=None,
+                            enrutador=None, preprocesador=None):
+    """Ejecuta el pipeline y devuelve la lista de tweets analizados.
+
+    paginas: iterable (bloqueante) de listas de tweets, p. ej. paginas_tweets_busqueda(...)
+    acumular: con False no se guardan en memoria (se devuelve una lista vacía) y
+    la memoria queda acotada por el tamaño de las colas
+    serie: SerieSentimiento opcional que se actualiza con cada lote guardado
+    enrutador: EnrutadorIdioma opcional; reparte cada página por idioma en lugar de
+    pasarla entera por `motor`
+    preprocesador: PreprocesadorTokens opcional; recorta lo que recibe el modelo
+    (el texto guardado es el original, con 'tokens_ahorrados')
+    """
+    print(f"\n{'='*70}")
+    print("PIPELINE DESCARGA -> ANÁLISIS -> GUARDADO")
+    print(f"{'='*70}")
+    print(f"Salida incremental: {ruta_salida}")
+    print("-" * 70)
+
+    cola_analisis = asyncio.Queue(maxsize=tam_cola)
+    cola_guardado = asyncio.Queue(maxsize=tam_cola)
+    acumulados = [] if acumular else None
+    tiempos = {'descarga': 0.0, 'analisis': 0.0, 'guardado': 0.0}
+
+    inicio = time.perf_counter()
+    await asyncio.gather(
+        _etapa_descarga(paginas, cola_analisis, tiempos),
+        _etapa_analisis(motor, cache, cola_analisis, cola_guardado, tiempos, enrutador, preprocesador),
+        _etapa_guardado(ruta_salida, cola_guardado, acumulados, tiempos, serie),
+    )
+    total = time.perf_counter() - inicio
+    escritos = tiempos.pop('escritos', 0)
+
+    print(f"\n✓ Pipeline completado: {escritos} tweets en {total:.1f}s")
+    print(f"  Tiempo por etapa: descarga {tiempos['descarga']:.1f}s | "
+          f"análisis {tiempos['analisis']:.1f}s | guardado {tiempos['guardado']:.1f}s "
+          f"(suma {sum(tiempos.values()):.1f}s)")
+    if preprocesador is not None:
+        print(f"✓ {preprocesador.resumen()}")
+    if cache is not None:
+        print(f"✓ {cache.resumen()}")
+    if serie is not None:
+        print(f"✓ {serie.resumen()}")
+    if enrutador is not None:
+        print(f"✓ {enrutador.resumen()}")
+    print(f"{'='*70}\n")
+    return acumulados if acumular else []
+
+
+def ejecutar_pipeline_sincrono(paginas, motor, ruta_salida, cache=None, tam_cola=4, acumular=True, serie=None,
+                               enrutador=None, preprocesador=None):
+    """Atajo para llamar al pipeline desde código síncrono (p. ej. el menú de main)."""
+    return asyncio.run(ejecutar_pipeline(paginas, motor, ruta_salida, cache, tam_cola, acumular, serie, enrutador,
+                                         preprocesador))
@@ -0,0 +1,126 @@
+"""
+PLANIFICADOR DE DESCARGAS CONCURRENTES
+Descarga a la vez muchas búsquedas y cuentas compartiendo un único
+LimitadorTasa, para sacar el máximo de tweets por ventana de límite sin
+llegar nunca a un 429.
+
+Ejecutar:
+python planificador_descargas.py --queries bitcoin ethereum --usuarios IdiazAyuso --cantidad 500
+python planificador_descargas.py --queries bitcoin --url-base http://127.0.0.1:8765   (servidor falso)
+
+El token se toma de --token o de la variable de entorno TWITTER_BEARER_TOKEN.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from directorio_usuarios import DirectorioUsuarios
+from limitador_tasa import LimitadorTasa
+from recolector_tweets import ClienteAPIv2, RecolectorPaginado, ErrorAPITwitter, URL_API_TWITTER
+
+
+class PlanificadorDescargas:
+    """Ejecuta trabajos de recolección (búsquedas y usuarios) en paralelo con límite compartido."""
+
+    def __init__(self, bearer_token, url_base=URL_API_TWITTER, max_concurrencia=8,
+                 ruta_checkpoint="recoleccion_checkpoint.json", ruta_usuarios="usuarios_cache.json"):
+        self.limitador = LimitadorTasa()
+        self.cliente = ClienteAPIv2(bearer_token, url_base, limitador=self.limitador)
+        # Pool de conexiones HTTP acorde a la concurrencia
+        adaptador = requests.adapters.HTTPAdapter(pool_connections=max_concurrencia,
+                                                  pool_maxsize=max_concurrencia)
+        self.cliente.sesion.mount('http://', adaptador)
+        self.cliente.sesion.mount('https://', adaptador)
+        self.directorio = DirectorioUsuarios(ruta_usuarios)
+        self.recolector = RecolectorPaginado(self.cliente, ruta_checkpoint, self.directorio)
+        self.max_concurrencia = max_concurrencia
+
+    def _trabajo_busqueda(self, query, objetivo):
+        return self.recolector.recolectar(self.recolector.paginas_busqueda(query, objetivo))
+
+    def _trabajo_usuario(self, usuario, objetivo):
+        return self.recolector.recolectar(self.recolector.paginas_usuario(usuario, objetivo))
+
+    def descargar(self, queries=(), usernames=(), objetivo=500):
+        """Devuelve {nombre_trabajo: [tweets]}; los trabajos fallidos quedan con lista vacía."""
+        print(f"\n{'='*70}")
+        print(f"DESCARGA CONCURRENTE: {len(queries)} búsquedas, {len(usernames)} usuarios")
+        print(f"{'='*70}")
+        print(f"Objetivo por trabajo: {objetivo} | Concurrencia: {self.max_concurrencia}")
+        print("-" * 70)
+
+        resultados = {}
+        inicio = time.perf_counter()
+
+        # Toda la lista de cuentas se resuelve de una vez (o desde la caché)
+        usuarios = {}
+        if usernames:
+            try:
+                usuarios = self.recolector.obtener_usuarios(usernames)
+            except (ErrorAPITwitter, requests.RequestException) as e:
+                print(f"✗ No se pudieron resolver los usuarios: {e}")
+            print(f"✓ {self.directorio.resumen()}")
+        for username in usernames:
+            if not usuarios.get(username.lstrip('@').lower()):
+                print(f"✗ Usuario @{username} no encontrado.")
+                resultados[f"usuario:{username}"] = []
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrencia) as pool:
+            futuros = {}
+            for query in queries:
+                futuros[pool.submit(self._trabajo_busqueda, query, objetivo)] = f"busqueda:{query}"
+            for username in usernames:
+                usuario = usuarios.get(username.lstrip('@').lower())
+                if usuario:
+                    futuros[pool.submit(self._trabajo_usuario, usuario, objetivo)] = f"usuario:{username}"
+
+            for futuro in as_completed(futuros):
+                nombre = futuros[futuro]
+                try:
+                    resultados[nombre] = futuro.result()
+                    print(f"✓ {nombre}: {len(resultados[nombre])} tweets")
+                except (ErrorAPITwitter, requests.RequestException) as e:
+                    print(f"✗ {nombre}: {e} (se puede reanudar desde el checkpoint)")
+                    resultados[nombre] = []
+
+        total = sum(len(t) for t in resultados.values())
+        duracion = time.perf_counter() - inicio
+        print(f"\n✓ {total} tweets en {duracion:.1f}s ({total / duracion if duracion else 0:.0f} tweets/s)")
+        print(f"✓ {self.limitador.resumen()}")
+        print(f"{'='*70}\n")
+        return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Descarga concurrente de búsquedas y usuarios de Twitter")
+    parser.add_argument('--queries', nargs='*', default=[])
+    parser.add_argument('--usuarios', nargs='*', default=[])
+    parser.add_argument('--cantidad', type=int, default=500, help="Tweets por trabajo")
+    parser.add_argument('--concurrencia', type=int, default=8)
+    parser.add_argument('--token', default=os.environ.get('TWITTER_BEARER_TOKEN', ''))
+    parser.add_argument('--url-base', default=URL_API_TWITTER)
+    parser.add_argument('--salida', default='descargas', help="Directorio de salida (un NDJSON por trabajo)")
+    args = parser.parse_args()
+
+    if not args.token:
+        parser.error("falta el Bearer Token (--token o TWITTER_BEARER_TOKEN)")
+
+    planificador = PlanificadorDescargas(args.token, args.url_base, args.concurrencia)
+    resultados = planificador.descargar(args.queries, args.usuarios, args.cantidad)
+
+    os.makedirs(args.salida, exist_ok=True)
+    for nombre, tweets in resultados.items():
+        archivo = os.path.join(args.salida, nombre.replace(':', '_').replace('/', '_') + '.jsonl')
+        with open(archivo, 'w', encoding='utf-8') as f:
+            for tweet in tweets:
+                f.write(json.dumps(tweet, ensure_ascii=False) + '\n')
+        print(f"✓ {archivo}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+PREPROCESADO QUE AHORRA TOKENS ANTES DE LA INFERENCIA
+Normaliza los elementos de los tweets que inflan el número de subtokens sin
+aportar al sentimiento, y recorta cada texto a un presupuesto de tokens:
+
+- URLs (también las truncadas 'https://t.co/ab…') -> 'url'
+- Prefijo de retweet 'RT @usuario:' -> se elimina
+- Menciones -> '@usuario'; varias seguidas se reducen a `max_menciones`
+- Cadenas de hashtags: se conservan los `max_hashtags` primeros
+- Caracteres repetidos ('buenísimooooo') -> `max_repeticion`; risas -> 'jaja'
+- Secuencias de emojis: sin repetidos consecutivos y como mucho `max_emojis`
+  (pysentimiento convierte cada emoji en varias palabras)
+- Espacios y saltos de línea -> un espacio
+
+Los placeholders son los mismos que usa pysentimiento ('@usuario', 'url'),
+así que su preprocesado posterior los deja igual. Todas las expresiones
+regulares se compilan una vez al importar el módulo.
+"""
+
+import re
+
+PRESUPUESTO_TOKENS = 64
+
+# Unidad de emoji: bandera (dos letras regionales) o emoji base con modificadores y uniones ZWJ
+_BASE_EMOJI = "[\U0001F300-\U0001FAFF\u2600-\u27BF\u2B00-\u2BFF\u203C\u2049]"
+_MODIFICADOR_EMOJI = "[\uFE0F\U0001F3FB-\U0001F3FF]"
+_EMOJI = (f"(?:[\U0001F1E6-\U0001F1FF]{{2}}"
+          f"|(?!{_MODIFICADOR_EMOJI}){_BASE_EMOJI}{_MODIFICADOR_EMOJI}*(?:\u200D{_BASE_EMOJI}{_MODIFICADOR_EMOJI}*)*)")
+
+RE_RT = re.compile(r"^RT @\w+:\s*")
+RE_URL = re.compile(r"https?://\S*|www\.\S+")
+RE_MENCION = re.compile(r"@\w+")
+RE_RACHA_MENCIONES = re.compile(r"@usuario(?:\s+@usuario)+")
+RE_RACHA_URLS = re.compile(r"\burl(?:\s+url\b)+")
+RE_RACHA_HASHTAGS = re.compile(r"#\w+(?:\s+#\w+)+")
+RE_HASHTAG = re.compile(r"#\w+")
+RE_RISA = re.compile(r"\b(?:[jJ][aeiAEI]){2,}[jJ]?\b")
+RE_REPETICION = re.compile(r"(\D)\1{2,}")
+RE_EMOJI = re.compile(_EMOJI)
+RE_RACHA_EMOJIS = re.compile(f"{_EMOJI}(?:\\s*{_EMOJI})+")
+RE_ESPACIOS = re.compile(r"\s+")
+
+# Estimación barata de tokens: palabras y signos sueltos (cota inferior de los subtokens)
+RE_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def contar_tokens_estimados(textos):
+    """Número aproximado de tokens de cada texto (sin cargar ningún tokenizador)."""
+    return [len(RE_TOKEN.findall(texto)) for texto in textos]
+
+
+def contador_tokenizador(tokenizer):
+    """Contador exacto de subtokens (sin tokens especiales) con un tokenizador de HuggingFace."""
+    def contar(textos):
+        if not textos:
+            return []
+        return [len(ids) for ids in tokenizer(list(textos), add_special_tokens=False)['input_ids']]
+    return contar
+
+
+def contador_de_motor(motor):
+    """Contador con el tokenizador del primer modelo del motor (resuelto en el primer uso).
+
+    Solo se carga el analizador de la primera tarea del motor, no todos. Si el motor
+    no expone sus analizadores (p. ej. PoolInferencia) se usa la estimación.
+    """
+    contador = []
+
+    def contar(textos):
+        if not contador:
+            analizador = getattr(motor, 'analizador', None)
+            contador.append(contador_tokenizador(analizador(motor.tareas[0]).tokenizer)
+                            if analizador else contar_tokens_estimados)
+        return contador[0](textos)
+    return contar
+
+
+class PreprocesadorTokens:
+    """Normaliza textos de tweets y los recorta a `max_tokens` (estimados); acumula el ahorro."""
+
+    def __init__(self, max_tokens=PRESUPUESTO_TOKENS, max_menciones=1, max_hashtags=2,
+                 max_repeticion=2, max_emojis=3, contador=None):
+        self.max_tokens = max_tokens
+        self.max_menciones = max_menciones
+        self.max_hashtags = max_hashtags
+        self.max_repeticion = max_repeticion
+        self.max_emojis = max_emojis
+        self.contador = contador or contar_tokens_estimados
+        self.textos = 0
+        self.recortados = 0
+        self.tokens_antes = 0
+        self.tokens_despues = 0
+
+    # ---------- Normalización ----------
+
+    def _racha_emojis(self, coincidencia):
+        unidades = []
+        for emoji in RE_EMOJI.findall(coincidencia.group(0)):
+            if not unidades or unidades[-1] != emoji:
+                unidades.append(emoji)
+        return ' '.join(unidades[:self.max_emojis])
+
+    def _racha_hashtags(self, coincidencia):
+        return ' '.join(RE_HASHTAG.findall(coincidencia.group(0))[:self.max_hashtags])
+
+    def _recortar(self, texto):
+        """Corta el texto tras el token número `max_tokens` (estimado), sin partir palabras."""
+        if not self.max_tokens:
+            return texto
+        for i, token in enumerate(RE_TOKEN.finditer(texto)):
+            if i == self.max_tokens:
+                self.recortados += 1
+                return texto[:token.start()].rstrip()
+        return texto
+
+    def normalizar(self, texto):
+        """Texto normalizado y recortado al presupuesto."""
+        # Comprobaciones baratas con `in` para saltarse las pasadas que no aplican
+        if texto.startswith('RT @'):
+            texto = RE_RT.sub('', texto)
+        if 'http' in texto or 'www.' in texto:
+            texto = RE_URL.sub('url', texto)
+            texto = RE_RACHA_URLS.sub('url', texto)
+        if '@' in texto:
+            texto = RE_MENCION.sub('@usuario', texto)
+            texto = RE_RACHA_MENCIONES.sub(' '.join(['@usuario'] * self.max_menciones), texto)
+        if '#' in texto:
+            texto = RE_RACHA_HASHTAGS.sub(self._racha_hashtags, texto)
+        texto = RE_RISA.sub('jaja', texto)
+        texto = RE_REPETICION.sub(lambda m: m.group(1) * self.max_repeticion, texto)
+        texto = RE_RACHA_EMOJIS.sub(self._racha_emojis, texto)
+        texto = RE_ESPACIOS.sub(' ', texto).strip()
+        return self._recortar(texto)
+
+    # ---------- Lotes ----------
+
+    def procesar(self, textos):
+        """Devuelve (textos normalizados, tokens ahorrados por texto)."""
+        normalizados = [self.normalizar(t) for t in textos]
+        antes = self.contador(textos)
+        despues = self.contador(normalizados)
+        self.textos += len(textos)
+        self.tokens_antes += sum(antes)
+        self.tokens_despues += sum(despues)
+        return normalizados, [a - d for a, d in zip(antes, despues)]
+
+    @property
+    def fraccion_ahorrada(self):
+        return 1 - self.tokens_despues / self.tokens_antes if self.tokens_antes else 0.0
+
+    def resumen(self):
+        ahorrados = self.tokens_antes - self.tokens_despues
+        media = ahorrados / self.textos if self.textos else 0.0
+        return (f"Preprocesado: {self.textos} textos, {self.tokens_antes} -> {self.tokens_despues} tokens "
+                f"({self.fraccion_ahorrada:.1%} menos, {media:.1f} por tweet), "
+                f"{self.recortados} recortados a {self.max_tokens}")
@@ -0,0 +1,395 @@
+"""
+PRONÓSTICO ARIMA/SARIMA DE LA SERIE DE SENTIMIENTOS
+Busca el mejor orden (p,d,q)(P,D,Q,s) por AIC sobre la serie por periodo
+(serie_temporal) de un archivo de resultados y pronostica los siguientes
+periodos.
+
+- Con rejillas y series grandes los candidatos se ajustan en paralelo en un
+  pool de procesos (1 hilo BLAS por proceso), de modo que el tiempo total
+  tiende al del candidato más lento y no a la suma. Con pocas observaciones
+  o pocos candidatos (o --procesos 1) se ajustan en serie en este proceso:
+  cada ajuste tarda milisegundos y arrancar los procesos 'spawn' (que
+  reimportan statsmodels) costaría más que toda la búsqueda
+- Poda por AIC: si un candidato queda más de `margen_aic` por encima del
+  mejor, se cancelan los pendientes que solo le añaden términos AR/MA no
+  estacionales (misma d y misma parte estacional); y con `paciencia` la
+  búsqueda se detiene tras ese número de ajustes seguidos sin mejora
+- Caché por hash de la serie: los AIC y parámetros ajustados se guardan en
+  disco; si la serie no cambió, ni se vuelve a buscar ni a ajustar
+
+REQUISITOS:
+pip install statsmodels numpy
+
+Ejecutar:
+python pronostico_arima.py tweets_analizados.json --variable polaridad_media --pasos 24
+python pronostico_arima.py cosecha.jsonl --resolucion hora --s 24 --procesos 8
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from lector_resultados import leer_tweets
+from serie_temporal import serie_desde_tweets
+
+try:
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+    STATSMODELS_DISPONIBLE = True
+except ImportError:
+    STATSMODELS_DISPONIBLE = False
+
+VARIABLES = ('polaridad_media', 'tweets', 'POS', 'NEG', 'NEU')
+
+# Por debajo de cualquiera de los dos umbrales la búsqueda va en serie
+MIN_CANDIDATOS_POOL = 32
+MIN_OBSERVACIONES_POOL = 500
+
+
+# ============================================
+# CANDIDATOS
+# ============================================
+
+def generar_candidatos(p=(0, 2), d=(0, 1), q=(0, 2), P=(0, 1), D=(0, 1), Q=(0, 1), s=0, n_observaciones=None):
+    """Lista de ((p,d,q), (P,D,Q,s)) de menor a mayor número de parámetros.
+
+    Cada rango es (mínimo, máximo) inclusivo. Sin estacionalidad (s < 2) o
+    con menos de dos ciclos de datos solo se generan órdenes ARIMA.
+    """
+    def rango(limites):
+        return range(limites[0], limites[1] + 1)
+
+    estacional = s >= 2 and (n_observaciones is None or n_observaciones >= 2 * s)
+    estacionales = itertools.product(rango(P), rango(D), rango(Q)) if estacional else [(0, 0, 0)]
+    candidatos = [
+        ((pp, dd, qq), (PP, DD, QQ, s if estacional and (PP or DD or QQ) else 0))
+        for (PP, DD, QQ) in estacionales
+        for pp, dd, qq in itertools.product(rango(p), rango(d), rango(q))
+    ]
+    candidatos = list(dict.fromkeys(candidatos))
+    candidatos.sort(key=lambda c: (sum(c[0]) + sum(c[1][:3]), c))
+    return candidatos
+
+
+def _domina(simple, complejo):
+    """True si `complejo` solo añade términos AR/MA no estacionales a `simple`.
+
+    La parte estacional y las diferenciaciones deben coincidir: añadir
+    estacionalidad sí puede arreglar un modelo malo, así que no se poda.
+    """
+    (p1, d1, q1), estacional1 = simple
+    (p2, d2, q2), estacional2 = complejo
+    if d1 != d2 or tuple(estacional1) != tuple(estacional2):
+        return False
+    return p2 >= p1 and q2 >= q1 and (p2, q2) != (p1, q1)
+
+
+# ============================================
+# AJUSTE (PROCESO TRABAJADOR)
+# ============================================
+
+_VARIABLES_HILOS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+
+def _inicializar_trabajador():
+    warnings.filterwarnings('ignore')
+
+
+def _modelo(valores, orden, orden_estacional):
+    return SARIMAX(np.asarray(valores, dtype=float), order=orden, seasonal_order=orden_estacional,
+                   enforce_stationarity=False, enforce_invertibility=False)
+
+
+def _ajustar(argumentos):
+    """Ajusta un candidato; devuelve dict con aic, parámetros y tiempo (o el error)."""
+    valores, orden, orden_estacional, max_iter = argumentos
+    inicio = time.perf_counter()
+    try:
+        ajuste = _modelo(valores, orden, orden_estacional).fit(disp=False, maxiter=max_iter)
+        aic = float(ajuste.aic)
+        return {
+            'orden': list(orden), 'orden_estacional': list(orden_estacional),
+            'aic': aic if np.isfinite(aic) else None,
+            'parametros': [float(x) for x in ajuste.params],
+            'segundos': time.perf_counter() - inicio
+        }
+    except Exception as e:
+        return {
+            'orden': list(orden), 'orden_estacional': list(orden_estacional),
+            'aic': None, 'error': str(e)[:200], 'segundos': time.perf_counter() - inicio
+        }
+
+
+# ============================================
+# CACHÉ DE AJUSTES
+# ============================================
+
+def hash_serie(valores, extra=''):
+    """Huella de la serie (valores redondeados + contexto) para la caché de ajustes."""
+    datos = np.round(np.asarray(valores, dtype=np.float64), 10).tobytes()
+    return hashlib.sha256(datos + extra.encode('utf-8')).hexdigest()[:32]
+
+
+class CacheAjustes:
+    """Resultados de búsquedas por hash de serie, en un JSON por serie."""
+
+    def __init__(self, directorio="ajustes_arima"):
+        self.directorio = directorio
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, huella):
+        return os.path.join(self.directorio, f"{huella}.json")
+
+    def obtener(self, huella):
+        ruta = self._ruta(huella)
+        if os.path.exists(ruta):
+            with open(ruta, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return None
+
+    def guardar(self, huella, busqueda):
+        temporal = self._ruta(huella) + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(busqueda, f, ensure_ascii=False)
+        os.replace(temporal, self._ruta(huella))
+
+
+# ============================================
+# BÚSQUEDA
+# ============================================
+
+def _es_malo(resultado, mejor, margen_aic):
+    """True si el ajuste falló o quedó más de `margen_aic` por encima del mejor."""
+    return resultado['aic'] is None or resultado['aic'] > mejor['aic'] + margen_aic
+
+
+def _buscar_en_serie(valores, candidatos, margen_aic, paciencia, max_iter):
+    """Ajusta los candidatos uno a uno en este proceso; devuelve (resultados, mejor, podados)."""
+    resultados = []
+    mejor = None
+    podados = 0
+    sin_mejora = 0
+    malos = []
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore')
+        for i, candidato in enumerate(candidatos):
+            # Misma poda que en el pool: lo que solo añade parámetros a un candidato malo no se ajusta
+            if any(_domina(malo, candidato) for malo in malos):
+                podados += 1
+                continue
+            resultado = _ajustar((valores, candidato[0], candidato[1], max_iter))
+            resultados.append(resultado)
+            aic = resultado['aic']
+
+            if aic is not None and (mejor is None or aic < mejor['aic']):
+                mejor = resultado
+                sin_mejora = 0
+            else:
+                sin_mejora += 1
+
+            if _es_malo(resultado, mejor, margen_aic):
+                malos.append(candidato)
+
+            if paciencia and sin_mejora >= paciencia:
+                podados += len(candidatos) - i - 1
+                break
+    return resultados, mejor, podados
+
+
+def _buscar_en_pool(valores, candidatos, procesos, margen_aic, paciencia, max_iter):
+    """Ajusta los candidatos en un pool de procesos; devuelve (resultados, mejor, podados)."""
+    resultados = []
+    mejor = None
+    podados = 0
+    sin_mejora = 0
+
+    # Un hilo BLAS por proceso para no sobresuscribir la CPU; los procesos 'spawn'
+    # heredan el entorno al arrancar, antes de importar numpy
+    entorno_previo = {v: os.environ.get(v) for v in _VARIABLES_HILOS}
+    os.environ.update({v: '1' for v in _VARIABLES_HILOS})
+
+    try:
+        contexto_mp = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto_mp,
+                                 initializer=_inicializar_trabajador) as pool:
+            futuros = {
+                pool.submit(_ajustar, (valores, c[0], c[1], max_iter)): c
+                for c in candidatos
+            }
+            for futuro in as_completed(futuros):
+                if futuro.cancelled():
+                    continue
+                resultado = futuro.result()
+                resultados.append(resultado)
+                aic = resultado['aic']
+
+                if aic is not None and (mejor is None or aic < mejor['aic']):
+                    mejor = resultado
+                    sin_mejora = 0
+                else:
+                    sin_mejora += 1
+
+                # Poda: los que solo añaden parámetros a un candidato malo no se ajustan
+                if _es_malo(resultado, mejor, margen_aic):
+                    candidato = futuros[futuro]
+                    for pendiente, c in futuros.items():
+                        if _domina(candidato, c) and not pendiente.done() and pendiente.cancel():
+                            podados += 1
+
+                if paciencia and sin_mejora >= paciencia:
+                    podados += sum(1 for f in futuros if not f.done() and f.cancel())
+                    break
+    finally:
+        for variable, valor in entorno_previo.items():
+            if valor is None:
+                os.environ.pop(variable, None)
+            else:
+                os.environ[variable] = valor
+    return resultados, mejor, podados
+
+
+def procesos_busqueda(n_candidatos, n_observaciones, procesos=None):
+    """Procesos que usará la búsqueda: 1 (en serie) si la rejilla o la serie son pequeñas."""
+    procesos = procesos or os.cpu_count() or 1
+    if n_candidatos < MIN_CANDIDATOS_POOL or n_observaciones < MIN_OBSERVACIONES_POOL:
+        return 1
+    return min(procesos, n_candidatos)
+
+
+def buscar_orden(valores, candidatos, procesos=None, margen_aic=10.0, paciencia=None, max_iter=50,
+                 cache=None, contexto=''):
+    """Ajusta los candidatos (en paralelo si compensa) y devuelve la búsqueda con el mejor por AIC.
+
+    Devuelve {'mejor': resultado, 'resultados': [...], 'podados': n, 'segundos': t,
+    'segundos_serie': suma de ajustes, 'procesos': n, 'desde_cache': bool}.
+    """
+    if not STATSMODELS_DISPONIBLE:
+        raise ImportError("La búsqueda ARIMA requiere statsmodels (pip install statsmodels)")
+
+    huella = hash_serie(valores, contexto + json.dumps(candidatos))
+    if cache is not None:
+        guardada = cache.obtener(huella)
+        if guardada:
+            guardada['desde_cache'] = True
+            return guardada
+
+    procesos = procesos_busqueda(len(candidatos), len(valores), procesos)
+    inicio = time.perf_counter()
+    if procesos > 1:
+        resultados, mejor, podados = _buscar_en_pool(list(valores), candidatos, procesos,
+                                                     margen_aic, paciencia, max_iter)
+    else:
+        resultados, mejor, podados = _buscar_en_serie(list(valores), candidatos,
+                                                      margen_aic, paciencia, max_iter)
+
+    busqueda = {
+        'mejor': mejor,
+        'resultados': sorted(resultados, key=lambda r: (r['aic'] is None, r['aic'] or 0)),
+        'podados': podados,
+        'segundos': time.perf_counter() - inicio,
+        'segundos_serie': sum(r['segundos'] for r in resultados),
+        'procesos': procesos,
+        'desde_cache': False
+    }
+    if cache is not None and mejor is not None:
+        cache.guardar(huella, busqueda)
+    return busqueda
+
+
+def pronosticar(valores, mejor, pasos=12, alfa=0.05):
+    """Pronóstico con los parámetros ya ajustados (sin volver a optimizar).
+
+    Devuelve {'media', 'inferior', 'superior'} como listas de `pasos` valores.
+    """
+    modelo = _modelo(valores, tuple(mejor['orden']), tuple(mejor['orden_estacional']))
+    resultado = modelo.filter(np.asarray(mejor['parametros']))
+    prediccion = resultado.get_forecast(pasos)
+    intervalo = np.asarray(prediccion.conf_int(alpha=alfa))
+    return {
+        'media': [float(x) for x in prediccion.predicted_mean],
+        'inferior': [float(x) for x in intervalo[:, 0]],
+        'superior': [float(x) for x in intervalo[:, 1]]
+    }
+
+
+def _formato_orden(resultado):
+    p, d, q = resultado['orden']
+    P, D, Q, s = resultado['orden_estacional']
+    return f"({p},{d},{q})" + (f"({P},{D},{Q},{s})" if s else "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Búsqueda paralela de órdenes ARIMA/SARIMA sobre la serie de sentimientos")
+    parser.add_argument('archivo', nargs='?', default='tweets_analizados.json')
+    parser.add_argument('--variable', default='polaridad_media', choices=VARIABLES)
+    parser.add_argument('--resolucion', default=None, choices=['minuto', 'hora', 'dia'],
+                        help="Default: según el intervalo que cubren los tweets")
+    parser.add_argument('--p', nargs=2, type=int, default=[0, 2], metavar=('MIN', 'MAX'))
+    parser.add_argument('--d', nargs=2, type=int, default=[0, 1], metavar=('MIN', 'MAX'))
+    parser.add_argument('--q', nargs=2, type=int, default=[0, 2], metavar=('MIN', 'MAX'))
+    parser.add_argument('--P', nargs=2, type=int, default=[0, 1], metavar=('MIN', 'MAX'))
+    parser.add_argument('--D', nargs=2, type=int, default=[0, 1], metavar=('MIN', 'MAX'))
+    parser.add_argument('--Q', nargs=2, type=int, default=[0, 1], metavar=('MIN', 'MAX'))
+    parser.add_argument('--s', type=int, default=None, help="Periodo estacional (default: 24 por hora, 7 por día)")
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--margen-aic', type=float, default=10.0)
+    parser.add_argument('--paciencia', type=int, default=None)
+    parser.add_argument('--pasos', type=int, default=12, help="Periodos a pronosticar")
+    parser.add_argument('--cache', default='ajustes_arima', help="Directorio de la caché ('' para desactivarla)")
+    args = parser.parse_args()
+
+    serie = serie_desde_tweets(list(leer_tweets(args.archivo)), args.resolucion)
+    datos = serie.serie()
+    valores = datos[args.variable]
+    s = args.s if args.s is not None else {'minuto': 60, 'hora': 24, 'dia': 7}[serie.resolucion]
+
+    print(f"\n{'='*70}")
+    print(f"BÚSQUEDA ARIMA/SARIMA: {args.variable} por {serie.resolucion}")
+    print(f"{'='*70}")
+    print(f"✓ {serie.resumen()}")
+    if len(valores) < 8:
+        print("✗ Serie demasiado corta para ajustar un modelo")
+        return
+
+    candidatos = generar_candidatos(tuple(args.p), tuple(args.d), tuple(args.q),
+                                    tuple(args.P), tuple(args.D), tuple(args.Q), s, len(valores))
+    procesos = procesos_busqueda(len(candidatos), len(valores), args.procesos)
+    modo = f"{procesos} en paralelo" if procesos > 1 else "en serie (rejilla o serie pequeña, o --procesos 1)"
+    print(f"Candidatos: {len(candidatos)} | Procesos: {modo}")
+    print("-" * 70)
+
+    cache = CacheAjustes(args.cache) if args.cache else None
+    busqueda = buscar_orden(valores, candidatos, procesos, args.margen_aic, args.paciencia,
+                            cache=cache, contexto=f"{args.variable}|{serie.resolucion}")
+    mejor = busqueda['mejor']
+    if mejor is None:
+        print("✗ Ningún candidato se pudo ajustar")
+        return
+
+    if busqueda['desde_cache']:
+        print("✓ Serie sin cambios: resultado tomado de la caché (sin reajustar)")
+    else:
+        duracion = f"{busqueda['segundos']:.1f}s"
+        if busqueda.get('procesos', 1) > 1:
+            duracion += f" (en serie serían {busqueda['segundos_serie']:.1f}s)"
+        print(f"✓ {len(busqueda['resultados'])} ajustes en {duracion}; {busqueda['podados']} podados por AIC")
+    for resultado in busqueda['resultados'][:5]:
+        aic = f"{resultado['aic']:.2f}" if resultado['aic'] is not None else "error"
+        print(f"  {_formato_orden(resultado):<20} AIC {aic}")
+
+    prediccion = pronosticar(valores, mejor, args.pasos)
+    print(f"\n--- PRONÓSTICO {_formato_orden(mejor)} ({args.pasos} periodos) ---")
+    for i, (media, inf, sup) in enumerate(zip(prediccion['media'], prediccion['inferior'], prediccion['superior']), 1):
+        print(f"  t+{i:<3}: {media:8.3f}  [{inf:8.3f}, {sup:8.3f}]")
+    print(f"{'='*70}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+PUNTUADOR DE SENTIMIENTO BASADO EN EL LÉXICO AFINN
+Puntuación barata (sin modelos) a partir de lexico_afinn.csv, pensada como
+primera etapa de la cascada léxico -> transformer.
+
+- Palabras repetidas en el CSV con varias puntuaciones se promedian
+- Se reconocen expresiones de varias palabras ("buque insignia")
+- Se detectan negaciones cercanas ("no está mal"), que el léxico no sabe manejar
+"""
+
+import csv
+import math
+import os
+import re
+
+RUTA_LEXICO_AFINN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lexico_afinn.csv')
+
+NEGACIONES = {'no', 'nunca', 'jamás', 'jamas', 'ni', 'tampoco', 'nada', 'nadie', 'ningún', 'ninguna', 'sin'}
+
+# Distancia máxima (en palabras) entre una negación y la palabra que modifica
+VENTANA_NEGACION = 3
+
+# Constante de normalización (como en VADER): puntaje / sqrt(puntaje² + ALFA) en [-1, 1]
+ALFA_NORMALIZACION = 15
+
+
+def cargar_lexico_afinn(ruta=RUTA_LEXICO_AFINN):
+    """Carga el léxico AFINN en español como dict {expresión: puntuación media}."""
+    sumas = {}
+    cuentas = {}
+    with open(ruta, 'r', encoding='utf-8') as f:
+        lector = csv.reader(f)
+        next(lector, None)  # cabecera: palabra,puntuacion,word
+        for fila in lector:
+            if len(fila) < 2:
+                continue
+            try:
+                puntuacion = float(fila[1])
+            except ValueError:
+                continue
+            palabra = fila[0].strip().lower()
+            sumas[palabra] = sumas.get(palabra, 0.0) + puntuacion
+            cuentas[palabra] = cuentas.get(palabra, 0) + 1
+
+    return {p: sumas[p] / cuentas[p] for p in sumas}
+
+
+def puntuar_afinn(texto, lexico):
+    """Puntúa un texto con el léxico AFINN.
+
+    Devuelve dict con 'puntaje' (suma), 'puntaje_normalizado' en [-1, 1],
+    'palabras_clave' encontradas y 'negacion' (True si alguna está negada).
+    """
+    palabras = re.findall(r'\b\w+\b', texto.lower())
+
+    puntaje = 0.0
+    palabras_clave = []
+    negacion = False
+    i = 0
+    while i < len(palabras):
+        # Expresiones de hasta 3 palabras, la más larga primero
+        for n in (3, 2, 1):
+            expresion = ' '.join(palabras[i:i + n])
+            if len(palabras[i:i + n]) == n and expresion in lexico:
+                valor = lexico[expresion]
+                if valor:
+                    puntaje += valor
+                    palabras_clave.append(expresion)
+                    previas = palabras[max(0, i - VENTANA_NEGACION):i]
+                    if any(p in NEGACIONES for p in previas):
+                        negacion = True
+                i += n
+                break
+        else:
+            i += 1
+
+    return {
+        'puntaje': puntaje,
+        'puntaje_normalizado': puntaje / math.sqrt(puntaje * puntaje + ALFA_NORMALIZACION),
+        'palabras_clave': palabras_clave,
+        'negacion': negacion
+    }
+
+
+def etiqueta_afinn(resultado, banda=(-0.5, 0.5)):
+    """Etiqueta 'POS'/'NEG' si el puntaje cae fuera de la banda de incertidumbre y no hay negación.
+
+    Devuelve None si el léxico no es concluyente.
+    """
+    if resultado['negacion']:
+        return None
+    if resultado['puntaje_normalizado'] > banda[1]:
+        return 'POS'
+    if resultado['puntaje_normalizado'] < banda[0]:
+        return 'NEG'
+    return None
+
+
+def probabilidades_afinn(resultado):
+    """Distribución {'POS', 'NEG', 'NEU'} a partir del puntaje normalizado (suma 1).
+
+    La masa |normalizado| va al polo de su signo y el resto a NEU, de modo que
+    P(POS) - P(NEG) es el puntaje normalizado (la polaridad que da el modelo).
+    """
+    normalizado = resultado['puntaje_normalizado']
+    return {
+        'POS': max(0.0, normalizado),
+        'NEG': max(0.0, -normalizado),
+        'NEU': 1.0 - abs(normalizado)
+    }
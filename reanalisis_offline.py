@@ -0,0 +1,110 @@
+"""
+REANÁLISIS OFFLINE DE COSECHAS GUARDADAS
+Vuelve a puntuar tweets de archivos de resultados existentes (.json o .jsonl)
+con el modelo, backend o léxico actuales, sin llamar a la API de Twitter.
+
+Los archivos se leen de forma incremental (lector_resultados) y pasan por el
+mismo pipeline solapado lectura -> análisis -> guardado que la descarga en
+streaming, sin acumular los resultados en memoria: el ritmo lo marca la
+inferencia.
+
+Ejecutar:
+python reanalisis_offline.py tweets_analizados.json
+python reanalisis_offline.py cosecha1.jsonl cosecha2.json --salida reanalizado.parquet --backend int8
+python reanalisis_offline.py tweets_analizados.json --tareas sentiment --lexico lexico_afinn.csv
+python reanalisis_offline.py cosecha1.jsonl --idiomas enrutar
+python reanalisis_offline.py cosecha1.jsonl --preprocesado 48
+"""
+
+import argparse
+import os
+
+from motor_analisis import MotorAnalisis, TAREAS_DISPONIBLES
+from cache_inferencia import CacheInferencia
+from lector_resultados import leer_por_lotes
+from pipeline_async import ejecutar_pipeline_sincrono
+from puntuador_lexico import cargar_lexico_afinn, puntuar_afinn, RUTA_LEXICO_AFINN
+from enrutador_idioma import EnrutadorIdioma, MODOS_ENRUTADO
+from preprocesado_tokens import PreprocesadorTokens, contador_de_motor, PRESUPUESTO_TOKENS
+
+# Campos de un análisis anterior que se descartan antes de volver a puntuar
+CAMPOS_ANALISIS = (
+    'sentimiento', 'sentimiento_confianza', 'sentimiento_scores', 'sentimiento_etapa',
+    'emocion', 'emocion_confianza', 'emocion_scores',
+    'odio', 'odio_scores',
+    'lexico_puntaje', 'lexico_normalizado',
+    'tokens_ahorrados', 'idioma_detectado', 'idioma_fuente', 'ruta_idioma'
+)
+
+
+def tweets_sin_analisis(rutas, tam_lote, lexico=None):
+    """Lotes de tweets originales (sin campos de análisis previos), con el puntaje léxico si se pide."""
+    for lote in leer_por_lotes(rutas, tam_lote):
+        limpios = []
+        for tweet in lote:
+            tweet = {k: v for k, v in tweet.items() if k not in CAMPOS_ANALISIS}
+            if lexico is not None:
+                puntuacion = puntuar_afinn(tweet['texto'], lexico)
+                tweet['lexico_puntaje'] = puntuacion['puntaje']
+                tweet['lexico_normalizado'] = puntuacion['puntaje_normalizado']
+            limpios.append(tweet)
+        yield limpios
+
+
+def reanalizar(rutas, ruta_salida, motor, cache=None, lexico=None, tam_lote=None, enrutador=None,
+               preprocesador=None):
+    """Reanaliza los archivos `rutas` y escribe los resultados en `ruta_salida`."""
+    tam_lote = tam_lote or motor.tamano_envio
+    lotes = tweets_sin_analisis(rutas, tam_lote, lexico)
+    ejecutar_pipeline_sincrono(lotes, motor, ruta_salida, cache, acumular=False, enrutador=enrutador,
+                               preprocesador=preprocesador)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reanaliza archivos de tweets guardados sin usar la API")
+    parser.add_argument('archivos', nargs='+', help="Archivos .json o .jsonl de resultados anteriores")
+    parser.add_argument('--salida', default=None,
+                        help="Archivo de salida .jsonl o .parquet (default: <primer archivo>_reanalizado.jsonl)")
+    parser.add_argument('--tareas', nargs='+', default=['sentiment', 'emotion'], choices=list(TAREAS_DISPONIBLES))
+    parser.add_argument('--backend', default='pytorch', choices=['pytorch', 'int8', 'onnx'])
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--lote', type=int, default=None, help="Tweets por lote leído (default: tamaño de envío del motor)")
+    parser.add_argument('--lexico', nargs='?', const=RUTA_LEXICO_AFINN, default=None,
+                        help="Añadir el puntaje AFINN con este léxico")
+    parser.add_argument('--preprocesado', nargs='?', type=int, const=PRESUPUESTO_TOKENS, default=None,
+                        metavar='PRESUPUESTO', help="Normalizar y recortar los textos a este presupuesto de tokens "
+                                                    "antes del modelo")
+    parser.add_argument('--cache', default='cache_inferencia.sqlite', help="Caché de inferencia ('' para desactivarla)")
+    parser.add_argument('--idiomas', default='omitir', choices=list(MODOS_ENRUTADO) + ['ninguno'],
+                        help="Tweets no españoles: omitirlos, enrutarlos a modelos de su idioma o "
+                             "pasarlos todos por el modelo en español ('ninguno')")
+    args = parser.parse_args()
+
+    salida = args.salida or os.path.splitext(args.archivos[0])[0] + '_reanalizado.jsonl'
+    if os.path.abspath(salida) in {os.path.abspath(a) for a in args.archivos}:
+        parser.error("el archivo de salida no puede ser uno de los de entrada")
+
+    motor = MotorAnalisis(tareas=args.tareas, batch_size=args.batch_size, backend=args.backend)
+    cache = CacheInferencia(args.cache) if args.cache else None
+    lexico = cargar_lexico_afinn(args.lexico) if args.lexico else None
+    preprocesador = None
+    if args.preprocesado:
+        preprocesador = PreprocesadorTokens(args.preprocesado, contador=contador_de_motor(motor))
+    enrutador = None
+    if args.idiomas != 'ninguno':
+        enrutador = EnrutadorIdioma(motor, args.idiomas, fabrica_motor=lambda lang, tareas: MotorAnalisis(
+            tareas, lang=lang, batch_size=args.batch_size, backend=args.backend))
+
+    print(f"Reanalizando {len(args.archivos)} archivo(s) con {', '.join(args.tareas)} ({args.backend})")
+    try:
+        reanalizar(args.archivos, salida, motor, cache, lexico, args.lote, enrutador, preprocesador)
+    finally:
+        motor.cerrar()
+        if enrutador is not None:
+            enrutador.cerrar()
+        if cache is not None:
+            cache.cerrar()
+
+
+if __name__ == "__main__":
+    main()
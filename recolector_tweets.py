@@ -0,0 +1,356 @@
+"""
+RECOLECTOR PAGINADO Y REANUDABLE DE TWEETS (API v2)
+Descarga más allá del límite de 100 tweets por llamada siguiendo los tokens
+de paginación, hasta un número objetivo de tweets o una ventana de tiempo.
+
+CHECKPOINTS:
+Cada página descargada se añade a un archivo JSONL del trabajo y solo
+después se guarda en el checkpoint el último token de paginación y el id más
+reciente visto. Si la ejecución se interrumpe, la siguiente entrega primero
+las páginas guardadas y continúa desde ese token sin volver a descargarlas.
+Una ejecución nueva descarga desde el principio; con `incremental=True` solo
+pide los tweets posteriores a la última recolección completada (since_id).
+
+Usa la API REST directamente (requests) con una URL base configurable, de
+modo que puede probarse contra servidor_twitter_falso.py sin red.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import requests
+
+URL_API_TWITTER = "https://api.twitter.com"
+
+CAMPOS_TWEET = 'created_at,author_id,public_metrics,lang'
+CAMPOS_USUARIO = 'username,name,verified'
+
+
+class ErrorAPITwitter(Exception):
+    """Error devuelto por la API de Twitter (código HTTP distinto de 2xx)."""
+
+    def __init__(self, codigo, mensaje, cabeceras=None):
+        super().__init__(f"HTTP {codigo}: {mensaje}")
+        self.codigo = codigo
+        self.cabeceras = cabeceras or {}
+
+
+# ============================================
+# CLIENTE HTTP
+# ============================================
+
+class ClienteAPIv2:
+    """Cliente mínimo de la API v2 con URL base configurable.
+
+    Con `grabar_en` cada respuesta se añade a un archivo JSON que
+    servidor_twitter_falso.py puede reproducir después. Con `limitador`
+    (LimitadorTasa) las peticiones respetan los límites de la API y los 429
+    se reintentan hasta `max_reintentos` veces.
+    """
+
+    def __init__(self, bearer_token, url_base=URL_API_TWITTER, timeout=30, grabar_en=None,
+                 limitador=None, max_reintentos=5):
+        self.url_base = url_base.rstrip('/')
+        self.timeout = timeout
+        self.grabar_en = grabar_en
+        self.limitador = limitador
+        self.max_reintentos = max_reintentos
+        self._candado_grabacion = threading.Lock()
+        self.sesion = requests.Session()
+        self.sesion.headers['Authorization'] = f"Bearer {bearer_token}"
+
+    def get(self, ruta, params=None):
+        """GET a la API; devuelve (json, cabeceras) o lanza ErrorAPITwitter."""
+        intento = 0
+        while True:
+            if self.limitador:
+                self.limitador.adquirir(ruta)
+            try:
+                respuesta = self.sesion.get(self.url_base + ruta, params=params, timeout=self.timeout)
+            except requests.RequestException:
+                if self.limitador:
+                    self.limitador.liberar(ruta)
+                raise
+
+            if respuesta.status_code == 429 and self.limitador and intento < self.max_reintentos:
+                self.limitador.penalizar(ruta, respuesta.headers, intento)
+                intento += 1
+                continue
+            if self.limitador:
+                self.limitador.actualizar(ruta, respuesta.headers)
+            break
+
+        if not respuesta.ok:
+            raise ErrorAPITwitter(respuesta.status_code, respuesta.text[:200], respuesta.headers)
+        datos = respuesta.json()
+        if self.grabar_en:
+            with self._candado_grabacion:
+                self._grabar(ruta, params, datos)
+        return datos, respuesta.headers
+
+    def _grabar(self, ruta, params, datos):
+        grabaciones = []
+        if os.path.exists(self.grabar_en):
+            with open(self.grabar_en, 'r', encoding='utf-8') as f:
+                grabaciones = json.load(f)
+        grabaciones.append({'ruta': ruta, 'params': dict(params or {}), 'respuesta': datos})
+        with open(self.grabar_en, 'w', encoding='utf-8') as f:
+            json.dump(grabaciones, f, ensure_ascii=False)
+
+
+# ============================================
+# CONVERSIÓN A DICTS DE TWEET
+# ============================================
+
+def _fecha(created_at):
+    """'2025-11-05T17:51:29.000Z' -> '2025-11-05 17:51:29' (mismo formato que tweepy + strftime)."""
+    if not created_at:
+        return 'N/A'
+    return created_at.replace('T', ' ')[:19]
+
+
+def convertir_respuesta(respuesta, autor=None):
+    """Convierte una respuesta JSON de la API v2 en la lista de dicts de tweets del proyecto.
+
+    autor: dict del usuario si todos los tweets son suyos (timeline de usuario).
+    """
+    usuarios = {u['id']: u for u in respuesta.get('includes', {}).get('users', [])}
+    tweets = []
+    for tweet in respuesta.get('data', []):
+        usuario = autor or usuarios.get(tweet.get('author_id'))
+        metricas = tweet.get('public_metrics', {})
+        tweets.append({
+            'id': str(tweet['id']),
+            'texto': tweet['text'],
+            'fecha': _fecha(tweet.get('created_at')),
+            'autor_username': usuario['username'] if usuario else 'N/A',
+            'autor_nombre': usuario['name'] if usuario else 'N/A',
+            'verificado': usuario.get('verified', False) if usuario else False,
+            'idioma': tweet.get('lang', 'N/A'),
+            'likes': metricas.get('like_count', 0),
+            'retweets': metricas.get('retweet_count', 0),
+            'respuestas': metricas.get('reply_count', 0),
+        })
+    return tweets
+
+
+# ============================================
+# RECOLECTOR
+# ============================================
+
+class RecolectorPaginado:
+    """Sigue la paginación de la API guardando un checkpoint por trabajo."""
+
+    def __init__(self, cliente, ruta_checkpoint="recoleccion_checkpoint.json", directorio=None):
+        self.cliente = cliente
+        self.ruta_checkpoint = ruta_checkpoint
+        self.directorio = directorio
+        self._candado = threading.Lock()
+        self._estado = self._cargar_checkpoint()
+
+    # ---------- Checkpoint ----------
+
+    def _cargar_checkpoint(self):
+        if os.path.exists(self.ruta_checkpoint):
+            with open(self.ruta_checkpoint, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _actualizar_estado(self, clave, valores):
+        """Fusiona `valores` en el estado del trabajo y guarda el checkpoint."""
+        # Con candado porque varios trabajos pueden recolectar en paralelo
+        with self._candado:
+            self._estado.setdefault(clave, {}).update(valores)
+            self._guardar_checkpoint()
+
+    def _guardar_checkpoint(self):
+        # Escritura atómica: un corte a mitad no deja el checkpoint corrupto
+        temporal = self.ruta_checkpoint + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(self._estado, f, ensure_ascii=False, indent=2)
+        os.replace(temporal, self.ruta_checkpoint)
+
+    def estado(self, clave):
+        with self._candado:
+            return dict(self._estado.get(clave, {}))
+
+    # ---------- Recolección ----------
+
+    def _ruta_paginas(self, clave):
+        """Archivo JSONL donde se guardan las páginas ya descargadas de un trabajo."""
+        resumen = hashlib.sha1(clave.encode('utf-8')).hexdigest()[:16]
+        return f"{os.path.splitext(self.ruta_checkpoint)[0]}_paginas_{resumen}.jsonl"
+
+    def _paginas_guardadas(self, ruta, n):
+        """Las `n` primeras páginas guardadas; descarta cualquier página escrita sin checkpoint."""
+        paginas = []
+        if os.path.exists(ruta):
+            with open(ruta, 'r', encoding='utf-8') as f:
+                for linea in f:
+                    if len(paginas) == n:
+                        break
+                    paginas.append(json.loads(linea))
+        # Reescribe el archivo con exactamente las páginas que cubre el checkpoint
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            for pagina in paginas:
+                f.write(json.dumps(pagina, ensure_ascii=False) + '\n')
+        os.replace(temporal, ruta)
+        return paginas
+
+    def _guardar_pagina(self, ruta, tweets):
+        with open(ruta, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(tweets, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _paginar(self, clave, ruta, params, parametro_token, objetivo, autor=None, incremental=False):
+        """Generador de páginas con reanudación desde el checkpoint.
+
+        Cada página se guarda en disco antes de avanzar el checkpoint, así que
+        una ejecución interrumpida (incluso si el consumidor no llegó a
+        procesar la página) no pierde nada: al reanudar se vuelven a entregar
+        las páginas guardadas y se sigue desde el último token.
+        """
+        estado = self.estado(clave)
+        ruta_paginas = self._ruta_paginas(clave)
+
+        if estado and not estado.get('completado'):
+            # Ejecución interrumpida: entregar lo ya descargado y continuar donde se quedó
+            token = estado.get('next_token')
+            recogidos = estado.get('recogidos', 0)
+            newest_id = estado.get('newest_id')
+            since_id = estado.get('since_id')
+            guardadas = self._paginas_guardadas(ruta_paginas, estado.get('paginas', 0))
+            print(f"↻ Reanudando '{clave}' desde el checkpoint ({recogidos} tweets ya recogidos)")
+            for pagina in guardadas:
+                yield pagina
+            # Sin token ya se había descargado la última página
+            pendiente = bool(token)
+        else:
+            # Ejecución nueva. Solo en modo incremental se limita a los tweets
+            # posteriores a la última recolección completada (since_id)
+            token = None
+            recogidos = 0
+            newest_id = None
+            since_id = estado.get('newest_id') if incremental else None
+            guardadas = []
+            pendiente = True
+            if os.path.exists(ruta_paginas):
+                os.remove(ruta_paginas)
+            self._actualizar_estado(clave, {'next_token': None, 'newest_id': None, 'since_id': since_id,
+                                            'recogidos': 0, 'paginas': 0, 'completado': False})
+
+        if since_id:
+            params['since_id'] = since_id
+        paginas = len(guardadas)
+
+        while pendiente and recogidos < objetivo:
+            params['max_results'] = min(100, max(10, objetivo - recogidos))
+            if token:
+                params[parametro_token] = token
+            else:
+                params.pop(parametro_token, None)
+
+            respuesta, _ = self.cliente.get(ruta, params)
+            tweets = convertir_respuesta(respuesta, autor)[:objetivo - recogidos]
+            meta = respuesta.get('meta', {})
+
+            if newest_id is None and meta.get('newest_id'):
+                newest_id = meta['newest_id']
+            recogidos += len(tweets)
+            token = meta.get('next_token')
+
+            # Primero la página al disco, después el checkpoint que la da por recogida
+            if tweets:
+                self._guardar_pagina(ruta_paginas, tweets)
+                paginas += 1
+            self._actualizar_estado(clave, {
+                'next_token': token,
+                'newest_id': newest_id or since_id,
+                'since_id': since_id,
+                'recogidos': recogidos,
+                'paginas': paginas,
+                'completado': False
+            })
+
+            if tweets:
+                yield tweets
+            if not token:
+                break
+
+        # Solo se marca completado cuando el consumidor ha recibido todas las páginas
+        self._actualizar_estado(clave, {'next_token': None, 'paginas': 0, 'completado': True})
+        if os.path.exists(ruta_paginas):
+            os.remove(ruta_paginas)
+        print(f"✓ '{clave}': {recogidos} tweets recogidos")
+
+    def paginas_busqueda(self, query, objetivo=1000, start_time=None, end_time=None, incremental=False):
+        """Páginas de /2/tweets/search/recent hasta `objetivo` tweets o la ventana de tiempo.
+
+        start_time / end_time en formato ISO 8601 ('2025-11-05T00:00:00Z'). Con
+        `incremental` solo se piden los tweets posteriores a la última recolección
+        completada de la misma búsqueda.
+        """
+        params = {
+            'query': query,
+            'tweet.fields': CAMPOS_TWEET,
+            'expansions': 'author_id',
+            'user.fields': CAMPOS_USUARIO
+        }
+        if start_time:
+            params['start_time'] = start_time
+        if end_time:
+            params['end_time'] = end_time
+        clave = f"busqueda:{query}|{start_time or ''}|{end_time or ''}"
+        return self._paginar(clave, '/2/tweets/search/recent', params, 'next_token', objetivo,
+                             incremental=incremental)
+
+    def paginas_usuario(self, usuario, objetivo=1000, start_time=None, end_time=None,
+                      incremental=False):
+        """Páginas de /2/users/:id/tweets; `usuario` es el dict {'id', 'username', 'name', ...}."""
+        params = {'tweet.fields': CAMPOS_TWEET}
+        if start_time:
+            params['start_time'] = start_time
+        if end_time:
+            params['end_time'] = end_time
+        clave = f"usuario:{usuario['id']}|{start_time or ''}|{end_time or ''}"
+        return self._paginar(clave, f"/2/users/{usuario['id']}/tweets", params,
+                             'pagination_token', objetivo, autor=usuario, incremental=incremental)
+
+    def consultar_usuarios(self, usernames):
+        """Una petición a /2/users/by (hasta 100 usernames); devuelve los usuarios encontrados."""
+        respuesta, _ = self.cliente.get('/2/users/by', {
+            'usernames': ','.join(usernames),
+            'user.fields': CAMPOS_USUARIO
+        })
+        return respuesta.get('data', [])
+
+    def obtener_usuarios(self, usernames):
+        """Resuelve varios usernames en lote: {username_en_minúsculas: dict de usuario o None}.
+
+        Con `directorio` (DirectorioUsuarios) solo se consultan los que no están en caché.
+        """
+        if self.directorio is not None:
+            return self.directorio.resolver(usernames, self.consultar_usuarios)
+        usernames = list(dict.fromkeys(u.lstrip('@').lower() for u in usernames if u))
+        resultado = dict.fromkeys(usernames)
+        for i in range(0, len(usernames), 100):
+            for usuario in self.consultar_usuarios(usernames[i:i + 100]):
+                resultado[usuario['username'].lower()] = usuario
+        return resultado
+
+    def obtener_usuario(self, username):
+        """Resuelve un username a su dict de usuario (o None si no existe)."""
+        return self.obtener_usuarios([username]).get(username.lstrip('@').lower())
+
+    def recolectar(self, paginas):
+        """Consume un generador de páginas y devuelve todos los tweets en una lista."""
+        tweets = []
+        for pagina in paginas:
+            tweets.extend(pagina)
+            print(f"  Recogidos {len(tweets)} tweets...", end='\r')
+        print()
+        return tweets
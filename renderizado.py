@@ -0,0 +1,249 @@
+"""
+RENDERIZADO DE GRÁFICOS DEL ANÁLISIS
+Separa la preparación de datos del dibujo para que el coste de pintar no
+dependa del número de tweets:
+
+- preparar_datos_graficos: reduce los tweets a arrays pequeños con NumPy.
+  Por encima de UMBRAL_PUNTOS la evolución se agrupa en cubetas y el
+  engagement se resume en un histograma 2D que se pinta como hexbin
+- dibujar_analisis: dibuja los cinco paneles sobre una figura de matplotlib
+- renderizar_en_segundo_plano: guarda la figura en un archivo desde un
+  proceso aparte con el backend no interactivo Agg, sin bloquear al llamador;
+  esperar_renderizados recoge el resultado de cada figura y devuelve las fallidas
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from estadisticas_columnares import TablaTweets
+from serie_temporal import serie_desde_tweets
+
+# Por encima de este número de tweets se usan vistas agregadas
+UMBRAL_PUNTOS = 5000
+MAX_PUNTOS_EVOLUCION = 400
+CELDAS_ENGAGEMENT = (80, 40)
+
+COLORES_SENTIMIENTO = {'POS': '#66bb6a', 'NEG': '#ef5350', 'NEU': '#ffa726'}
+EMOCIONES_ES = {
+    'joy': 'Alegría', 'sadness': 'Tristeza', 'anger': 'Enojo',
+    'surprise': 'Sorpresa', 'disgust': 'Disgusto', 'fear': 'Miedo'
+}
+COLORES_EMOCION = {
+    'joy': '#ffeb3b', 'sadness': '#2196f3', 'anger': '#f44336',
+    'surprise': '#9c27b0', 'disgust': '#4caf50', 'fear': '#ff9800'
+}
+
+
+# ============================================
+# PREPARACIÓN DE DATOS
+# ============================================
+
+def _reagrupar(valores, pesos, max_puntos):
+    """Media ponderada de tramos consecutivos para dejar a lo sumo `max_puntos` valores."""
+    n = len(valores)
+    if n <= max_puntos:
+        return np.arange(n), np.asarray(valores, dtype=float)
+    limites = np.linspace(0, n, max_puntos + 1).astype(int)
+    suma = np.add.reduceat(np.asarray(valores, dtype=float) * pesos, limites[:-1])
+    total = np.add.reduceat(pesos, limites[:-1])
+    medias = np.divide(suma, total, out=np.zeros_like(suma), where=total > 0)
+    return limites[:-1], medias
+
+
+def preparar_datos_graficos(tweets_analizados, estadisticas, serie=None, umbral=UMBRAL_PUNTOS):
+    """Reduce el análisis a un dict pequeño (y serializable) con lo necesario para dibujar."""
+    tabla = estadisticas.get('tabla') or TablaTweets(tweets_analizados)
+    n = len(tabla)
+    agregado = n > umbral
+    datos = {
+        'n': n,
+        'agregado': agregado,
+        'sentimientos': dict(estadisticas.get('sentimientos', {})),
+        'emociones': dict(estadisticas.get('emociones', {}))
+    }
+
+    # Evolución: polaridad media por cubeta de tiempo (o por posición si no hay fechas)
+    serie = serie or serie_desde_tweets(tweets_analizados)
+    datos_serie = serie.serie()
+    if datos_serie['inicio']:
+        pesos = np.asarray(datos_serie['tweets'], dtype=float)
+        indices, medias = _reagrupar(datos_serie['polaridad_media'], pesos, MAX_PUNTOS_EVOLUCION)
+        datos['evolucion'] = {
+            'x': [datos_serie['inicio'][i] for i in indices],
+            'y': medias.tolist(),
+            'etiqueta_x': f"Fecha (por {serie.resolucion})"
+        }
+    else:
+        signo = np.array([1.0 if e == 'POS' else -1.0 if e == 'NEG' else 0.0
+                          for e in tabla.categorias['sentimiento']] + [0.0])
+        polaridades = signo[tabla.codigos['sentimiento']]  # el código -1 cae en el 0.0 final
+        indices, medias = _reagrupar(polaridades, np.ones(n), MAX_PUNTOS_EVOLUCION)
+        datos['evolucion'] = {'x': indices.tolist(), 'y': medias.tolist(), 'etiqueta_x': 'Tweet #'}
+
+    # Top usuarios
+    top = tabla.agrupar('autor', limite=10)
+    datos['usuarios'] = [(g['clave'], g['tweets']) for g in top]
+
+    # Engagement: puntos individuales o histograma 2D (posición x log10(1 + engagement))
+    if not agregado:
+        codigos = tabla.codigos['sentimiento']
+        etiquetas = tabla.categorias['sentimiento']
+        datos['engagement'] = {
+            'y': tabla.engagement.tolist(),
+            'sentimiento': [etiquetas[c] if c >= 0 else None for c in codigos]
+        }
+    else:
+        y = np.log10(1 + tabla.engagement.astype(float))
+        conteos, bordes_x, bordes_y = np.histogram2d(np.arange(n), y, bins=CELDAS_ENGAGEMENT)
+        centros_x = (bordes_x[:-1] + bordes_x[1:]) / 2
+        centros_y = (bordes_y[:-1] + bordes_y[1:]) / 2
+        xx, yy = np.meshgrid(centros_x, centros_y, indexing='ij')
+        ocupadas = conteos > 0
+        datos['engagement'] = {
+            'x': xx[ocupadas].tolist(),
+            'y': yy[ocupadas].tolist(),
+            'conteos': conteos[ocupadas].tolist(),
+            'extension': [0, n, float(bordes_y[0]), float(bordes_y[-1])]
+        }
+    return datos
+
+
+# ============================================
+# DIBUJO
+# ============================================
+
+def dibujar_analisis(fig, datos, titulo="Análisis de Tweets"):
+    """Dibuja los cinco paneles del análisis sobre `fig`."""
+    from matplotlib.patches import Patch
+
+    gs = fig.add_gridspec(2, 3, hspace=0.3, wspace=0.3)
+
+    # 1. Distribución de Sentimientos (Pie)
+    ax1 = fig.add_subplot(gs[0, 0])
+    sentimientos = datos['sentimientos']
+    labels = ['Positivo', 'Negativo', 'Neutral']
+    sizes = [sentimientos.get('POS', 0), sentimientos.get('NEG', 0), sentimientos.get('NEU', 0)]
+    if sum(sizes):
+        ax1.pie(sizes, labels=labels, colors=[COLORES_SENTIMIENTO[e] for e in ('POS', 'NEG', 'NEU')],
+                autopct='%1.1f%%', startangle=90, textprops={'fontsize': 10, 'weight': 'bold'})
+    ax1.set_title('Distribución de Sentimientos', fontsize=14, fontweight='bold')
+
+    # 2. Distribución de Emociones (Barras)
+    ax2 = fig.add_subplot(gs[0, 1:])
+    emo_ordenadas = sorted(datos['emociones'].items(), key=lambda x: x[1], reverse=True)
+    ax2.barh([EMOCIONES_ES.get(e, e) for e, _ in emo_ordenadas], [v for _, v in emo_ordenadas],
+             color=[COLORES_EMOCION.get(e, '#999') for e, _ in emo_ordenadas], edgecolor='black', linewidth=1.5)
+    ax2.set_xlabel('Cantidad de Tweets', fontsize=12, fontweight='bold')
+    ax2.set_title('Distribución de Emociones', fontsize=14, fontweight='bold')
+    ax2.grid(axis='x', alpha=0.3)
+
+    # 3. Evolución de Sentimientos (polaridad media)
+    ax3 = fig.add_subplot(gs[1, 0])
+    evolucion = datos['evolucion']
+    if evolucion['x']:
+        marcador = 'o' if len(evolucion['x']) <= 100 else None
+        ax3.plot(evolucion['x'], evolucion['y'], marker=marcador, linestyle='-', markersize=4,
+                 linewidth=1.5, color='#2196f3', markerfacecolor='#ff5722')
+        if evolucion['etiqueta_x'].startswith('Fecha'):
+            ax3.tick_params(axis='x', labelrotation=30)
+    ax3.axhline(y=0, color='gray', linestyle='--', linewidth=1)
+    ax3.set_xlabel(evolucion['etiqueta_x'], fontsize=12, fontweight='bold')
+    ax3.set_ylabel('Polaridad media', fontsize=12, fontweight='bold')
+    ax3.set_title('Evolución de Sentimientos', fontsize=14, fontweight='bold')
+    ax3.set_ylim(-1.05, 1.05)
+    ax3.set_yticks([-1, 0, 1])
+    ax3.set_yticklabels(['Negativo', 'Neutral', 'Positivo'])
+    ax3.grid(True, alpha=0.3)
+
+    # 4. Top Usuarios
+    ax4 = fig.add_subplot(gs[1, 1])
+    if datos['usuarios']:
+        ax4.barh([u[:15] for u, _ in datos['usuarios']], [c for _, c in datos['usuarios']],
+                 color='#9c27b0', edgecolor='black', linewidth=1.5)
+        ax4.set_xlabel('Tweets', fontsize=12, fontweight='bold')
+        ax4.set_title('Top 10 Usuarios Activos', fontsize=14, fontweight='bold')
+        ax4.grid(axis='x', alpha=0.3)
+
+    # 5. Engagement vs Sentimiento
+    ax5 = fig.add_subplot(gs[1, 2])
+    engagement = datos['engagement']
+    if not datos['agregado']:
+        colores = [COLORES_SENTIMIENTO.get(s, COLORES_SENTIMIENTO['NEU']) for s in engagement['sentimiento']]
+        ax5.scatter(range(len(engagement['y'])), engagement['y'], c=colores, alpha=0.6, s=50)
+        ax5.set_ylabel('Engagement (Likes + RTs)', fontsize=12, fontweight='bold')
+        ax5.set_title('Engagement por Tweet', fontsize=14, fontweight='bold')
+        ax5.legend(handles=[
+            Patch(facecolor=COLORES_SENTIMIENTO['POS'], label='Positivo'),
+            Patch(facecolor=COLORES_SENTIMIENTO['NEG'], label='Negativo'),
+            Patch(facecolor=COLORES_SENTIMIENTO['NEU'], label='Neutral')
+        ], loc='upper right')
+    else:
+        # Densidad: los centros de celda ya agregados, pesados por su conteo
+        hexagonos = ax5.hexbin(engagement['x'], engagement['y'], C=engagement['conteos'],
+                               reduce_C_function=np.sum, bins='log',
+                               gridsize=(CELDAS_ENGAGEMENT[0] // 2, CELDAS_ENGAGEMENT[1] // 2),
+                               extent=engagement['extension'], cmap='viridis', mincnt=1)
+        fig.colorbar(hexagonos, ax=ax5, label='Tweets')
+        ax5.set_ylabel('log10(1 + Likes + RTs)', fontsize=12, fontweight='bold')
+        ax5.set_title(f'Engagement por Tweet (densidad, {datos["n"]} tweets)', fontsize=14, fontweight='bold')
+    ax5.set_xlabel('Tweet #', fontsize=12, fontweight='bold')
+    ax5.grid(True, alpha=0.3)
+
+    # Título general
+    fig.suptitle(f'{titulo} - Análisis con PySentimiento', fontsize=18, fontweight='bold', y=0.98)
+
+
+def guardar_figura(datos, ruta, titulo="Análisis de Tweets", dpi=100):
+    """Dibuja y guarda la figura con Agg (sin pyplot ni ventanas); devuelve la ruta."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(18, 10))
+    FigureCanvasAgg(fig)
+    dibujar_analisis(fig, datos, titulo)
+    fig.savefig(ruta, dpi=dpi, bbox_inches='tight')
+    return ruta
+
+
+# ============================================
+# RENDERIZADO EN SEGUNDO PLANO
+# ============================================
+
+_EJECUTOR = None
+# (ruta, Future) de las figuras encoladas y aún no recogidas
+_PENDIENTES = []
+
+
+def _inicializar_renderizador():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def renderizar_en_segundo_plano(datos, ruta, titulo="Análisis de Tweets"):
+    """Encola el guardado de la figura en un proceso aparte; devuelve un Future con la ruta."""
+    global _EJECUTOR
+    if _EJECUTOR is None:
+        _EJECUTOR = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'),
+                                        initializer=_inicializar_renderizador)
+    futuro = _EJECUTOR.submit(guardar_figura, datos, ruta, titulo)
+    _PENDIENTES.append((ruta, futuro))
+    return futuro
+
+
+def esperar_renderizados():
+    """Espera a las figuras pendientes, libera el proceso y devuelve {ruta: error} de las fallidas."""
+    global _EJECUTOR
+    fallidas = {}
+    while _PENDIENTES:
+        ruta, futuro = _PENDIENTES.pop(0)
+        try:
+            futuro.result()
+        except Exception as e:  # incluye BrokenProcessPool si el proceso murió
+            fallidas[ruta] = f"{type(e).__name__}: {e}"
+            print(f"✗ No se pudo guardar el gráfico {ruta}: {fallidas[ruta]}")
+    if _EJECUTOR is not None:
+        _EJECUTOR.shutdown(wait=True)
+        _EJECUTOR = None
+    return fallidas
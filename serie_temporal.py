@@ -0,0 +1,196 @@
+"""
+SERIE TEMPORAL INCREMENTAL DE SENTIMIENTOS
+Agrega los tweets analizados en cubetas de tiempo (minuto, hora o día)
+a partir del campo `fecha`, para que la serie esté lista en todo momento
+sin volver a recorrer el histórico (base para ARIMA/SARIMA).
+
+- Cada fecha se interpreta una sola vez, al agregar el tweet
+- Buffer circular de `capacidad` cubetas: cada ranura guarda el índice de
+  la cubeta a la que pertenece, así que al avanzar en el tiempo las ranuras
+  viejas se reutilizan sin recorrerlas (O(1) por tweet)
+- Marca de agua: se aceptan tweets desordenados mientras no sean más
+  antiguos que (fecha más reciente - retraso_max); las cubetas anteriores
+  a la marca de agua se consideran cerradas
+"""
+
+import calendar
+from datetime import datetime, timezone
+
+RESOLUCIONES = {'minuto': 60, 'hora': 3600, 'dia': 86400}
+CAPACIDAD_POR_DEFECTO = {'minuto': 24 * 60, 'hora': 30 * 24, 'dia': 365}
+ETIQUETAS = ('POS', 'NEG', 'NEU')
+
+
+def parsear_fecha(fecha):
+    """'2025-11-05 17:51:29' (o ISO 8601 con T/Z) -> segundos epoch UTC; None si no es válida."""
+    if not isinstance(fecha, str) or len(fecha) < 10:
+        return None
+    try:
+        instante = datetime.fromisoformat(fecha[:19].replace('T', ' '))
+    except ValueError:
+        return None
+    return calendar.timegm(instante.timetuple())
+
+
+def polaridad(tweet):
+    """Puntaje en [-1, 1]: P(POS) - P(NEG), el puntaje AFINN normalizado o el signo de la etiqueta."""
+    scores = tweet.get('sentimiento_scores') or {}
+    if 'POS' in scores or 'NEG' in scores:
+        return scores.get('POS', 0.0) - scores.get('NEG', 0.0)
+    if tweet.get('lexico_normalizado') is not None:
+        return tweet['lexico_normalizado']
+    return {'POS': 1.0, 'NEG': -1.0}.get(tweet.get('sentimiento'), 0.0)
+
+
+def elegir_resolucion(segundos):
+    """Resolución razonable para un intervalo de `segundos`."""
+    if segundos <= 6 * 3600:
+        return 'minuto'
+    if segundos <= 14 * 86400:
+        return 'hora'
+    return 'dia'
+
+
+class SerieSentimiento:
+    """Conteos y medias por cubeta de tiempo en un buffer circular.
+
+    resolucion: 'minuto', 'hora' o 'dia'
+    capacidad: cubetas que se conservan (las más antiguas se sobrescriben)
+    retraso_max: segundos de desorden tolerados (por defecto, una cubeta)
+    """
+
+    def __init__(self, resolucion='hora', capacidad=None, retraso_max=None):
+        if resolucion not in RESOLUCIONES:
+            raise ValueError(f"Resolución '{resolucion}' no válida. Opciones: {', '.join(RESOLUCIONES)}")
+        self.resolucion = resolucion
+        self.paso = RESOLUCIONES[resolucion]
+        self.capacidad = capacidad or CAPACIDAD_POR_DEFECTO[resolucion]
+        self.retraso_max = self.paso if retraso_max is None else retraso_max
+
+        self._cubeta = [None] * self.capacidad
+        self._tweets = [0] * self.capacidad
+        self._conteos = {e: [0] * self.capacidad for e in ETIQUETAS}
+        self._suma_polaridad = [0.0] * self.capacidad
+        self._suma_confianza = [0.0] * self.capacidad
+
+        self.primera = None   # índice de la cubeta más antigua vista
+        self.ultima = None    # índice de la cubeta más reciente vista
+        self.max_instante = None
+        self.agregados = 0
+        self.descartados_tarde = 0
+        self.fechas_invalidas = 0
+
+    @property
+    def marca_agua(self):
+        """Instante (epoch) por debajo del cual ya no se aceptan tweets."""
+        return None if self.max_instante is None else self.max_instante - self.retraso_max
+
+    def agregar(self, tweet, instante=None):
+        """Suma un tweet analizado a su cubeta; devuelve False si se descarta.
+
+        instante: fecha ya interpretada (epoch), para no volver a parsearla.
+        """
+        if instante is None:
+            instante = parsear_fecha(tweet.get('fecha'))
+        if instante is None:
+            self.fechas_invalidas += 1
+            return False
+        if self.max_instante is not None and instante < self.max_instante - self.retraso_max:
+            self.descartados_tarde += 1
+            return False
+
+        cubeta = instante // self.paso
+        if self.ultima is not None and cubeta <= self.ultima - self.capacidad:
+            # Ya no cabe en el buffer circular
+            self.descartados_tarde += 1
+            return False
+
+        i = cubeta % self.capacidad
+        if self._cubeta[i] != cubeta:
+            # Ranura de una cubeta antigua (o vacía): reutilizarla
+            self._cubeta[i] = cubeta
+            self._tweets[i] = 0
+            for conteos in self._conteos.values():
+                conteos[i] = 0
+            self._suma_polaridad[i] = 0.0
+            self._suma_confianza[i] = 0.0
+
+        self._tweets[i] += 1
+        etiqueta = tweet.get('sentimiento')
+        if etiqueta in self._conteos:
+            self._conteos[etiqueta][i] += 1
+        self._suma_polaridad[i] += polaridad(tweet)
+        self._suma_confianza[i] += tweet.get('sentimiento_confianza', 0.0) or 0.0
+
+        self.ultima = cubeta if self.ultima is None else max(self.ultima, cubeta)
+        self.primera = cubeta if self.primera is None else min(self.primera, cubeta)
+        self.max_instante = instante if self.max_instante is None else max(self.max_instante, instante)
+        self.agregados += 1
+        return True
+
+    def agregar_varios(self, tweets):
+        for tweet in tweets:
+            self.agregar(tweet)
+
+    def serie(self, solo_cerradas=False):
+        """Serie regular (cubetas vacías incluidas) de la más antigua a la más reciente.
+
+        Devuelve {'inicio': [datetime UTC], 'tweets', 'POS', 'NEG', 'NEU', 'polaridad_media', 'confianza_media'}.
+        Con solo_cerradas=True se omiten las cubetas que aún pueden recibir tweets.
+        """
+        columnas = {c: [] for c in ('inicio', 'tweets') + ETIQUETAS + ('polaridad_media', 'confianza_media')}
+        if self.ultima is None:
+            return columnas
+
+        desde = max(self.primera, self.ultima - self.capacidad + 1)
+        hasta = self.ultima
+        if solo_cerradas:
+            hasta = (self.marca_agua // self.paso) - 1
+
+        for cubeta in range(desde, hasta + 1):
+            i = cubeta % self.capacidad
+            vigente = self._cubeta[i] == cubeta
+            n = self._tweets[i] if vigente else 0
+            columnas['inicio'].append(datetime.fromtimestamp(cubeta * self.paso, timezone.utc).replace(tzinfo=None))
+            columnas['tweets'].append(n)
+            for etiqueta in ETIQUETAS:
+                columnas[etiqueta].append(self._conteos[etiqueta][i] if vigente else 0)
+            columnas['polaridad_media'].append(self._suma_polaridad[i] / n if n else 0.0)
+            columnas['confianza_media'].append(self._suma_confianza[i] / n if n else 0.0)
+        return columnas
+
+    def __len__(self):
+        """Número de cubetas de la serie."""
+        if self.ultima is None:
+            return 0
+        return self.ultima - max(self.primera, self.ultima - self.capacidad + 1) + 1
+
+    def resumen(self):
+        return (f"Serie por {self.resolucion}: {self.agregados} tweets en {len(self)} cubetas, "
+                f"{self.descartados_tarde} descartados por tardíos, {self.fechas_invalidas} sin fecha")
+
+
+def serie_desde_tweets(tweets, resolucion=None, **kwargs):
+    """Construye una SerieSentimiento con todos los tweets (sin descartar tardíos).
+
+    Sin `resolucion` se elige según el intervalo que cubren las fechas.
+    """
+    instantes = [parsear_fecha(t.get('fecha')) for t in tweets]
+    validos = [i for i in instantes if i is not None]
+    if not validos:
+        serie = SerieSentimiento(resolucion or 'hora', **kwargs)
+        serie.fechas_invalidas = len(instantes)
+        return serie
+
+    inicio, fin = min(validos), max(validos)
+    resolucion = resolucion or elegir_resolucion(fin - inicio)
+    paso = RESOLUCIONES[resolucion]
+    kwargs.setdefault('retraso_max', fin - inicio)
+    kwargs.setdefault('capacidad', fin // paso - inicio // paso + 1)
+    serie = SerieSentimiento(resolucion, **kwargs)
+    for tweet, instante in zip(tweets, instantes):
+        if instante is None:
+            serie.fechas_invalidas += 1
+        else:
+            serie.agregar(tweet, instante)
+    return serie
@@ -0,0 +1,432 @@
+"""
+SERVICIO LOCAL DE PUNTUACIÓN DE SENTIMIENTO (HTTP + ASYNCIO)
+Servicio de larga duración que carga los modelos una sola vez y expone el
+análisis de tweets_analisis_sentimientos.py a otros procesos por HTTP.
+
+- Las peticiones de un solo texto que llegan a la vez se agrupan en
+  microlotes: el primer texto espera como mucho `ventana_ms` a que lleguen
+  más (o a completar `max_lote`) y el lote entero pasa por el modelo de una vez
+- La inferencia corre en un único hilo aparte; mientras un lote se analiza,
+  los siguientes se acumulan, así que el lote crece con la carga
+- Las respuestas tienen los mismos campos que tweet_analizado (sentimiento,
+  emocion, odio, sus confianzas y scores, lexico_puntaje, enrutado por idioma...)
+
+Modos:
+- modelo:  pysentimiento para todos los textos
+- cascada: el léxico AFINN etiqueta los textos claros y el modelo el resto
+- lexico:  solo el léxico AFINN (sin modelos; arranque inmediato)
+
+Rutas:
+- POST /analizar       {"texto": "...", "id": ..., "idioma": "es"}  -> tweet analizado
+- POST /analizar/lote  {"textos": [...]} o {"tweets": [{...}, ...]} -> {"resultados": [...]}
+- GET  /estado         peticiones, lotes, tamaño medio de lote y tiempos de inferencia
+
+Ejecutar:
+python servicio_sentimiento.py --puerto 8080
+python servicio_sentimiento.py --modo cascada --ventana-ms 5 --max-lote 64
+python servicio_sentimiento.py --modo lexico
+(carga: python carga_servicio.py --lanzar --modo lexico)
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentacion import registrar
+
+MODOS_SERVICIO = ('modelo', 'cascada', 'lexico')
+
+VENTANA_MS = 10
+MAX_LOTE = 32
+
+# Límite del cuerpo de una petición (las de lote llevan como mucho unos miles de textos)
+MAX_CUERPO = 16 * 1024 * 1024
+
+ESTADOS_HTTP = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+# ============================================
+# HTTP MÍNIMO SOBRE ASYNCIO
+# ============================================
+
+async def leer_mensaje_http(lector):
+    """Lee un mensaje HTTP/1.1; devuelve (primera línea, cabeceras en minúsculas, cuerpo) o None al cerrar."""
+    primera = await lector.readline()
+    if not primera:
+        return None
+    cabeceras = {}
+    while True:
+        linea = await lector.readline()
+        if linea in (b'\r\n', b'\n', b''):
+            break
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        cabeceras[nombre.strip().lower()] = valor.strip()
+    longitud = int(cabeceras.get('content-length', 0))
+    if longitud > MAX_CUERPO:
+        raise ValueError(f"cuerpo demasiado grande ({longitud} bytes)")
+    cuerpo = await lector.readexactly(longitud) if longitud else b''
+    return primera.decode('latin-1').strip(), cabeceras, cuerpo
+
+
+def _respuesta_http(codigo, cuerpo, mantener=True):
+    datos = json.dumps(cuerpo, ensure_ascii=False).encode('utf-8')
+    cabecera = (f"HTTP/1.1 {codigo} {ESTADOS_HTTP.get(codigo, '')}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(datos)}\r\n"
+                f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n")
+    return cabecera.encode('latin-1') + datos
+
+
+# ============================================
+# MICROLOTES
+# ============================================
+
+class AgrupadorLotes:
+    """Junta elementos enviados por separado en lotes para `funcion_lote` (síncrona).
+
+    Un lote se cierra al llegar a `max_lote` elementos o `ventana` segundos después
+    del primero. Los lotes se procesan de uno en uno en un hilo propio.
+    """
+
+    def __init__(self, funcion_lote, max_lote=MAX_LOTE, ventana=VENTANA_MS / 1000):
+        self.funcion_lote = funcion_lote
+        self.max_lote = max_lote
+        self.ventana = ventana
+        self.lotes = 0
+        self.elementos = 0
+        self.segundos_lote = 0.0
+        self.mayor_lote = 0
+        self._cola = None
+        self._tarea = None
+        self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inferencia')
+
+    def iniciar(self):
+        self._cola = asyncio.Queue()
+        self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self):
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+        self._ejecutor.shutdown(wait=True)
+
+    async def enviar(self, elemento):
+        """Resultado de `funcion_lote` para `elemento`, analizado junto con los que lleguen a la vez."""
+        futuro = asyncio.get_running_loop().create_future()
+        await self._cola.put((elemento, futuro))
+        return await futuro
+
+    async def _recoger_lote(self):
+        lote = [await self._cola.get()]
+        limite = asyncio.get_running_loop().time() + self.ventana
+        while len(lote) < self.max_lote:
+            # Lo que ya está en la cola entra sin esperar
+            if not self._cola.empty():
+                lote.append(self._cola.get_nowait())
+                continue
+            restante = limite - asyncio.get_running_loop().time()
+            if restante <= 0:
+                break
+            try:
+                lote.append(await asyncio.wait_for(self._cola.get(), restante))
+            except asyncio.TimeoutError:
+                break
+        return lote
+
+    async def _bucle(self):
+        while True:
+            lote = [(e, f) for e, f in await self._recoger_lote() if not f.cancelled()]
+            if not lote:
+                continue
+            try:
+                await self._procesar(lote)
+            except Exception as e:
+                if len(lote) == 1:
+                    if not lote[0][1].done():
+                        lote[0][1].set_exception(e)
+                    continue
+                # Un elemento defectuoso no debe hacer fallar a los demás del lote:
+                # se reintentan de uno en uno y solo recibe el error el que lo provoca
+                for elemento, futuro in lote:
+                    if futuro.done():
+                        continue
+                    try:
+                        await self._procesar([(elemento, futuro)])
+                    except Exception as e_elemento:
+                        if not futuro.done():
+                            futuro.set_exception(e_elemento)
+
+    async def _procesar(self, lote):
+        """Pasa el lote por `funcion_lote` en el hilo de inferencia y resuelve sus futuros."""
+        inicio = time.perf_counter()
+        resultados = await asyncio.get_running_loop().run_in_executor(
+            self._ejecutor, self.funcion_lote, [e for e, _ in lote])
+        if len(resultados) != len(lote):
+            raise RuntimeError(f"funcion_lote devolvió {len(resultados)} resultados para {len(lote)} elementos")
+        duracion = time.perf_counter() - inicio
+        self.lotes += 1
+        self.elementos += len(lote)
+        self.segundos_lote += duracion
+        self.mayor_lote = max(self.mayor_lote, len(lote))
+        registrar('servicio.lote', duracion, len(lote))
+        for (_, futuro), resultado in zip(lote, resultados):
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+    def estado(self):
+        return {
+            'lotes': self.lotes,
+            'textos_en_lotes': self.elementos,
+            'tamano_medio_lote': round(self.elementos / self.lotes, 2) if self.lotes else 0.0,
+            'mayor_lote': self.mayor_lote,
+            'ms_medio_lote': round(self.segundos_lote / self.lotes * 1000, 2) if self.lotes else 0.0,
+            'en_cola': self._cola.qsize() if self._cola is not None else 0,
+            'max_lote': self.max_lote,
+            'ventana_ms': self.ventana * 1000
+        }
+
+
+# ============================================
+# ANÁLISIS
+# ============================================
+
+class AnalizadorServicio:
+    """Analiza listas de tweets (dicts con 'texto') con el modo elegido; se llama desde un único hilo."""
+
+    def __init__(self, modo='modelo', motor=None, cache=None, lexico=None, enrutador=None, banda=None):
+        if modo not in MODOS_SERVICIO:
+            raise ValueError(f"Modo '{modo}' no válido. Opciones: {', '.join(MODOS_SERVICIO)}")
+        if modo != 'lexico' and motor is None:
+            raise ValueError(f"El modo '{modo}' necesita un motor de análisis")
+        if modo != 'modelo' and lexico is None:
+            raise ValueError(f"El modo '{modo}' necesita el léxico AFINN")
+        self.modo = modo
+        self.motor = motor
+        self.cache = cache
+        self.lexico = lexico
+        self.enrutador = enrutador
+        self.banda = banda
+
+    def analizar(self, tweets):
+        import tweets_analisis_sentimientos as analisis
+        from motor_analisis import inferir_textos, construir_tweet_analizado
+        from puntuador_lexico import puntuar_afinn, etiqueta_afinn
+
+        banda = self.banda or analisis.BANDA_INCERTIDUMBRE_LEXICO
+        if self.modo == 'lexico':
+            tweets_analizados = []
+            for tweet in tweets:
+                puntuacion = puntuar_afinn(tweet['texto'], self.lexico)
+                # Sin modelo detrás, lo que el léxico no decide queda como neutral, con
+                # confianza P(NEU) (baja si el puntaje es alto pero está negado)
+                etiqueta = etiqueta_afinn(puntuacion, banda) or 'NEU'
+                tweets_analizados.append(analisis.aplicar_lexico(dict(tweet), puntuacion, etiqueta))
+            return tweets_analizados
+        if self.modo == 'cascada':
+            return analisis.clasificar_en_cascada(tweets, self.motor, self.lexico, banda, self.cache)[0]
+        # Sin línea de progreso: se llamaría una vez por microlote en la salida del servicio
+        if self.enrutador is not None:
+            return self.enrutador.analizar(tweets, cache=self.cache, progreso=False)
+        resultados = inferir_textos([t['texto'] for t in tweets], self.motor, self.cache, progreso=False)
+        return [construir_tweet_analizado(t, r) for t, r in zip(tweets, resultados)]
+
+    def precargar(self):
+        """Carga los modelos antes de aceptar peticiones (la primera no paga la carga)."""
+        if self.motor is not None and hasattr(self.motor, 'analizadores'):
+            self.motor.analizadores
+
+    def cerrar(self):
+        if self.enrutador is not None:
+            self.enrutador.cerrar()
+        if self.motor is not None:
+            self.motor.cerrar()
+        if self.cache is not None:
+            self.cache.cerrar()
+
+
+# ============================================
+# SERVIDOR
+# ============================================
+
+def _tweet_de_peticion(datos):
+    """Dict de tweet a partir del JSON de una petición ('texto' obligatorio).
+
+    Los campos que usa el análisis se validan aquí, antes de entrar en un
+    microlote, para responder 400 en lugar de fallar dentro del lote.
+    """
+    if isinstance(datos, str):
+        datos = {'texto': datos}
+    if not isinstance(datos, dict) or not isinstance(datos.get('texto'), str):
+        raise ValueError("se esperaba un objeto con el campo 'texto'")
+    if 'idioma' in datos and not isinstance(datos['idioma'], str):
+        raise ValueError("el campo 'idioma' debe ser un código de idioma (texto)")
+    return dict(datos)
+
+
+class ServicioSentimiento:
+    """Servidor HTTP asyncio sobre un AnalizadorServicio con microlotes."""
+
+    def __init__(self, analizador, host="127.0.0.1", puerto=8080, max_lote=MAX_LOTE, ventana_ms=VENTANA_MS):
+        self.analizador = analizador
+        self.host = host
+        self.puerto = puerto
+        self.agrupador = AgrupadorLotes(analizador.analizar, max_lote, ventana_ms / 1000)
+        self.peticiones = 0
+        self.errores = 0
+        self.inicio = None
+        self._servidor = None
+
+    async def iniciar(self):
+        self.agrupador.iniciar()
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.puerto)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        self.inicio = time.time()
+        return self
+
+    async def detener(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        await self.agrupador.detener()
+
+    async def servir(self):
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    async def _atender(self, lector, escritor):
+        try:
+            while True:
+                try:
+                    mensaje = await leer_mensaje_http(lector)
+                except ValueError as e:
+                    escritor.write(_respuesta_http(413, {'error': str(e)}, mantener=False))
+                    break
+                if mensaje is None:
+                    break
+                primera, cabeceras, cuerpo = mensaje
+                mantener = cabeceras.get('connection', '').lower() != 'close'
+                codigo, respuesta = await self._despachar(primera, cuerpo)
+                escritor.write(_respuesta_http(codigo, respuesta, mantener))
+                await escritor.drain()
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _despachar(self, primera, cuerpo):
+        try:
+            metodo, ruta, _ = primera.split(' ', 2)
+        except ValueError:
+            return 400, {'error': 'línea de petición no válida'}
+        ruta = ruta.split('?', 1)[0].rstrip('/')
+
+        if ruta == '/estado':
+            return 200, self.estado()
+        if ruta not in ('/analizar', '/analizar/lote'):
+            return 404, {'error': f"ruta desconocida: {ruta}"}
+        if metodo != 'POST':
+            return 405, {'error': 'usar POST'}
+
+        self.peticiones += 1
+        try:
+            datos = json.loads(cuerpo or b'null')
+            if ruta == '/analizar':
+                return 200, await self.agrupador.enviar(_tweet_de_peticion(datos))
+            # Los textos de un lote entran a la vez en la cola, así que llenan microlotes sin esperar
+            entradas = (datos.get('tweets') or datos.get('textos')) if isinstance(datos, dict) else None
+            if not isinstance(entradas, list):
+                raise ValueError("se esperaba 'textos' o 'tweets' con una lista")
+            tweets = [_tweet_de_peticion(e) for e in entradas]
+            resultados = await asyncio.gather(*(self.agrupador.enviar(t) for t in tweets))
+            return 200, {'resultados': list(resultados)}
+        except ValueError as e:  # incluye json.JSONDecodeError
+            self.errores += 1
+            return 400, {'error': str(e)}
+        except Exception as e:
+            self.errores += 1
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+
+    def estado(self):
+        return dict({
+            'modo': self.analizador.modo,
+            'peticiones': self.peticiones,
+            'errores': self.errores,
+            'segundos_activo': round(time.time() - self.inicio, 1) if self.inicio else 0.0
+        }, **self.agrupador.estado())
+
+
+def crear_analizador(modo, tareas, backend, idiomas, cache):
+    """AnalizadorServicio con el motor, el léxico y el enrutador que necesita el modo."""
+    import tweets_analisis_sentimientos as analisis
+    from puntuador_lexico import cargar_lexico_afinn
+
+    lexico = cargar_lexico_afinn() if modo != 'modelo' else None
+    if modo == 'lexico':
+        return AnalizadorServicio(modo, lexico=lexico)
+
+    from motor_analisis import MotorAnalisis
+    from cache_inferencia import CacheInferencia
+    motor = MotorAnalisis(tareas, lang="es", backend=backend)
+    enrutador = analisis.crear_enrutador(motor, idiomas, backend) if modo == 'modelo' else None
+    cache = CacheInferencia(cache) if cache else None
+    return AnalizadorServicio(modo, motor, cache, lexico, enrutador)
+
+
+async def _ejecutar(args):
+    analizador = crear_analizador(args.modo, args.tareas, args.backend, args.idiomas, args.cache)
+    inicio = time.perf_counter()
+    analizador.precargar()
+    if args.modo != 'lexico':
+        print(f"✓ Modelos cargados en {time.perf_counter() - inicio:.1f}s")
+
+    servicio = ServicioSentimiento(analizador, args.host, args.puerto, args.max_lote, args.ventana_ms)
+    await servicio.iniciar()
+    print(f"✓ Servicio de sentimiento ({args.modo}) escuchando en http://{servicio.host}:{servicio.puerto} "
+          f"(microlotes de hasta {args.max_lote} textos, ventana {args.ventana_ms} ms; Ctrl+C para salir)",
+          flush=True)
+    try:
+        await servicio.servir()
+    finally:
+        await servicio.detener()
+        analizador.cerrar()
+
+
+def main():
+    from motor_analisis import TAREAS_DISPONIBLES
+    from enrutador_idioma import MODOS_ENRUTADO
+
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de puntuación de sentimiento con microlotes")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8080)
+    parser.add_argument('--modo', default='modelo', choices=MODOS_SERVICIO)
+    parser.add_argument('--tareas', nargs='+', default=['sentiment', 'emotion'], choices=list(TAREAS_DISPONIBLES))
+    parser.add_argument('--backend', default='pytorch', choices=['pytorch', 'int8', 'onnx'])
+    parser.add_argument('--idiomas', default='ninguno', choices=list(MODOS_ENRUTADO) + ['ninguno'],
+                        help="Enrutado por idioma en modo 'modelo' (por defecto 'ninguno' = todo al modelo "
+                             "en español; con 'omitir' los textos en otro idioma se responden sin análisis)")
+    parser.add_argument('--max-lote', type=int, default=MAX_LOTE, help="Textos máximos por microlote")
+    parser.add_argument('--ventana-ms', type=float, default=VENTANA_MS,
+                        help="Espera máxima del primer texto de un microlote")
+    parser.add_argument('--cache', default='cache_inferencia.sqlite', help="Caché de inferencia ('' para desactivarla)")
+    args = parser.parse_args()
+    if args.modo == 'cascada' and 'sentiment' not in args.tareas:
+        parser.error("el modo cascada necesita la tarea 'sentiment'")
+    if args.idiomas == 'ninguno':
+        args.idiomas = None
+
+    try:
+        asyncio.run(_ejecutar(args))
+    except KeyboardInterrupt:
+        print("\n✓ Servicio detenido")
+
+
+if __name__ == "__main__":
+    main()
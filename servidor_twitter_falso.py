@@ -0,0 +1,307 @@
+"""
+SERVIDOR FALSO DE LA API v2 DE TWITTER
+Reproduce en local páginas de respuesta grabadas (ClienteAPIv2(grabar_en=...))
+o generadas sintéticamente, para probar la recolección sin red ni token.
+
+Rutas emuladas:
+- GET /2/tweets/search/recent       (paginación con next_token)
+- GET /2/users/:id/tweets           (paginación con pagination_token)
+- GET /2/users/by/username/:username
+- GET /2/users/by?usernames=a,b,c   (búsqueda de usuarios en lote)
+
+Opcionalmente emula los límites de tasa por endpoint (cabeceras
+x-rate-limit-* y respuestas 429) y una latencia fija por petición.
+
+Ejecutar:
+python servidor_twitter_falso.py grabaciones.json --puerto 8765
+python servidor_twitter_falso.py --sintetico bitcoin --paginas 20
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from limitador_tasa import clave_endpoint
+
+PREFIJO_TOKEN = "pagina-"
+
+
+# ============================================
+# DATOS
+# ============================================
+
+def generar_grabaciones_sinteticas(query="bitcoin", n_paginas=5, por_pagina=100, n_usuarios=20, semilla=0):
+    """Genera grabaciones de búsqueda con el mismo formato que ClienteAPIv2(grabar_en=...)."""
+    rnd = random.Random(semilla)
+    usuarios = [
+        {'id': str(1000 + i), 'username': f"usuario{i}", 'name': f"Usuario {i}", 'verified': i % 7 == 0}
+        for i in range(n_usuarios)
+    ]
+    frases = [
+        "Me encanta {q}, es fantástico", "{q} es un desastre total", "Hoy se habla mucho de {q}",
+        "No está mal lo de {q}", "Qué miedo da {q}", "Increíble noticia sobre {q}"
+    ]
+
+    grabaciones = []
+    siguiente_id = 2_000_000_000_000_000_000
+    fecha = datetime(2025, 11, 5, 20, 0, 0)
+    for _ in range(n_paginas):
+        datos = []
+        autores = {}
+        for _ in range(por_pagina):
+            usuario = rnd.choice(usuarios)
+            autores[usuario['id']] = usuario
+            siguiente_id -= rnd.randint(1, 1000)
+            fecha -= timedelta(seconds=rnd.randint(1, 120))
+            datos.append({
+                'id': str(siguiente_id),
+                'text': rnd.choice(frases).format(q=query),
+                'created_at': fecha.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                'author_id': usuario['id'],
+                'lang': 'es',
+                'public_metrics': {
+                    'like_count': rnd.randint(0, 500),
+                    'retweet_count': rnd.randint(0, 100),
+                    'reply_count': rnd.randint(0, 50),
+                    'quote_count': 0
+                }
+            })
+        grabaciones.append({
+            'ruta': '/2/tweets/search/recent',
+            'params': {'query': query},
+            'respuesta': {'data': datos, 'includes': {'users': list(autores.values())}}
+        })
+    return grabaciones
+
+
+class _Repositorio:
+    """Páginas grabadas agrupadas por (ruta, clave) en el orden en que se grabaron."""
+
+    def __init__(self, grabaciones):
+        self.paginas = {}
+        self.usuarios = {}
+        for g in grabaciones:
+            ruta = g['ruta']
+            params = g.get('params', {})
+            respuesta = g['respuesta']
+            for usuario in respuesta.get('includes', {}).get('users', []):
+                self.usuarios[usuario['username'].lower()] = usuario
+
+            if ruta.startswith('/2/users/by/username/'):
+                if respuesta.get('data'):
+                    self.usuarios[respuesta['data']['username'].lower()] = respuesta['data']
+                continue
+
+            clave = (ruta, params.get('query', ''))
+            self.paginas.setdefault(clave, []).append(respuesta)
+
+
+# ============================================
+# SERVIDOR
+# ============================================
+
+class _LimitesFalsos:
+    """Contadores por endpoint y ventana fija, como los de la API real."""
+
+    def __init__(self, limite_por_ventana, ventana_segundos):
+        self.limite = limite_por_ventana
+        self.ventana = ventana_segundos
+        self.contadores = {}
+        self.peticiones = 0
+        self.respuestas_429 = 0
+        self._candado = threading.Lock()
+
+    def registrar(self, ruta):
+        """Cuenta la petición; devuelve (permitida, cabeceras x-rate-limit-*)."""
+        with self._candado:
+            self.peticiones += 1
+            if not self.limite:
+                return True, {}
+            ahora = time.time()
+            endpoint = clave_endpoint(ruta)
+            usadas, reset = self.contadores.get(endpoint, (0, 0))
+            if ahora >= reset:
+                usadas, reset = 0, ahora + self.ventana
+            usadas += 1
+            self.contadores[endpoint] = (usadas, reset)
+
+            cabeceras = {
+                'x-rate-limit-limit': self.limite,
+                'x-rate-limit-remaining': max(0, self.limite - usadas),
+                'x-rate-limit-reset': int(reset) + (1 if reset % 1 else 0)
+            }
+            if usadas > self.limite:
+                self.respuestas_429 += 1
+                return False, cabeceras
+            return True, cabeceras
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    repositorio = None
+    limites = None
+    latencia = 0.0
+
+    def log_message(self, formato, *args):
+        pass  # silencioso
+
+    def _responder(self, codigo, cuerpo, cabeceras=None):
+        cabeceras = dict(cabeceras or {}, **getattr(self, '_cabeceras_limite', {}))
+        datos = json.dumps(cuerpo, ensure_ascii=False).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(datos)))
+        for nombre, valor in cabeceras.items():
+            self.send_header(nombre, str(valor))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        if not self.headers.get('Authorization', '').startswith('Bearer '):
+            return self._responder(401, {'title': 'Unauthorized'})
+
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        partes = url.path.strip('/').split('/')
+
+        if self.latencia:
+            time.sleep(self.latencia)
+        permitida, self._cabeceras_limite = self.limites.registrar(url.path)
+        if not permitida:
+            return self._responder(429, {'title': 'Too Many Requests'})
+
+        if url.path.startswith('/2/users/by/username/'):
+            usuario = self.repositorio.usuarios.get(partes[-1].lower())
+            if not usuario:
+                return self._responder(200, {'errors': [{'title': 'Not Found Error'}]})
+            return self._responder(200, {'data': usuario})
+
+        if url.path == '/2/users/by':
+            nombres = [n for n in params.get('usernames', '').split(',') if n]
+            if not nombres or len(nombres) > 100:
+                return self._responder(400, {'title': 'Invalid Request'})
+            encontrados = [self.repositorio.usuarios[n.lower()] for n in nombres
+                           if n.lower() in self.repositorio.usuarios]
+            faltan = [{'value': n, 'title': 'Not Found Error'} for n in nombres
+                      if n.lower() not in self.repositorio.usuarios]
+            cuerpo = {'data': encontrados} if encontrados else {}
+            if faltan:
+                cuerpo['errors'] = faltan
+            return self._responder(200, cuerpo)
+
+        if url.path == '/2/tweets/search/recent':
+            return self._pagina((url.path, params.get('query', '')), params, 'next_token')
+
+        if len(partes) == 4 and partes[:2] == ['2', 'users'] and partes[3] == 'tweets':
+            return self._pagina((url.path, ''), params, 'pagination_token')
+
+        return self._responder(404, {'title': 'Not Found'})
+
+    def _pagina(self, clave, params, parametro_token):
+        paginas = self.repositorio.paginas.get(clave, [])
+        token = params.get(parametro_token, '')
+        indice = int(token[len(PREFIJO_TOKEN):]) if token.startswith(PREFIJO_TOKEN) else 0
+        if indice >= len(paginas):
+            return self._responder(200, {'meta': {'result_count': 0}})
+
+        respuesta = dict(paginas[indice])
+        datos = respuesta.get('data', [])
+        hay_mas = indice + 1 < len(paginas)
+
+        # since_id: solo tweets más nuevos; al encontrar uno antiguo se corta la paginación
+        if params.get('since_id'):
+            nuevos = [t for t in datos if int(t['id']) > int(params['since_id'])]
+            if len(nuevos) < len(datos):
+                hay_mas = False
+            datos = nuevos
+
+        meta = {'result_count': len(datos)}
+        if datos:
+            meta['newest_id'] = datos[0]['id']
+            meta['oldest_id'] = datos[-1]['id']
+        if hay_mas:
+            meta['next_token'] = f"{PREFIJO_TOKEN}{indice + 1}"
+
+        respuesta['meta'] = meta
+        if datos:
+            respuesta['data'] = datos
+        else:
+            respuesta.pop('data', None)
+        return self._responder(200, respuesta)
+
+
+class ServidorTwitterFalso:
+    """Servidor HTTP local en un hilo; usar como context manager o con iniciar/detener.
+
+    limite_por_ventana: peticiones permitidas por endpoint y ventana (None = sin límite)
+    latencia: segundos de espera simulada por petición
+    """
+
+    manejador = _Manejador
+
+    def __init__(self, grabaciones, host="127.0.0.1", puerto=0,
+                 limite_por_ventana=None, ventana_segundos=900, latencia=0.0):
+        self.limites = _LimitesFalsos(limite_por_ventana, ventana_segundos)
+        manejador = type('Manejador', (self.manejador,), {
+            'repositorio': _Repositorio(grabaciones),
+            'limites': self.limites,
+            'latencia': latencia
+        })
+        self.servidor = ThreadingHTTPServer((host, puerto), manejador)
+        self._hilo = None
+
+    @property
+    def url_base(self):
+        host, puerto = self.servidor.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        self._hilo.start()
+        return self.url_base
+
+    def detener(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *exc):
+        self.detener()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que emula la API v2 de Twitter")
+    parser.add_argument('grabaciones', nargs='?', help="Archivo JSON grabado con ClienteAPIv2(grabar_en=...)")
+    parser.add_argument('--sintetico', metavar='QUERY', help="Generar páginas sintéticas para esta búsqueda")
+    parser.add_argument('--paginas', type=int, default=5)
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--limite', type=int, default=None, help="Peticiones por endpoint y ventana")
+    parser.add_argument('--ventana', type=float, default=900, help="Duración de la ventana en segundos")
+    parser.add_argument('--latencia', type=float, default=0.0, help="Latencia simulada por petición (s)")
+    args = parser.parse_args()
+
+    grabaciones = []
+    if args.grabaciones:
+        with open(args.grabaciones, 'r', encoding='utf-8') as f:
+            grabaciones.extend(json.load(f))
+    if args.sintetico:
+        grabaciones.extend(generar_grabaciones_sinteticas(args.sintetico, args.paginas))
+
+    servidor = ServidorTwitterFalso(grabaciones, puerto=args.puerto, limite_por_ventana=args.limite,
+                                    ventana_segundos=args.ventana, latencia=args.latencia)
+    print(f"✓ API falsa escuchando en {servidor.url_base} (Ctrl+C para salir)")
+    try:
+        servidor.servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,17 +11,40 @@ FUNCIONALIDADES:
 3. Analiza emociones (alegría, tristeza, enojo, miedo, sorpresa, disgusto)
 4. Genera visualizaciones interactivas
 5. Guarda resultados completos en JSON
+
+MODO POR LOTES (sin menú, para tareas programadas):
+python tweets_analisis_sentimientos.py --trabajos trabajos_ejemplo.json --salida resultados
+
+MÉTRICAS POR ETAPA (informe JSON al terminar):
+python tweets_analisis_sentimientos.py --trabajos trabajos_ejemplo.json --metricas --perfil cprofile
+TWEETS_METRICAS=metricas.json TWEETS_PERFIL=tracemalloc python tweets_analisis_sentimientos.py
 """
 
-import tweepy
+import argparse
+import importlib.util
 import json
 import os
+import re
+import sys
+import time
 import warnings
 from datetime import datetime
-from collections import Counter
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
+
+# Solo módulos ligeros al importar: tweepy, requests, numpy, matplotlib y
+# pysentimiento (torch + transformers) se importan dentro de las funciones que
+# los usan, para que --help, el modo por lotes y las estadísticas offline
+# arranquen rápido (ver verificar_arranque.py)
+from motor_analisis import MotorAnalisis, TAREAS_DISPONIBLES, inferir_textos, construir_tweet_analizado
+from cache_inferencia import CacheInferencia
+from inferencia_paralela import PoolInferencia
+from directorio_usuarios import DirectorioUsuarios, consulta_tweepy
+from pipeline_async import ejecutar_pipeline_sincrono
+from escritor_resultados import EscritorResultados
+from serie_temporal import SerieSentimiento
+from instrumentacion import METRICAS, PERFILES_DISPONIBLES, RUTA_INFORME_POR_DEFECTO, etapa, medir
+from puntuador_lexico import cargar_lexico_afinn, puntuar_afinn, etiqueta_afinn, probabilidades_afinn
+from preprocesado_tokens import PreprocesadorTokens, contador_de_motor
+from enrutador_idioma import EnrutadorIdioma, MODOS_ENRUTADO
 
 # Silenciar advertencias de HuggingFace
 os.environ['HF_HUB_DISABLE_SYMLINKS_WARNING'] = '1'
@@ -33,16 +56,50 @@ warnings.filterwarnings('ignore')
 
 BEARER_TOKEN = "Your Bearer Token here"
 
+# Tareas de análisis que se ejecutan si el usuario no elige otras
+TAREAS_POR_DEFECTO = ('sentiment', 'emotion')
+
+# Backend de inferencia: 'pytorch' (fp32), 'int8' (torch dinámico) u 'onnx' (onnxruntime int8)
+BACKEND_INFERENCIA = "pytorch"
+
+# Procesos de inferencia (1 = en este proceso; >1 = pool con un motor por proceso)
+PROCESOS_INFERENCIA = 1
+
+# Cascada léxico -> modelo: los tweets con puntaje AFINN normalizado fuera de esta
+# banda (y sin negaciones) se etiquetan solo con el léxico
+MODO_CASCADA = False
+BANDA_INCERTIDUMBRE_LEXICO = (-0.5, 0.5)
+# Pasar también el modelo por los tweets que decide el léxico para medir la
+# concordancia con la ejecución solo-modelo (cuesta la inferencia que la cascada ahorra)
+COMPARAR_CASCADA = False
+
+# Preprocesado que ahorra tokens (URLs, menciones, hashtags, emojis, repeticiones)
+# antes de la inferencia, con recorte a un presupuesto de tokens por tweet
+PREPROCESADO_TOKENS = False
+PRESUPUESTO_TOKENS = 64
+
+# Enrutado por idioma (campo 'idioma' de la API o identificador por trigramas):
+# 'omitir' = se saltan los tweets identificados en otro idioma (los de idioma
+# indeterminado se tratan como español); 'enrutar' = los tweets
+# en inglés, italiano o portugués van a modelos de su idioma; None = todos al modelo en español
+ENRUTADO_IDIOMA = 'omitir'
 
-# Verificar pysentimiento
-try:
-    from pysentimiento import create_analyzer
-    print("✓ pysentimiento disponible")
-    PYSENTIMIENTO_AVAILABLE = True
-except ImportError:
-    print("✗ pysentimiento no disponible")
-    print("  Instala con: pip install pysentimiento")
-    PYSENTIMIENTO_AVAILABLE = False
+# API v2 para la recolección paginada (cambiar por servidor_twitter_falso.py para pruebas locales)
+URL_API_TWITTER = "https://api.twitter.com"
+RUTA_CHECKPOINT_RECOLECCION = "recoleccion_checkpoint.json"
+
+# Caché persistente username -> id/metadatos (None para desactivarla)
+RUTA_DIRECTORIO_USUARIOS = "usuarios_cache.json"
+
+# Formatos de salida aceptados por guardar_resultados
+EXTENSIONES_RESULTADOS = ('.jsonl', '.parquet', '.json')
+
+# Caché persistente de resultados de inferencia (None para desactivarla)
+CACHE_INFERENCIA = "cache_inferencia.sqlite"
+
+
+# pysentimiento se busca sin importarlo (importarlo carga torch y transformers)
+PYSENTIMIENTO_AVAILABLE = importlib.util.find_spec('pysentimiento') is not None
 
 
 # ============================================
@@ -67,7 +124,9 @@ def verificar_configuracion():
         return False
 
     # Verificar pysentimiento
-    if not PYSENTIMIENTO_AVAILABLE:
+    if PYSENTIMIENTO_AVAILABLE:
+        print("✓ pysentimiento disponible")
+    else:
         print("\n✗ ERROR: pysentimiento no está instalado")
         print("\nInstala con: pip install pysentimiento")
         print("\n" + "=" * 70)
@@ -78,37 +137,69 @@ def verificar_configuracion():
     return True
 
 
-def inicializar_clientes():
-    """Inicializa clientes de Twitter y pysentimiento."""
+def inicializar_clientes(tareas=TAREAS_POR_DEFECTO, backend=BACKEND_INFERENCIA, procesos=PROCESOS_INFERENCIA):
+    """Inicializa el cliente de Twitter y el motor de análisis (sin cargar aún los modelos)."""
     print("Inicializando clientes...")
 
     # Cliente de Twitter
     try:
+        import tweepy
         twitter_client = tweepy.Client(bearer_token=BEARER_TOKEN)
         print("✓ Cliente de Twitter inicializado")
     except Exception as e:
         print(f"✗ Error al inicializar Twitter: {e}")
-        return None, None, None
+        return None, None
 
-    # Analizadores de pysentimiento
+    # Motor de pysentimiento: cada modelo se carga la primera vez que se usa
     try:
-        print("Cargando modelos de pysentimiento (puede tardar un momento)...")
-        sentiment_analyzer = create_analyzer(task="sentiment", lang="es")
-        emotion_analyzer = create_analyzer(task="emotion", lang="es")
-        hate_analyzer =  create_analyzer(task="hate_speech",lang = "es")
-        print("✓ Analizadores de sentimientos y emociones cargados")
-        return twitter_client, sentiment_analyzer, emotion_analyzer
+        if procesos > 1:
+            # Cada proceso del pool carga sus modelos una vez al arrancar
+            motor = PoolInferencia(tareas, lang="es", backend=backend, procesos=procesos)
+        else:
+            motor = MotorAnalisis(tareas, lang="es", backend=backend)
+        nombres = ', '.join(TAREAS_DISPONIBLES[t] for t in motor.tareas)
+        print(f"✓ Motor de análisis preparado ({nombres}, backend {backend}); "
+              f"los modelos se cargarán al primer uso")
+        return twitter_client, motor
     except Exception as e:
-        print(f"✗ Error al cargar pysentimiento: {e}")
-        return twitter_client, None, None
+        print(f"✗ Error al preparar pysentimiento: {e}")
+        return twitter_client, None
+
+
+def crear_enrutador(motor, modo=ENRUTADO_IDIOMA, backend=BACKEND_INFERENCIA):
+    """EnrutadorIdioma sobre el motor en español, o None si el enrutado está desactivado."""
+    if not modo:
+        return None
+    return EnrutadorIdioma(motor, modo,
+                           fabrica_motor=lambda lang, tareas: MotorAnalisis(tareas, lang=lang, backend=backend))
+
+
+def elegir_tareas():
+    """Pregunta qué tareas de análisis ejecutar."""
+    codigos = list(TAREAS_DISPONIBLES)
+    print("\nTareas de análisis disponibles:")
+    for i, tarea in enumerate(codigos, 1):
+        print(f"  {i}. {TAREAS_DISPONIBLES[tarea]}")
+    defecto = ','.join(str(codigos.index(t) + 1) for t in TAREAS_POR_DEFECTO)
+    opcion = input(f"Elige tareas separadas por comas (default {defecto}): ").strip() or defecto
+
+    tareas = []
+    for parte in opcion.split(','):
+        parte = parte.strip()
+        if parte.isdigit() and 1 <= int(parte) <= len(codigos):
+            tareas.append(codigos[int(parte) - 1])
+    return tareas or list(TAREAS_POR_DEFECTO)
 
 
 # ============================================
 # DESCARGA DE TWEETS
 # ============================================
 
+@medir('descarga')
 def descargar_tweets_busqueda(twitter_client, query, max_results=50):
     """Descarga tweets por búsqueda."""
+    import tweepy
+
     print(f"\n{'='*70}")
     print(f"DESCARGANDO TWEETS: '{query}'")
     print(f"{'='*70}")
@@ -128,30 +219,7 @@ def descargar_tweets_busqueda(twitter_client, query, max_results=50):
             print("✗ No se encontraron tweets.")
             return []
 
-        # Crear diccionario de usuarios
-        usuarios = {}
-        if response.includes and 'users' in response.includes:
-            for user in response.includes['users']:
-                usuarios[user.id] = user
-
-        # Procesar tweets
-        tweets = []
-        for tweet in response.data:
-            autor = usuarios.get(tweet.author_id)
-
-            tweet_data = {
-                'id': str(tweet.id),
-                'texto': tweet.text,
-                'fecha': tweet.created_at.strftime("%Y-%m-%d %H:%M:%S") if tweet.created_at else 'N/A',
-                'autor_username': autor.username if autor else 'N/A',
-                'autor_nombre': autor.name if autor else 'N/A',
-                'verificado': autor.verified if autor else False,
-                'idioma': tweet.lang if hasattr(tweet, 'lang') else 'N/A',
-                'likes': tweet.public_metrics['like_count'] if hasattr(tweet, 'public_metrics') else 0,
-                'retweets': tweet.public_metrics['retweet_count'] if hasattr(tweet, 'public_metrics') else 0,
-                'respuestas': tweet.public_metrics['reply_count'] if hasattr(tweet, 'public_metrics') else 0,
-            }
-            tweets.append(tweet_data)
+        tweets = procesar_respuesta_busqueda(response)
 
         print(f"✓ Descargados: {len(tweets)} tweets")
         print(f"{'='*70}\n")
@@ -162,8 +230,67 @@ def descargar_tweets_busqueda(twitter_client, query, max_results=50):
         return []
 
 
-def descargar_tweets_usuario(twitter_client, username, max_results=50):
-    """Descarga tweets de un usuario específico."""
+def procesar_respuesta_busqueda(response):
+    """Convierte una respuesta de search_recent_tweets en la lista de dicts de tweets."""
+    # Crear diccionario de usuarios
+    usuarios = {}
+    if response.includes and 'users' in response.includes:
+        for user in response.includes['users']:
+            usuarios[user.id] = user
+
+    # Procesar tweets
+    tweets = []
+    for tweet in response.data or []:
+        autor = usuarios.get(tweet.author_id)
+
+        tweet_data = {
+            'id': str(tweet.id),
+            'texto': tweet.text,
+            'fecha': tweet.created_at.strftime("%Y-%m-%d %H:%M:%S") if tweet.created_at else 'N/A',
+            'autor_username': autor.username if autor else 'N/A',
+            'autor_nombre': autor.name if autor else 'N/A',
+            'verificado': autor.verified if autor else False,
+            'idioma': tweet.lang if hasattr(tweet, 'lang') else 'N/A',
+            'likes': tweet.public_metrics['like_count'] if hasattr(tweet, 'public_metrics') else 0,
+            'retweets': tweet.public_metrics['retweet_count'] if hasattr(tweet, 'public_metrics') else 0,
+            'respuestas': tweet.public_metrics['reply_count'] if hasattr(tweet, 'public_metrics') else 0,
+        }
+        tweets.append(tweet_data)
+    return tweets
+
+
+def paginas_tweets_busqueda(twitter_client, query, max_results=500):
+    """Genera páginas (listas de tweets) de una búsqueda siguiendo next_token hasta max_results."""
+    import tweepy
+
+    paginador = tweepy.Paginator(
+        twitter_client.search_recent_tweets,
+        query=query,
+        max_results=min(100, max(10, max_results)),
+        tweet_fields=['created_at', 'author_id', 'public_metrics', 'lang'],
+        expansions=['author_id'],
+        user_fields=['username', 'name', 'verified']
+    )
+
+    recogidos = 0
+    for response in paginador:
+        tweets = procesar_respuesta_busqueda(response)[:max_results - recogidos]
+        if not tweets:
+            break
+        recogidos += len(tweets)
+        yield tweets
+        if recogidos >= max_results:
+            break
+
+
+@medir('descarga')
+def descargar_tweets_usuario(twitter_client, username, max_results=50, directorio=None):
+    """Descarga tweets de un usuario específico.
+
+    Con `directorio` (DirectorioUsuarios) el id del usuario sale de la caché si ya se resolvió antes.
+    """
+    import tweepy
+
     print(f"\n{'='*70}")
     print(f"DESCARGANDO TWEETS DE @{username}")
     print(f"{'='*70}")
@@ -171,17 +298,17 @@ def descargar_tweets_usuario(twitter_client, username, max_results=50):
     print("-" * 70)
 
     try:
-        # Obtener ID del usuario
-        user = twitter_client.get_user(username=username)
-        if not user.data:
+        # Obtener ID del usuario (desde la caché si está)
+        if directorio is None:
+            directorio = DirectorioUsuarios(ruta=None)
+        usuario = directorio.resolver_uno(username, consulta_tweepy(twitter_client))
+        if not usuario:
             print(f"✗ Usuario @{username} no encontrado.")
             return []
 
-        user_id = user.data.id
-
         # Obtener tweets
         response = twitter_client.get_users_tweets(
-            id=user_id,
+            id=usuario['id'],
             max_results=min(100, max_results),
             tweet_fields=['created_at', 'public_metrics', 'lang']
         )
@@ -197,9 +324,9 @@ def descargar_tweets_usuario(twitter_client, username, max_results=50):
                 'id': str(tweet.id),
                 'texto': tweet.text,
                 'fecha': tweet.created_at.strftime("%Y-%m-%d %H:%M:%S") if tweet.created_at else 'N/A',
-                'autor_username': username,
-                'autor_nombre': user.data.name,
-                'verificado': user.data.verified if hasattr(user.data, 'verified') else False,
+                'autor_username': usuario['username'],
+                'autor_nombre': usuario['name'],
+                'verificado': usuario['verified'],
                 'idioma': tweet.lang if hasattr(tweet, 'lang') else 'N/A',
                 'likes': tweet.public_metrics['like_count'] if hasattr(tweet, 'public_metrics') else 0,
                 'retweets': tweet.public_metrics['retweet_count'] if hasattr(tweet, 'public_metrics') else 0,
@@ -216,78 +343,287 @@ def descargar_tweets_usuario(twitter_client, username, max_results=50):
         return []
 
 
+@medir('descarga')
+def recolectar_tweets_paginado(query=None, username=None, max_results=500, start_time=None, end_time=None,
+                               directorio=None, incremental=False):
+    """Descarga más de 100 tweets siguiendo la paginación; se reanuda desde el checkpoint si se corta.
+
+    Con `incremental` solo descarga los tweets posteriores a la última recolección completada.
+    """
+    import requests
+    from recolector_tweets import ClienteAPIv2, RecolectorPaginado, ErrorAPITwitter
+
+    objetivo = f"'{query}'" if query else f"@{username}"
+    print(f"\n{'='*70}")
+    print(f"RECOLECCIÓN PAGINADA: {objetivo}")
+    print(f"{'='*70}")
+    print(f"Cantidad objetivo: {max_results} | Checkpoint: {RUTA_CHECKPOINT_RECOLECCION}")
+    print("-" * 70)
+
+    cliente = ClienteAPIv2(BEARER_TOKEN, URL_API_TWITTER)
+    recolector = RecolectorPaginado(cliente, RUTA_CHECKPOINT_RECOLECCION, directorio)
+    try:
+        if query:
+            paginas = recolector.paginas_busqueda(query, max_results, start_time, end_time, incremental)
+        else:
+            usuario = recolector.obtener_usuario(username)
+            if not usuario:
+                print(f"✗ Usuario @{username} no encontrado.")
+                return []
+            paginas = recolector.paginas_usuario(usuario, max_results, start_time, end_time, incremental)
+        tweets = recolector.recolectar(paginas)
+    except (ErrorAPITwitter, requests.RequestException) as e:
+        print(f"✗ Error al descargar tweets (se puede reanudar): {e}")
+        return []
+
+    print(f"✓ Descargados: {len(tweets)} tweets")
+    print(f"{'='*70}\n")
+    return tweets
+
+
 # ============================================
 # ANÁLISIS DE SENTIMIENTOS
 # ============================================
 
-def analizar_tweets(tweets, sentiment_analyzer, emotion_analyzer,hate_analyzer):
-    """Analiza sentimientos y emociones de los tweets."""
+@medir('analisis')
+def analizar_tweets(tweets, motor, cache=None, tareas=None, preprocesador=None, enrutador=None):
+    """Analiza sentimientos, emociones y discurso de odio de los tweets.
+
+    tareas: subconjunto de las tareas del motor (por defecto, todas).
+    preprocesador: PreprocesadorTokens opcional; el modelo recibe los textos normalizados
+    y cada tweet guarda 'tokens_ahorrados' (el texto original no se modifica).
+    enrutador: EnrutadorIdioma opcional; solo los tweets en español llegan a `motor`, el
+    resto va a un motor de su idioma o se omite, y cada tweet guarda la decisión.
+    """
     print(f"\n{'='*70}")
     print("ANALIZANDO SENTIMIENTOS Y EMOCIONES")
     print(f"{'='*70}")
     print(f"Analizando {len(tweets)} tweets...")
     print("-" * 70)
 
-    tweets_analizados = []
+    textos = [t['texto'] for t in tweets]
+    ahorrados = None
+    if preprocesador is not None:
+        with etapa('preprocesado_tokens', len(textos)):
+            textos, ahorrados = preprocesador.procesar(textos)
+
+    if enrutador is not None:
+        tweets_analizados = enrutador.analizar(tweets, textos, cache, tareas)
+    else:
+        resultados = inferir_textos(textos, motor, cache, tareas)
+        tweets_analizados = [construir_tweet_analizado(t, r) for t, r in zip(tweets, resultados)]
+    if ahorrados is not None:
+        for tweet, n in zip(tweets_analizados, ahorrados):
+            tweet['tokens_ahorrados'] = n
 
-    for i, tweet in enumerate(tweets, 1):
-        if i % 10 == 0:
-            print(f"  Procesando tweet {i}/{len(tweets)}...", end='\r')
+    print(f"\n✓ Análisis completado: {len(tweets_analizados)} tweets procesados")
+    if preprocesador is not None:
+        print(f"✓ {preprocesador.resumen()}")
+    if enrutador is not None:
+        print(f"✓ {enrutador.resumen()}")
+    if cache is not None:
+        print(f"✓ {cache.resumen()}")
+    if hasattr(motor, 'eficiencia_padding'):
+        print(f"✓ Eficiencia de padding: {motor.eficiencia_padding:.1%} de tokens reales")
+    print(f"{'='*70}\n")
 
-        # Análisis de sentimiento
-        sent_result = sentiment_analyzer.predict(tweet['texto'])
+    return tweets_analizados
 
-        # Análisis de emoción
-        emo_result = emotion_analyzer.predict(tweet['texto'])
 
-        #analisis de odio
-        hate_result = hate_analyzer.predict(tweet['texto'])
+@medir('analisis')
+def analizar_tweets_cascada(tweets, motor, lexico, banda=None, cache=None, comparar=False, tareas=None,
+                            preprocesador=None, enrutador=None):
+    """Cascada: el léxico AFINN etiqueta los tweets claros y el modelo de sentimiento el resto.
 
-        # Añadir análisis al tweet
-        tweet_analizado = tweet.copy()
-        tweet_analizado['sentimiento'] = sent_result.output
-        tweet_analizado['sentimiento_confianza'] = float(sent_result.probas[sent_result.output])
-        tweet_analizado['sentimiento_scores'] = {k: float(v) for k, v in sent_result.probas.items()}
+    Solo los tweets cuyo puntaje normalizado cae dentro de `banda` (o que contienen
+    negaciones) llegan al modelo de sentimiento; las demás `tareas` (por defecto
+    todas las del motor) se ejecutan sobre todos. Con comparar=True también se pasa
+    el modelo por los tweets decididos por el léxico para medir la concordancia.
 
-        tweet_analizado['emocion'] = emo_result.output
-        tweet_analizado['emocion_confianza'] = float(emo_result.probas[emo_result.output])
-        tweet_analizado['emocion_scores'] = {k: float(v) for k, v in emo_result.probas.items()}
+    Devuelve (tweets analizados, informe de informe_cascada), o (tweets, None) si
+    no hay tarea de sentimiento y se usa el análisis normal.
 
+    El léxico puntúa siempre el texto original; `preprocesador` solo recorta lo que
+    recibe el modelo. El léxico es español: con `enrutador` la cascada se aplica a
+    los tweets del idioma principal y el resto sigue su ruta (omitido o modelo de
+    su idioma, sin léxico).
+    """
+    tareas = list(tareas or motor.tareas)
+    if 'sentiment' not in tareas:
+        print("✗ La cascada necesita la tarea de sentimiento; se usa el análisis normal")
+        return analizar_tweets(tweets, motor, cache, tareas, preprocesador, enrutador), None
 
+    banda = banda or BANDA_INCERTIDUMBRE_LEXICO
+    print(f"\n{'='*70}")
+    print("ANALIZANDO EN CASCADA (LÉXICO AFINN -> MODELO)")
+    print(f"{'='*70}")
+    print(f"Analizando {len(tweets)} tweets (banda de incertidumbre {banda[0]:+.2f} .. {banda[1]:+.2f})...")
+    print("-" * 70)
+
+    textos = [t['texto'] for t in tweets]
+    ahorrados = None
+    if preprocesador is not None:
+        with etapa('preprocesado_tokens', len(textos)):
+            textos, ahorrados = preprocesador.procesar(textos)
+
+    indices = list(range(len(tweets)))
+    resultado = [None] * len(tweets)
+    if enrutador is not None:
+        decisiones = enrutador.decidir_varios(tweets)
+        indices = [i for i, d in enumerate(decisiones) if d['ruta_idioma'] == enrutador.idioma_principal]
+        otros = [i for i, d in enumerate(decisiones) if d['ruta_idioma'] != enrutador.idioma_principal]
+        if otros:
+            analizados = enrutador.analizar([tweets[i] for i in otros], [textos[i] for i in otros], cache,
+                                            tareas, decisiones=[decisiones[i] for i in otros])
+            for i, tweet_analizado in zip(otros, analizados):
+                resultado[i] = tweet_analizado
+
+    tweets_cascada, decididos = clasificar_en_cascada([tweets[i] for i in indices], motor, lexico, banda, cache,
+                                                      tareas, [textos[i] for i in indices])
+    for i, tweet_analizado in zip(indices, tweets_cascada):
+        if enrutador is not None:
+            tweet_analizado.update(decisiones[i])
+        resultado[i] = tweet_analizado
+    if ahorrados is not None:
+        for tweet, n in zip(resultado, ahorrados):
+            tweet['tokens_ahorrados'] = n
+
+    referencia = None
+    if comparar and decididos:
+        salidas = inferir_textos([textos[indices[i]] for i in decididos], motor, cache, ['sentiment'])
+        referencia = {i: s['sentiment']['output'] for i, s in zip(decididos, salidas)}
+
+    print(f"\n✓ Análisis completado: {len(resultado)} tweets procesados")
+    if preprocesador is not None:
+        print(f"✓ {preprocesador.resumen()}")
+    if enrutador is not None:
+        print(f"✓ {enrutador.resumen()}")
+    if cache is not None:
+        print(f"✓ {cache.resumen()}")
+    informe = informe_cascada(tweets_cascada, referencia)
+    print(f"{'='*70}\n")
+
+    return resultado, informe
+
+
+def clasificar_en_cascada(tweets, motor, lexico, banda=None, cache=None, tareas=None, textos=None):
+    """Núcleo de la cascada, sin salida por pantalla.
+
+    tareas: las que se ejecutan (por defecto todas las del motor; debe incluir 'sentiment').
+    textos: lo que recibe el modelo (p. ej. ya preprocesado); el léxico puntúa tweet['texto'].
+    Devuelve (tweets analizados, índices de los tweets cuyo sentimiento decidió el léxico).
+    """
+    banda = banda or BANDA_INCERTIDUMBRE_LEXICO
+    tareas = list(tareas or motor.tareas)
+    textos = textos if textos is not None else [t['texto'] for t in tweets]
+    puntuaciones = [puntuar_afinn(t['texto'], lexico) for t in tweets]
+    etiquetas = [etiqueta_afinn(p, banda) for p in puntuaciones]
+
+    inciertos = [i for i, e in enumerate(etiquetas) if e is None]
+    decididos = [i for i, e in enumerate(etiquetas) if e is not None]
+    otras_tareas = [t for t in tareas if t != 'sentiment']
 
+    resultados = [dict() for _ in tweets]
+    salidas = inferir_textos([textos[i] for i in inciertos], motor, cache, tareas, progreso=False)
+    for i, salida in zip(inciertos, salidas):
+        resultados[i] = salida
+    if otras_tareas and decididos:
+        salidas = inferir_textos([textos[i] for i in decididos], motor, cache, otras_tareas, progreso=False)
+        for i, salida in zip(decididos, salidas):
+            resultados[i] = salida
+
+    tweets_analizados = []
+    for tweet, resultado, puntuacion, etiqueta in zip(tweets, resultados, puntuaciones, etiquetas):
+        tweet_analizado = construir_tweet_analizado(tweet, resultado)
+        aplicar_lexico(tweet_analizado, puntuacion, etiqueta)
         tweets_analizados.append(tweet_analizado)
+    return tweets_analizados, decididos
+
+
+def aplicar_lexico(tweet_analizado, puntuacion, etiqueta):
+    """Añade el puntaje AFINN y, si el léxico decidió (`etiqueta` no None), los campos de sentimiento.
+
+    El puntaje queda siempre en 'lexico_puntaje' / 'lexico_normalizado'. Cuando decide
+    el léxico, 'sentimiento_scores' es una distribución POS/NEG/NEU como la del
+    modelo y la confianza es la probabilidad de la etiqueta.
+    """
+    tweet_analizado['lexico_puntaje'] = puntuacion['puntaje']
+    tweet_analizado['lexico_normalizado'] = puntuacion['puntaje_normalizado']
+    if etiqueta is None:
+        tweet_analizado['sentimiento_etapa'] = 'modelo'
+        return tweet_analizado
+    scores = probabilidades_afinn(puntuacion)
+    tweet_analizado['sentimiento'] = etiqueta
+    tweet_analizado['sentimiento_confianza'] = scores[etiqueta]
+    tweet_analizado['sentimiento_scores'] = scores
+    tweet_analizado['sentimiento_etapa'] = 'lexico'
+    return tweet_analizado
+
+
+def informe_cascada(tweets_analizados, referencia=None):
+    """Imprime la fracción enviada al modelo y, si hay referencia, la concordancia con el modelo."""
+    total = len(tweets_analizados)
+    al_modelo = sum(1 for t in tweets_analizados if t.get('sentimiento_etapa') == 'modelo')
+    informe = {
+        'total': total,
+        'al_modelo': al_modelo,
+        'fraccion_al_modelo': al_modelo / total if total else 0.0
+    }
+    print(f"✓ Enviados al modelo: {al_modelo}/{total} ({informe['fraccion_al_modelo']:.1%}); "
+          f"resueltos por el léxico: {total - al_modelo}")
 
-    print(f"\n✓ Análisis completado: {len(tweets_analizados)} tweets procesados")
-    print(f"{'='*70}\n")
+    if referencia is not None:
+        # Los tweets enviados al modelo coinciden por definición con la ejecución solo-modelo
+        iguales = al_modelo + sum(
+            1 for i, etiqueta in referencia.items() if tweets_analizados[i]['sentimiento'] == etiqueta
+        )
+        informe['concordancia_lexico'] = (
+            (iguales - al_modelo) / len(referencia) if referencia else 1.0
+        )
+        informe['concordancia_total'] = iguales / total if total else 1.0
+        print(f"✓ Concordancia con la ejecución solo-modelo: {informe['concordancia_total']:.1%} "
+              f"(en los tweets del léxico: {informe['concordancia_lexico']:.1%})")
 
-    return tweets_analizados
+    return informe
 
 
 # ============================================
 # ESTADÍSTICAS
 # ============================================
 
+@medir('estadisticas', elementos=lambda args, resultado: len(args[0]))
 def generar_estadisticas(tweets_analizados):
-    """Genera estadísticas de los tweets analizados."""
+    """Genera estadísticas de los tweets analizados.
+
+    Los tweets se cargan una vez en una TablaTweets y todas las agregaciones
+    son vectorizadas; además de las distribuciones devuelve agrupaciones por
+    autor, idioma y hora. También acepta una TablaTweets ya construida, p. ej.
+    TablaTweets(lotes=leer_por_lotes(ruta)) para no cargar los dicts en memoria.
+    """
     print(f"\n{'='*70}")
     print("ESTADÍSTICAS DEL ANÁLISIS")
     print(f"{'='*70}\n")
 
-    # Contar sentimientos
-    sentimientos = [t['sentimiento'] for t in tweets_analizados]
-    contador_sentimientos = Counter(sentimientos)
+    from estadisticas_columnares import TablaTweets
+
+    tabla = tweets_analizados if isinstance(tweets_analizados, TablaTweets) else TablaTweets(tweets_analizados)
+    total = len(tabla)
+    sent_nombre = {'POS': 'POSITIVO', 'NEG': 'NEGATIVO', 'NEU': 'NEUTRAL'}
 
-    print("--- DISTRIBUCIÓN DE SENTIMIENTOS ---")
+    # Contar sentimientos (solo si se ejecutó la tarea)
+    contador_sentimientos = tabla.distribucion('sentimiento')
+
+    if contador_sentimientos:
+        print("--- DISTRIBUCIÓN DE SENTIMIENTOS ---")
     for sent, count in contador_sentimientos.most_common():
-        porcentaje = (count / len(tweets_analizados)) * 100
-        sent_nombre = {'POS': 'POSITIVO', 'NEG': 'NEGATIVO', 'NEU': 'NEUTRAL'}
+        porcentaje = (count / total) * 100
         print(f"  {sent_nombre.get(sent, sent):<12}: {count:3} ({porcentaje:5.1f}%)")
 
-    # Contar emociones
-    emociones = [t['emocion'] for t in tweets_analizados]
-    contador_emociones = Counter(emociones)
+    # Contar emociones (solo si se ejecutó la tarea)
+    contador_emociones = tabla.distribucion('emocion')
 
-    print("\n--- DISTRIBUCIÓN DE EMOCIONES ---")
+    if contador_emociones:
+        print("\n--- DISTRIBUCIÓN DE EMOCIONES ---")
     emociones_es = {
         'joy': 'Alegría',
         'sadness': 'Tristeza',
@@ -297,35 +633,41 @@ def generar_estadisticas(tweets_analizados):
         'fear': 'Miedo'
     }
     for emo, count in contador_emociones.most_common():
-        porcentaje = (count / len(tweets_analizados)) * 100
+        porcentaje = (count / total) * 100
         print(f"  {emociones_es.get(emo, emo):<12}: {count:3} ({porcentaje:5.1f}%)")
 
     # Tweet más popular
-    if tweets_analizados:
-        tweet_top = max(tweets_analizados, key=lambda x: x['likes'] + x['retweets'])
+    if total:
+        i = int(tabla.top_engagement(1)[0])
         print("\n--- TWEET MÁS POPULAR ---")
-        print(f"  Usuario: @{tweet_top['autor_username']}")
-        print(f"  Texto: {tweet_top['texto'][:100]}...")
-        print(f"  ❤️ {tweet_top['likes']} | 🔄 {tweet_top['retweets']}")
-        print(f"  Sentimiento: {tweet_top['sentimiento']} ({tweet_top['sentimiento_confianza']:.1%})")
-        print(f"  Emoción: {tweet_top['emocion']} ({tweet_top['emocion_confianza']:.1%})")
+        print(f"  Usuario: @{tabla.valor('autor_username', i)}")
+        print(f"  Texto: {tabla.textos[i][:100]}...")
+        print(f"  ❤️ {tabla.likes[i]} | 🔄 {tabla.retweets[i]}")
+        if tabla.valor('sentimiento', i) is not None:
+            print(f"  Sentimiento: {tabla.valor('sentimiento', i)} ({tabla.confianza['sentimiento'][i]:.1%})")
+        if tabla.valor('emocion', i) is not None:
+            print(f"  Emoción: {tabla.valor('emocion', i)} ({tabla.confianza['emocion'][i]:.1%})")
 
     # Ejemplos por sentimiento
-    print("\n--- EJEMPLOS DE TWEETS ---")
+    if contador_sentimientos:
+        print("\n--- EJEMPLOS DE TWEETS ---")
+    primeros = tabla.primeros_por_categoria('sentimiento')
     for sent_tipo in ['POS', 'NEG', 'NEU']:
-        ejemplos = [t for t in tweets_analizados if t['sentimiento'] == sent_tipo]
-        if ejemplos:
-            ejemplo = ejemplos[0]
-            sent_nombre = {'POS': 'POSITIVO', 'NEG': 'NEGATIVO', 'NEU': 'NEUTRAL'}
+        if sent_tipo in primeros:
+            i = primeros[sent_tipo]
             print(f"\n{sent_nombre[sent_tipo]}:")
-            print(f"  '{ejemplo['texto'][:80]}...'")
-            print(f"  @{ejemplo['autor_username']} | Confianza: {ejemplo['sentimiento_confianza']:.1%}")
+            print(f"  '{tabla.textos[i][:80]}...'")
+            print(f"  @{tabla.valor('autor_username', i)} | Confianza: {tabla.confianza['sentimiento'][i]:.1%}")
 
     print(f"\n{'='*70}\n")
 
     return {
         'sentimientos': contador_sentimientos,
-        'emociones': contador_emociones
+        'emociones': contador_emociones,
+        'por_autor': tabla.agrupar('autor', limite=100),
+        'por_idioma': tabla.agrupar('idioma'),
+        'por_hora': tabla.agrupar('hora'),
+        'tabla': tabla
     }
 
 
@@ -333,100 +675,36 @@ def generar_estadisticas(tweets_analizados):
 # VISUALIZACIONES
 # ============================================
 
-def visualizar_analisis(tweets_analizados, estadisticas, titulo="Análisis de Tweets"):
-    """Genera visualizaciones del análisis."""
+@medir('graficos', elementos=lambda args, resultado: len(args[0]))
+def visualizar_analisis(tweets_analizados, estadisticas, titulo="Análisis de Tweets", serie=None, ruta_salida=None):
+    """Genera visualizaciones del análisis.
+
+    serie: SerieSentimiento ya agregada (p. ej. por el pipeline); si no se pasa se construye aquí.
+    ruta_salida: si se indica, la figura se guarda en ese archivo desde un proceso aparte (Agg, sin
+    ventana) y se devuelve el Future; si no, se muestra en pantalla. Por encima de UMBRAL_PUNTOS
+    tweets la evolución y el engagement se dibujan agregados.
+    """
     print(f"\n{'='*70}")
     print("GENERANDO VISUALIZACIONES")
     print(f"{'='*70}")
     print("Creando gráficos...")
 
-    fig = plt.figure(figsize=(18, 10))
-    gs = fig.add_gridspec(2, 3, hspace=0.3, wspace=0.3)
-
-    # 1. Distribución de Sentimientos (Pie)
-    ax1 = fig.add_subplot(gs[0, 0])
-    sentimientos = estadisticas['sentimientos']
-    labels = ['Positivo', 'Negativo', 'Neutral']
-    sizes = [sentimientos.get('POS', 0), sentimientos.get('NEG', 0), sentimientos.get('NEU', 0)]
-    colors = ['#66bb6a', '#ef5350', '#ffa726']
-
-    ax1.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%',
-            startangle=90, textprops={'fontsize': 10, 'weight': 'bold'})
-    ax1.set_title('Distribución de Sentimientos', fontsize=14, fontweight='bold')
-
-    # 2. Distribución de Emociones (Barras)
-    ax2 = fig.add_subplot(gs[0, 1:])
-    emociones = estadisticas['emociones']
-    emociones_es = {
-        'joy': 'Alegría', 'sadness': 'Tristeza', 'anger': 'Enojo',
-        'surprise': 'Sorpresa', 'disgust': 'Disgusto', 'fear': 'Miedo'
-    }
-    colores_emo = {
-        'joy': '#ffeb3b', 'sadness': '#2196f3', 'anger': '#f44336',
-        'surprise': '#9c27b0', 'disgust': '#4caf50', 'fear': '#ff9800'
-    }
+    from renderizado import UMBRAL_PUNTOS, preparar_datos_graficos, dibujar_analisis, renderizar_en_segundo_plano
 
-    emo_ordenadas = sorted(emociones.items(), key=lambda x: x[1], reverse=True)
-    nombres = [emociones_es.get(e[0], e[0]) for e in emo_ordenadas]
-    valores = [e[1] for e in emo_ordenadas]
-    colores = [colores_emo.get(e[0], '#999') for e in emo_ordenadas]
-
-    ax2.barh(nombres, valores, color=colores, edgecolor='black', linewidth=1.5)
-    ax2.set_xlabel('Cantidad de Tweets', fontsize=12, fontweight='bold')
-    ax2.set_title('Distribución de Emociones', fontsize=14, fontweight='bold')
-    ax2.grid(axis='x', alpha=0.3)
-
-    # 3. Timeline de Sentimientos
-    ax3 = fig.add_subplot(gs[1, 0])
-    sentimientos_time = [1 if t['sentimiento'] == 'POS' else (-1 if t['sentimiento'] == 'NEG' else 0)
-                         for t in tweets_analizados]
-    ax3.plot(sentimientos_time, marker='o', linestyle='-', markersize=4, linewidth=1.5,
-             color='#2196f3', markerfacecolor='#ff5722')
-    ax3.axhline(y=0, color='gray', linestyle='--', linewidth=1)
-    ax3.set_ylabel('Sentimiento', fontsize=12, fontweight='bold')
-    ax3.set_xlabel('Tweet #', fontsize=12, fontweight='bold')
-    ax3.set_title('Evolución de Sentimientos', fontsize=14, fontweight='bold')
-    ax3.set_yticks([-1, 0, 1])
-    ax3.set_yticklabels(['Negativo', 'Neutral', 'Positivo'])
-    ax3.grid(True, alpha=0.3)
-
-    # 4. Top Usuarios
-    ax4 = fig.add_subplot(gs[1, 1])
-    usuarios = Counter([t['autor_username'] for t in tweets_analizados])
-    top_usuarios = usuarios.most_common(10)
-    if top_usuarios:
-        nombres_usuarios = [u[0][:15] for u in top_usuarios]
-        counts = [u[1] for u in top_usuarios]
-        ax4.barh(nombres_usuarios, counts, color='#9c27b0', edgecolor='black', linewidth=1.5)
-        ax4.set_xlabel('Tweets', fontsize=12, fontweight='bold')
-        ax4.set_title('Top 10 Usuarios Activos', fontsize=14, fontweight='bold')
-        ax4.grid(axis='x', alpha=0.3)
-
-    # 5. Engagement vs Sentimiento
-    ax5 = fig.add_subplot(gs[1, 2])
-    engagement = [t['likes'] + t['retweets'] for t in tweets_analizados]
-    sent_colors = ['#66bb6a' if t['sentimiento'] == 'POS' else
-                   ('#ef5350' if t['sentimiento'] == 'NEG' else '#ffa726')
-                   for t in tweets_analizados]
-
-    ax5.scatter(range(len(engagement)), engagement, c=sent_colors, alpha=0.6, s=50)
-    ax5.set_ylabel('Engagement (Likes + RTs)', fontsize=12, fontweight='bold')
-    ax5.set_xlabel('Tweet #', fontsize=12, fontweight='bold')
-    ax5.set_title('Engagement por Tweet', fontsize=14, fontweight='bold')
-    ax5.grid(True, alpha=0.3)
-
-    # Crear leyenda manual para scatter
-    from matplotlib.patches import Patch
-    legend_elements = [
-        Patch(facecolor='#66bb6a', label='Positivo'),
-        Patch(facecolor='#ef5350', label='Negativo'),
-        Patch(facecolor='#ffa726', label='Neutral')
-    ]
-    ax5.legend(handles=legend_elements, loc='upper right')
-
-    # Título general
-    fig.suptitle(f'{titulo} - Análisis con PySentimiento',
-                 fontsize=18, fontweight='bold', y=0.98)
+    datos = preparar_datos_graficos(tweets_analizados, estadisticas, serie)
+    if datos['agregado']:
+        print(f"✓ {datos['n']} tweets: vistas agregadas (más de {UMBRAL_PUNTOS} puntos)")
+
+    if ruta_salida:
+        futuro = renderizar_en_segundo_plano(datos, ruta_salida, titulo)
+        print(f"✓ Visualizaciones en cola: {ruta_salida}")
+        print(f"{'='*70}\n")
+        return futuro
+
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(18, 10))
+    dibujar_analisis(fig, datos, titulo)
 
     print("✓ Visualizaciones generadas")
     print(f"{'='*70}\n")
@@ -439,25 +717,40 @@ def visualizar_analisis(tweets_analizados, estadisticas, titulo="Análisis de Tw
 # GUARDAR RESULTADOS
 # ============================================
 
-def guardar_resultados(tweets_analizados, estadisticas, nombre_archivo="tweets_analizados.json"):
-    """Guarda tweets analizados y estadísticas en JSON."""
-    print(f"Guardando resultados en {nombre_archivo}...")
+@medir('guardado', elementos=lambda args, resultado: len(args[0]))
+def guardar_resultados(tweets_analizados, estadisticas, nombre_archivo="tweets_analizados.jsonl", tam_lote=1000,
+                       extra=None):
+    """Guarda los tweets analizados de forma incremental y las estadísticas en <archivo>.meta.json.
 
-    datos_completos = {
-        'metadata': {
-            'total_tweets': len(tweets_analizados),
-            'fecha_analisis': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'estadisticas': {
-                'sentimientos': {k: v for k, v in estadisticas['sentimientos'].items()},
-                'emociones': {k: v for k, v in estadisticas['emociones'].items()}
-            }
-        },
-        'tweets': tweets_analizados
-    }
+    - .jsonl: una línea JSON compacta por tweet
+    - .parquet: columnas tipadas (requiere pyarrow)
+    - .json: documento único {'metadata', 'tweets'} del formato anterior
+    extra: claves adicionales para los metadatos (p. ej. {'cascada': informe})
+    """
+    print(f"Guardando resultados en {nombre_archivo}...")
 
     try:
-        with open(nombre_archivo, 'w', encoding='utf-8') as f:
-            json.dump(datos_completos, f, ensure_ascii=False, indent=2)
+        if nombre_archivo.endswith('.json'):
+            datos_completos = {
+                'metadata': {
+                    'total_tweets': len(tweets_analizados),
+                    'fecha_analisis': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    'estadisticas': {
+                        'sentimientos': {k: v for k, v in estadisticas['sentimientos'].items()},
+                        'emociones': {k: v for k, v in estadisticas['emociones'].items()}
+                    },
+                    **(extra or {})
+                },
+                'tweets': tweets_analizados
+            }
+            with open(nombre_archivo, 'w', encoding='utf-8') as f:
+                json.dump(datos_completos, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            with EscritorResultados(nombre_archivo) as escritor:
+                for i in range(0, len(tweets_analizados), tam_lote):
+                    escritor.escribir(tweets_analizados[i:i + tam_lote])
+                escritor.cerrar(estadisticas, extra)
+            print(f"✓ Metadatos en {escritor.ruta_meta}")
         print(f"✓ Resultados guardados exitosamente\n")
     except Exception as e:
         print(f"✗ Error al guardar: {e}\n")
@@ -476,11 +769,21 @@ def main():
     if not verificar_configuracion():
         return
 
-    # Inicializar clientes
-    twitter_client, sentiment_analyzer, emotion_analyzer = inicializar_clientes()
-    if not twitter_client or not sentiment_analyzer or not emotion_analyzer:
+    import tweepy
+
+    # Inicializar clientes con las tareas elegidas
+    twitter_client, motor = inicializar_clientes(elegir_tareas())
+    if not twitter_client or not motor:
         return
 
+    cache = CacheInferencia(CACHE_INFERENCIA) if CACHE_INFERENCIA else None
+    directorio = DirectorioUsuarios(RUTA_DIRECTORIO_USUARIOS)
+    lexico = cargar_lexico_afinn() if MODO_CASCADA else None
+    preprocesador = None
+    if PREPROCESADO_TOKENS:
+        preprocesador = PreprocesadorTokens(PRESUPUESTO_TOKENS, contador=contador_de_motor(motor))
+    enrutador = crear_enrutador(motor)
+
     # Menú principal
     while True:
         print("\n" + "=" * 70)
@@ -488,10 +791,11 @@ def main():
         print("=" * 70)
         print("1. Analizar tweets por palabra clave")
         print("2. Analizar tweets de un usuario")
-        print("3. Salir")
+        print("3. Analizar palabra clave en streaming (descarga, análisis y guardado solapados)")
+        print("4. Salir")
         print("-" * 70)
 
-        opcion = input("Elige una opción (1-3): ").strip()
+        opcion = input("Elige una opción (1-4): ").strip()
 
         tweets_analizados = None
 
@@ -501,16 +805,26 @@ def main():
                 print("Debe ingresar una palabra clave.")
                 continue
 
-            cantidad = input("Cantidad de tweets (10-100, default 50): ").strip()
+            cantidad = input("Cantidad de tweets (10+, default 50; más de 100 usa paginación): ").strip()
             max_results = int(cantidad) if cantidad.isdigit() else 50
-            max_results = min(100, max(10, max_results))
+            max_results = max(10, max_results)
 
             # Descargar tweets
-            tweets = descargar_tweets_busqueda(twitter_client, query, max_results)
+            if max_results > 100:
+                tweets = recolectar_tweets_paginado(query=query, max_results=max_results)
+            else:
+                tweets = descargar_tweets_busqueda(twitter_client, query, max_results)
 
             if tweets:
                 # Analizar
-                tweets_analizados = analizar_tweets(tweets, sentiment_analyzer, emotion_analyzer)
+                informe = None
+                if lexico is not None:
+                    tweets_analizados, informe = analizar_tweets_cascada(
+                        tweets, motor, lexico, cache=cache, comparar=COMPARAR_CASCADA,
+                        preprocesador=preprocesador, enrutador=enrutador)
+                else:
+                    tweets_analizados = analizar_tweets(tweets, motor, cache, preprocesador=preprocesador,
+                                                        enrutador=enrutador)
 
                 # Estadísticas
                 estadisticas = generar_estadisticas(tweets_analizados)
@@ -523,10 +837,12 @@ def main():
                 # Guardar
                 guardar = input("¿Guardar resultados? (s/n): ").strip().lower()
                 if guardar == 's':
-                    nombre = input("Nombre archivo (tweets_analizados.json): ").strip() or "tweets_analizados.json"
-                    if not nombre.endswith('.json'):
-                        nombre += '.json'
-                    guardar_resultados(tweets_analizados, estadisticas, nombre)
+                    nombre = input("Nombre archivo (.jsonl, .parquet o .json; default tweets_analizados.jsonl): ").strip()
+                    nombre = nombre or "tweets_analizados.jsonl"
+                    if not nombre.endswith(EXTENSIONES_RESULTADOS):
+                        nombre += '.jsonl'
+                    guardar_resultados(tweets_analizados, estadisticas, nombre,
+                                       extra={'cascada': informe} if informe else None)
 
         elif opcion == "2":
             username = input("\nUsuario (sin @): ").strip()
@@ -534,16 +850,27 @@ def main():
                 print("Debe ingresar un usuario.")
                 continue
 
-            cantidad = input("Cantidad de tweets (10-100, default 50): ").strip()
+            cantidad = input("Cantidad de tweets (10+, default 50; más de 100 usa paginación): ").strip()
             max_results = int(cantidad) if cantidad.isdigit() else 50
-            max_results = min(100, max(10, max_results))
+            max_results = max(10, max_results)
 
             # Descargar tweets
-            tweets = descargar_tweets_usuario(twitter_client, username, max_results)
+            if max_results > 100:
+                tweets = recolectar_tweets_paginado(username=username, max_results=max_results,
+                                                    directorio=directorio)
+            else:
+                tweets = descargar_tweets_usuario(twitter_client, username, max_results, directorio)
 
             if tweets:
                 # Analizar
-                tweets_analizados = analizar_tweets(tweets, sentiment_analyzer, emotion_analyzer)
+                informe = None
+                if lexico is not None:
+                    tweets_analizados, informe = analizar_tweets_cascada(
+                        tweets, motor, lexico, cache=cache, comparar=COMPARAR_CASCADA,
+                        preprocesador=preprocesador, enrutador=enrutador)
+                else:
+                    tweets_analizados = analizar_tweets(tweets, motor, cache, preprocesador=preprocesador,
+                                                        enrutador=enrutador)
 
                 # Estadísticas
                 estadisticas = generar_estadisticas(tweets_analizados)
@@ -556,12 +883,45 @@ def main():
                 # Guardar
                 guardar = input("¿Guardar resultados? (s/n): ").strip().lower()
                 if guardar == 's':
-                    nombre = input("Nombre archivo (tweets_analizados.json): ").strip() or "tweets_analizados.json"
-                    if not nombre.endswith('.json'):
-                        nombre += '.json'
-                    guardar_resultados(tweets_analizados, estadisticas, nombre)
+                    nombre = input("Nombre archivo (.jsonl, .parquet o .json; default tweets_analizados.jsonl): ").strip()
+                    nombre = nombre or "tweets_analizados.jsonl"
+                    if not nombre.endswith(EXTENSIONES_RESULTADOS):
+                        nombre += '.jsonl'
+                    guardar_resultados(tweets_analizados, estadisticas, nombre,
+                                       extra={'cascada': informe} if informe else None)
 
         elif opcion == "3":
+            query = input("\nPalabra clave o hashtag: ").strip()
+            if not query:
+                print("Debe ingresar una palabra clave.")
+                continue
+
+            # Sin límite de 100: el paginador sigue next_token
+            cantidad = input("Cantidad de tweets (default 500): ").strip()
+            max_results = max(10, int(cantidad)) if cantidad.isdigit() else 500
+
+            nombre = input("Archivo de salida (.jsonl o .parquet; default tweets_analizados.jsonl): ").strip()
+            nombre = nombre or "tweets_analizados.jsonl"
+            try:
+                paginas = paginas_tweets_busqueda(twitter_client, query, max_results)
+                # La búsqueda llega de más reciente a más antiguo: tolerar los 7 días que cubre
+                serie = SerieSentimiento('minuto', capacidad=7 * 24 * 60, retraso_max=7 * 86400)
+                tweets_analizados = ejecutar_pipeline_sincrono(paginas, motor, nombre, cache, serie=serie,
+                                                               enrutador=enrutador, preprocesador=preprocesador)
+            except tweepy.TweepyException as e:
+                print(f"✗ Error al descargar tweets: {e}")
+                continue
+
+            if tweets_analizados:
+                estadisticas = generar_estadisticas(tweets_analizados)
+                mostrar = input("\n¿Mostrar gráficos? (s/n): ").strip().lower()
+                if mostrar == 's':
+                    visualizar_analisis(tweets_analizados, estadisticas, f"Análisis: {query}", serie)
+
+        elif opcion == "4":
+            motor.cerrar()
+            if enrutador is not None:
+                enrutador.cerrar()
             print("\n¡Hasta luego!")
             break
 
@@ -577,18 +937,221 @@ def ejemplo_rapido():
     """Ejemplo de uso rápido sin menú."""
 
     # Inicializar
-    twitter_client, sentiment_analyzer, emotion_analyzer = inicializar_clientes()
+    twitter_client, motor = inicializar_clientes()
+    cache = CacheInferencia(CACHE_INFERENCIA) if CACHE_INFERENCIA else None
 
     # Analizar tweets sobre Bitcoin
     tweets = descargar_tweets_busqueda(twitter_client, "bitcoin", max_results=50)
-    tweets_analizados = analizar_tweets(tweets, sentiment_analyzer, emotion_analyzer)
+    tweets_analizados = analizar_tweets(tweets, motor, cache)
     estadisticas = generar_estadisticas(tweets_analizados)
     visualizar_analisis(tweets_analizados, estadisticas, "Bitcoin")
-    guardar_resultados(tweets_analizados, estadisticas, "bitcoin_analisis.json")
+    guardar_resultados(tweets_analizados, estadisticas, "bitcoin_analisis.jsonl")
 
 
-if __name__ == "__main__":
-    main()
+# ============================================
+# MODO POR LOTES (SIN MENÚ)
+# ============================================
+
+def cargar_trabajos(ruta):
+    """Lee y valida un archivo de trabajos JSON.
+
+    Formato: {"defecto": {...}, "trabajos": [{...}, ...]} o directamente la lista.
+    Cada trabajo lleva "query" o "usuario" y opcionalmente "cantidad", "tareas",
+    "nombre", "formato" ('jsonl', 'parquet' o 'json'), "cascada", "graficos"
+    (guarda <nombre>.png en segundo plano), "preprocesado", "presupuesto_tokens" e
+    "idiomas" ('omitir', 'enrutar' o null, ver ENRUTADO_IDIOMA).
+    """
+    with open(ruta, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    if isinstance(datos, list):
+        datos = {'trabajos': datos}
+
+    defecto = {'cantidad': 100, 'tareas': list(TAREAS_POR_DEFECTO), 'formato': 'jsonl', 'cascada': False,
+               'graficos': False, 'preprocesado': PREPROCESADO_TOKENS, 'presupuesto_tokens': PRESUPUESTO_TOKENS,
+               'idiomas': ENRUTADO_IDIOMA, 'incremental': False, 'comparar': COMPARAR_CASCADA}
+    defecto.update(datos.get('defecto', {}))
+
+    trabajos = []
+    nombres = set()
+    for i, entrada in enumerate(datos.get('trabajos', []), 1):
+        trabajo = dict(defecto, **entrada)
+        if bool(trabajo.get('query')) == bool(trabajo.get('usuario')):
+            raise ValueError(f"Trabajo {i}: debe tener 'query' o 'usuario' (solo uno)")
+        desconocidas = set(trabajo['tareas']) - set(TAREAS_DISPONIBLES)
+        if desconocidas:
+            raise ValueError(f"Trabajo {i}: tareas desconocidas {sorted(desconocidas)}")
+        if '.' + trabajo['formato'] not in EXTENSIONES_RESULTADOS:
+            raise ValueError(f"Trabajo {i}: formato '{trabajo['formato']}' no válido")
+        if trabajo['idiomas'] and trabajo['idiomas'] not in MODOS_ENRUTADO:
+            raise ValueError(f"Trabajo {i}: modo de idiomas '{trabajo['idiomas']}' no válido")
+        trabajo['cantidad'] = max(10, int(trabajo['cantidad']))
+
+        if not trabajo.get('nombre'):
+            tipo, valor = ('busqueda', trabajo['query']) if trabajo.get('query') else ('usuario', trabajo['usuario'])
+            limpio = re.sub(r'[^\w-]+', '_', valor).strip('_')[:80]
+            trabajo['nombre'] = f"{tipo}_{limpio}"
+        if trabajo['nombre'] in nombres:
+            trabajo['nombre'] = f"{trabajo['nombre']}_{i}"
+        nombres.add(trabajo['nombre'])
+        trabajos.append(trabajo)
+    return trabajos
+
+
+def ejecutar_trabajo(trabajo, twitter_client, motor, cache, directorio, lexico, directorio_salida):
+    """Descarga, analiza y guarda un trabajo; devuelve su resumen para resumen_trabajos.json."""
+    inicio = time.perf_counter()
+    resumen = {'nombre': trabajo['nombre'], 'query': trabajo.get('query'), 'usuario': trabajo.get('usuario'),
+               'cantidad': trabajo['cantidad'], 'tareas': trabajo['tareas']}
+
+    if trabajo.get('query'):
+        if trabajo['cantidad'] > 100:
+            tweets = recolectar_tweets_paginado(query=trabajo['query'], max_results=trabajo['cantidad'],
+                                                incremental=trabajo['incremental'])
+        else:
+            tweets = descargar_tweets_busqueda(twitter_client, trabajo['query'], trabajo['cantidad'])
+    elif trabajo['cantidad'] > 100:
+        tweets = recolectar_tweets_paginado(username=trabajo['usuario'], max_results=trabajo['cantidad'],
+                                            directorio=directorio, incremental=trabajo['incremental'])
+    else:
+        tweets = descargar_tweets_usuario(twitter_client, trabajo['usuario'], trabajo['cantidad'], directorio)
+    resumen['descargados'] = len(tweets)
+
+    if tweets:
+        preprocesador = None
+        if trabajo['preprocesado']:
+            preprocesador = PreprocesadorTokens(trabajo['presupuesto_tokens'], contador=contador_de_motor(motor))
+        enrutador = crear_enrutador(motor, trabajo['idiomas'])
+        informe = None
+        try:
+            if trabajo['cascada'] and 'sentiment' in trabajo['tareas']:
+                tweets_analizados, informe = analizar_tweets_cascada(
+                    tweets, motor, lexico, cache=cache, comparar=trabajo['comparar'], tareas=trabajo['tareas'],
+                    preprocesador=preprocesador, enrutador=enrutador)
+            else:
+                tweets_analizados = analizar_tweets(tweets, motor, cache, trabajo['tareas'], preprocesador, enrutador)
+        finally:
+            if enrutador is not None:
+                enrutador.cerrar()
+        if preprocesador is not None:
+            resumen['tokens_antes'] = preprocesador.tokens_antes
+            resumen['tokens_despues'] = preprocesador.tokens_despues
+        if enrutador is not None:
+            resumen['rutas_idioma'] = dict(enrutador.rutas)
+        if informe is not None:
+            resumen['cascada'] = informe
+        estadisticas = generar_estadisticas(tweets_analizados)
+
+        archivo = os.path.join(directorio_salida, f"{trabajo['nombre']}.{trabajo['formato']}")
+        guardar_resultados(tweets_analizados, estadisticas, archivo, extra={'cascada': informe} if informe else None)
+        if trabajo['graficos']:
+            titulo = f"Análisis: {trabajo.get('query') or '@' + trabajo['usuario']}"
+            ruta_grafico = os.path.join(directorio_salida, f"{trabajo['nombre']}.png")
+            visualizar_analisis(tweets_analizados, estadisticas, titulo, ruta_salida=ruta_grafico)
+            resumen['grafico'] = ruta_grafico
+        resumen.update({
+            'analizados': len(tweets_analizados),
+            'archivo': archivo,
+            'sentimientos': dict(estadisticas['sentimientos']),
+            'emociones': dict(estadisticas['emociones'])
+        })
+    else:
+        resumen['analizados'] = 0
+
+    resumen['segundos'] = round(time.perf_counter() - inicio, 2)
+    return resumen
+
+
+def ejecutar_trabajos(ruta_trabajos, directorio_salida="resultados", backend=BACKEND_INFERENCIA,
+                      procesos=PROCESOS_INFERENCIA):
+    """Ejecuta todos los trabajos del archivo con un único motor precargado.
+
+    Devuelve la lista de resúmenes (también escrita en <salida>/resumen_trabajos.json).
+    """
+    trabajos = cargar_trabajos(ruta_trabajos)
+    os.makedirs(directorio_salida, exist_ok=True)
+    print(f"✓ {len(trabajos)} trabajos en {ruta_trabajos}")
+
+    # Un solo motor con la unión de tareas; cada trabajo pide solo las suyas
+    tareas = [t for t in TAREAS_DISPONIBLES if any(t in trabajo['tareas'] for trabajo in trabajos)]
+    twitter_client, motor = inicializar_clientes(tareas, backend, procesos)
+    if not twitter_client or not motor:
+        return []
+    if hasattr(motor, 'analizadores'):
+        motor.analizadores  # carga de todos los modelos una vez, antes del primer trabajo
+        print(f"✓ Modelos cargados: {', '.join(tareas)}")
 
-    # Para uso rápido, descomenta:
-    # ejemplo_rapido()
+    cache = CacheInferencia(CACHE_INFERENCIA) if CACHE_INFERENCIA else None
+    directorio = DirectorioUsuarios(RUTA_DIRECTORIO_USUARIOS)
+    lexico = cargar_lexico_afinn() if any(t['cascada'] for t in trabajos) else None
+
+    resumenes = []
+    graficos_fallidos = {}
+    try:
+        for i, trabajo in enumerate(trabajos, 1):
+            print(f"\n[{i}/{len(trabajos)}] Trabajo '{trabajo['nombre']}'")
+            try:
+                resumenes.append(ejecutar_trabajo(trabajo, twitter_client, motor, cache, directorio,
+                                                  lexico, directorio_salida))
+            except Exception as e:
+                print(f"✗ Error en el trabajo '{trabajo['nombre']}': {e}")
+                resumenes.append({'nombre': trabajo['nombre'], 'error': str(e)})
+    finally:
+        motor.cerrar()
+        if cache is not None:
+            cache.cerrar()
+        if any(t['graficos'] for t in trabajos):
+            from renderizado import esperar_renderizados
+            graficos_fallidos = esperar_renderizados()
+
+    # Los gráficos se guardan en segundo plano: solo ahora se sabe si salieron bien
+    for resumen in resumenes:
+        if resumen.get('grafico') in graficos_fallidos:
+            resumen['error_grafico'] = graficos_fallidos[resumen.pop('grafico')]
+
+    ruta_resumen = os.path.join(directorio_salida, 'resumen_trabajos.json')
+    with open(ruta_resumen, 'w', encoding='utf-8') as f:
+        json.dump({'fecha': datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 'trabajos': resumenes},
+                  f, ensure_ascii=False, indent=2)
+    fallidos = sum(1 for r in resumenes if 'error' in r)
+    print(f"\n✓ {len(resumenes) - fallidos}/{len(resumenes)} trabajos completados; resumen en {ruta_resumen}")
+    if graficos_fallidos:
+        print(f"✗ {len(graficos_fallidos)} gráficos no se pudieron guardar (ver 'error_grafico')")
+    return resumenes
+
+
+def main_cli(argumentos=None):
+    """Punto de entrada sin menú: python tweets_analisis_sentimientos.py --trabajos trabajos.json"""
+    global BEARER_TOKEN
+
+    parser = argparse.ArgumentParser(description="Análisis de sentimientos de tweets por lotes (sin menú)")
+    parser.add_argument('--trabajos', required=True, help="Archivo JSON de trabajos (ver trabajos_ejemplo.json)")
+    parser.add_argument('--salida', default='resultados', help="Directorio de salida")
+    parser.add_argument('--backend', default=BACKEND_INFERENCIA, choices=['pytorch', 'int8', 'onnx'])
+    parser.add_argument('--procesos', type=int, default=PROCESOS_INFERENCIA)
+    parser.add_argument('--token', default=os.environ.get('TWITTER_BEARER_TOKEN'),
+                        help="Bearer Token (default: TWITTER_BEARER_TOKEN o el de este script)")
+    parser.add_argument('--metricas', nargs='?', const='', default=None,
+                        help=f"Escribir el informe de métricas por etapa (default: <salida>/{RUTA_INFORME_POR_DEFECTO})")
+    parser.add_argument('--perfil', nargs='+', default=[], choices=list(PERFILES_DISPONIBLES),
+                        help="Añadir al informe un perfil de cProfile y/o tracemalloc")
+    args = parser.parse_args(argumentos)
+
+    if args.metricas is not None or args.perfil:
+        METRICAS.activar(args.metricas or os.path.join(args.salida, RUTA_INFORME_POR_DEFECTO), args.perfil)
+
+    if args.token:
+        BEARER_TOKEN = args.token
+    if not verificar_configuracion():
+        return 2
+    resumenes = ejecutar_trabajos(args.trabajos, args.salida, args.backend, args.procesos)
+    return 0 if resumenes and all('error' not in r and 'error_grafico' not in r for r in resumenes) else 1
+
+
+if __name__ == "__main__":
+    # TWEETS_METRICAS=1 (o una ruta) activa el informe de métricas por etapa
+    METRICAS.activar_desde_entorno()
+    try:
+        codigo = main_cli() if len(sys.argv) > 1 else main()
+    finally:
+        METRICAS.finalizar()
+    sys.exit(codigo)
@@ -0,0 +1,111 @@
+"""
+VERIFICACIÓN DEL TIEMPO DE ARRANQUE
+Comprueba que importar los puntos de entrada no cargue dependencias pesadas
+y que se mantenga dentro de un presupuesto de tiempo, usando
+`python -X importtime` en un proceso limpio.
+
+- El tiempo acumulado de importar cada módulo debe quedar por debajo de
+  PRESUPUESTO_IMPORTACION_MS
+- Ninguno de MODULOS_PESADOS (torch, transformers, tweepy, matplotlib...)
+  puede aparecer al importar
+- `python tweets_analisis_sentimientos.py --help` debe terminar en menos de
+  PRESUPUESTO_AYUDA_S
+
+Termina con código 1 si algo se sale del presupuesto (apto para CI).
+
+Ejecutar:
+python verificar_arranque.py
+python verificar_arranque.py --presupuesto-ms 150 --detalle 20
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+PUNTOS_DE_ENTRADA = ('tweets_analisis_sentimientos', 'reanalisis_offline')
+PRESUPUESTO_IMPORTACION_MS = 300
+PRESUPUESTO_AYUDA_S = 1.0
+MODULOS_PESADOS = (
+    'torch', 'transformers', 'pysentimiento', 'tweepy', 'requests', 'matplotlib',
+    'seaborn', 'numpy', 'pyarrow', 'statsmodels', 'sklearn', 'onnxruntime'
+)
+
+
+def medir_importacion(modulo):
+    """Importa `modulo` en un proceso nuevo; devuelve [(módulo, propio_us, acumulado_us)] en orden."""
+    salida = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {modulo}"],
+                            cwd=DIRECTORIO, capture_output=True, text=True)
+    if salida.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}:\n{salida.stderr[-2000:]}")
+
+    filas = []
+    for linea in salida.stderr.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        filas.append((nombre.strip(), int(propio), int(acumulado)))
+    return filas
+
+
+def medir_ayuda(repeticiones=3):
+    """Mejor tiempo (s) de `python tweets_analisis_sentimientos.py --help`."""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, 'tweets_analisis_sentimientos.py', '--help'],
+                       cwd=DIRECTORIO, capture_output=True, check=True)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comprueba el presupuesto de tiempo de importación")
+    parser.add_argument('--modulos', nargs='+', default=list(PUNTOS_DE_ENTRADA))
+    parser.add_argument('--presupuesto-ms', type=float, default=PRESUPUESTO_IMPORTACION_MS)
+    parser.add_argument('--presupuesto-ayuda', type=float, default=PRESUPUESTO_AYUDA_S)
+    parser.add_argument('--detalle', type=int, default=10, help="Módulos más lentos a mostrar")
+    args = parser.parse_args()
+
+    print(f"\n{'='*70}")
+    print("VERIFICACIÓN DEL TIEMPO DE ARRANQUE")
+    print(f"{'='*70}\n")
+
+    fallos = []
+    for modulo in args.modulos:
+        filas = medir_importacion(modulo)
+        total_ms = next((acumulado for nombre, _, acumulado in filas if nombre == modulo), 0) / 1000
+        pesados = sorted({nombre.split('.')[0] for nombre, _, _ in filas} & set(MODULOS_PESADOS))
+
+        marca = "✓" if total_ms <= args.presupuesto_ms and not pesados else "✗"
+        print(f"{marca} import {modulo}: {total_ms:.1f} ms (presupuesto {args.presupuesto_ms:.0f} ms)")
+        for nombre, propio, _ in sorted(filas, key=lambda f: f[1], reverse=True)[:args.detalle]:
+            print(f"    {propio / 1000:>7.1f} ms  {nombre}")
+        if total_ms > args.presupuesto_ms:
+            fallos.append(f"{modulo} tarda {total_ms:.1f} ms en importarse")
+        if pesados:
+            fallos.append(f"{modulo} importa dependencias pesadas: {', '.join(pesados)}")
+
+    segundos = medir_ayuda()
+    marca = "✓" if segundos <= args.presupuesto_ayuda else "✗"
+    print(f"\n{marca} tweets_analisis_sentimientos.py --help: {segundos:.2f} s "
+          f"(presupuesto {args.presupuesto_ayuda:.1f} s)")
+    if segundos > args.presupuesto_ayuda:
+        fallos.append(f"--help tarda {segundos:.2f} s")
+
+    print(f"\n{'='*70}")
+    if fallos:
+        for fallo in fallos:
+            print(f"✗ {fallo}")
+        print(f"{'='*70}\n")
+        return 1
+    print("✓ Arranque dentro del presupuesto")
+    print(f"{'='*70}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())